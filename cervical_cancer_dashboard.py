@@ -7,2244 +7,216 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import os
+import io
+import json
+import hashlib
+import functools
 import kagglehub
 import statsmodels.formula.api as smf
 import statsmodels.api as sm
 import textwrap
+import logging
 
-# Configure page
-st.set_page_config(
-    page_title="📊 Cervical Cancer Screening Analytics",
-    page_icon="🏥",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Custom CSS for styling with beautiful background
-st.markdown("""
-<style>    /* 🎨 Beautiful Orange-Pink Gradient Background - Inspired by the provided image */
-    .stApp {
-        background: linear-gradient(135deg, 
-            #ff9a56 0%,     /* Warm orange */
-            #ff7b39 12%,    /* Rich orange */
-            #ff6b2b 25%,    /* Deep orange */
-            #ff5722 38%,    /* Orange-red */
-            #ff4757 50%,    /* Coral-red */
-            #ff3838 62%,    /* Bright red */
-            #ff2d92 75%,    /* Pink-red */
-            #ff1744 88%,    /* Vibrant pink-red */
-            #e91e63 100%    /* Deep pink */
-        );
-        background-attachment: fixed;
-        position: relative;
-        min-height: 100vh;
-        animation: backgroundPulse 12s ease-in-out infinite;
-    }
-    
-    /* 🌟 Animated Organic Shapes Overlay - Similar to the image pattern */
-    .stApp::before {
-        content: "";
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        background-image: 
-            /* Large organic shape - top left */
-            radial-gradient(ellipse 700px 500px at 15% 25%, rgba(255, 204, 128, 0.4) 0%, transparent 55%),
-            /* Medium organic shape - bottom right */
-            radial-gradient(ellipse 600px 400px at 85% 75%, rgba(255, 154, 86, 0.35) 0%, transparent 55%),
-            /* Small organic shape - center */
-            radial-gradient(ellipse 350px 250px at 50% 45%, rgba(255, 107, 43, 0.25) 0%, transparent 60%),
-            /* Flowing wave pattern */
-            linear-gradient(45deg, 
-                transparent 0%, 
-                rgba(255, 255, 255, 0.08) 25%, 
-                transparent 45%, 
-                rgba(255, 255, 255, 0.05) 70%, 
-                transparent 100%);
-        background-size: 
-            100% 100%, 
-            100% 100%, 
-            100% 100%, 
-            300px 300px;
-        z-index: -1;
-        opacity: 0.85;
-        animation: organicFlow 18s ease-in-out infinite;
-    }
-    
-    /* 🌈 Additional flowing overlay for depth and movement */
-    .stApp::after {
-        content: "";
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        background: 
-            radial-gradient(circle 400px at 70% 30%, rgba(255, 183, 77, 0.18) 0%, transparent 70%),
-            radial-gradient(circle 300px at 25% 70%, rgba(255, 138, 101, 0.15) 0%, transparent 70%),
-            radial-gradient(circle 200px at 80% 80%, rgba(255, 71, 87, 0.12) 0%, transparent 70%);
-        z-index: -1;
-        animation: floatingShapes 22s ease-in-out infinite reverse;
-    }
-    
-    /* Background breathing animation */
-    @keyframes backgroundPulse {
-        0%, 100% {
-            filter: hue-rotate(0deg) saturate(1.0) brightness(1.0);
-        }
-        25% {
-            filter: hue-rotate(3deg) saturate(1.08) brightness(1.03);
-        }
-        50% {
-            filter: hue-rotate(-2deg) saturate(1.12) brightness(1.06);
-        }
-        75% {
-            filter: hue-rotate(5deg) saturate(1.05) brightness(1.02);
-        }
-    }
-    
-    /* Organic shapes flowing animation */
-    @keyframes organicFlow {
-        0%, 100% {
-            transform: scale(1) rotate(0deg);
-            opacity: 0.85;
-        }
-        25% {
-            transform: scale(1.03) rotate(1deg);
-            opacity: 0.9;
-        }
-        50% {
-            transform: scale(1.06) rotate(-0.5deg);
-            opacity: 0.95;
-        }
-        75% {
-            transform: scale(1.02) rotate(0.8deg);
-            opacity: 0.88;
-        }
-    }
-    
-    /* Floating depth shapes animation */
-    @keyframes floatingShapes {
-        0%, 100% {
-            transform: translateY(0px) translateX(0px) scale(1);
-            opacity: 1;
-        }
-        33% {
-            transform: translateY(-12px) translateX(8px) scale(1.04);
-            opacity: 0.9;
-        }
-        66% {
-            transform: translateY(-6px) translateX(-10px) scale(0.96);
-            opacity: 0.95;
-        }
-    }
-    
-    /* Main content container with translucent background */
-    .main .block-container {
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(10px);
-        border-radius: 15px;
-        padding: 2rem;
-        margin: 1rem;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-    }
-    
-    /* Sidebar styling */
-    .css-1d391kg {
-        background: rgba(52, 73, 94, 0.95);
-        backdrop-filter: blur(10px);
-        border-radius: 0 15px 15px 0;
-    }
-    
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #2c3e50;
-        text-align: center;
-        margin-bottom: 2rem;
-        padding: 1.5rem;
-        background: linear-gradient(135deg, #74b9ff, #0984e3);
-        border-radius: 15px;
-        color: white;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        box-shadow: 0 4px 15px rgba(0,0,0,0.2);
-    }      /* 🚀 Enhanced Section Headers - Perfect Size with Exciting Animations! */
-    .section-header {
-        font-size: 1.9rem;
-        font-weight: 800;
-        color: white;
-        margin: 1.8rem 0 1.2rem 0;
-        padding: 1.2rem 1.8rem;
-        border-radius: 18px;
-        background: linear-gradient(135deg, #00d4aa 0%, #00b894 25%, #00a085 50%, #008f72 75%, #007d5f 100%);
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.4);
-        box-shadow: 
-            0 8px 24px rgba(0,0,0,0.15),
-            0 4px 12px rgba(0,0,0,0.08),
-            0 0 16px rgba(0,212,170,0.25),
-            inset 0 1px 0 rgba(255,255,255,0.2);
-        transition: all 0.4s ease;
-        position: relative;
-        overflow: hidden;
-        cursor: pointer;
-        animation: headerEntrance 1s ease-out, headerFloat 4s ease-in-out infinite;
-    }
-      .section-header::before {
-        content: "✨";
-        position: absolute;
-        top: 50%;
-        right: 25px;
-        transform: translateY(-50%);
-        font-size: 1.5rem;
-        animation: sparkleRotate 3s ease-in-out infinite;
-    }
-    
-    .section-header::after {
-        content: "";
-        position: absolute;
-        top: -50%;
-        left: -50%;
-        width: 200%;
-        height: 200%;
-        background: linear-gradient(45deg, transparent, rgba(255,255,255,0.1), transparent);
-        transform: rotate(45deg);
-        animation: headerShimmer 4s ease-in-out infinite;
-    }
-      .section-header:hover {
-        transform: translateY(-3px) scale(1.01);
-        box-shadow: 
-            0 15px 35px rgba(0,0,0,0.2),
-            0 8px 18px rgba(0,0,0,0.15),
-            0 0 30px rgba(0,255,204,0.4),
-            inset 0 1px 0 rgba(255,255,255,0.25);
-        background: linear-gradient(135deg, #00ffcc 0%, #00e6b8 25%, #00d4aa 50%, #00b894 75%, #00a085 100%);
-    }
-    
-    @keyframes headerEntrance {
-        0% {
-            opacity: 0;
-            transform: translateY(-30px) scale(0.9);
-        }
-        100% {
-            opacity: 1;
-            transform: translateY(0) scale(1);
-        }
-    }
-    
-    @keyframes headerFloat {
-        0%, 100% {
-            transform: translateY(0px);
-        }
-        50% {
-            transform: translateY(-3px);
-        }
-    }
-    
-    @keyframes headerShimmer {
-        0% {
-            transform: translateX(-100%) translateY(-100%) rotate(45deg);
-            opacity: 0;
-        }
-        50% {
-            opacity: 0.3;
-        }
-        100% {
-            transform: translateX(100%) translateY(100%) rotate(45deg);
-            opacity: 0;
-        }
-    }/* 🚀 Enhanced Summary Cards - Perfect Size with Exciting Animations! */
-    .summary-card {
-        background: linear-gradient(145deg, #ffffff 0%, #f0f8ff 25%, #e6f3ff 50%, #dbeafe 100%);
-        border-radius: 18px;
-        padding: 1.8rem 1.5rem;
-        margin: 1rem 0.8rem;
-        box-shadow: 
-            0 12px 30px rgba(0,0,0,0.12),
-            0 6px 15px rgba(0,0,0,0.08),
-            0 3px 8px rgba(0,0,0,0.04),
-            inset 0 1px 0 rgba(255,255,255,0.9);
-        border: 1px solid rgba(255,255,255,0.4);
-        border-left: 6px solid #00d4aa;
-        transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-        text-align: center;
-        min-height: 160px;
-        display: flex;
-        flex-direction: column;
-        justify-content: center;
-        position: relative;
-        overflow: hidden;
-        animation: cardEntrance 0.8s ease-out forwards, cardFloat 4s ease-in-out infinite;
-        backdrop-filter: blur(12px);
-        cursor: pointer;
-        transform-style: preserve-3d;
-    }
-      .summary-card:active {
-        transform: translateY(-8px) scale(1.03) rotateX(3deg);
-        box-shadow: 
-            0 20px 40px rgba(0,0,0,0.15),
-            0 10px 20px rgba(0,0,0,0.1),
-            0 0 20px rgba(0,212,170,0.25),
-            inset 0 1px 0 rgba(255,255,255,0.9);
-    }/* 🌟 Enhanced Shimmer & Hover Effects with Particles */
-    .summary-card::before {
-        content: "";
-        position: absolute;
-        top: -100%;
-        left: -100%;
-        width: 300%;
-        height: 300%;
-        background: linear-gradient(45deg, 
-            transparent, 
-            rgba(255,255,255,0.3), 
-            rgba(0,212,170,0.2),
-            rgba(255,255,255,0.3),
-            transparent);
-        transform: rotate(45deg);
-        transition: all 0.8s ease;
-        opacity: 0;
-        pointer-events: none;
-        animation: particleFloat 6s ease-in-out infinite;
-    }
-    
-    .summary-card::after {
-        content: "✨";
-        position: absolute;
-        top: 20px;
-        right: 20px;
-        font-size: 1.5rem;
-        opacity: 0;
-        transform: scale(0) rotate(0deg);
-        transition: all 0.4s ease;
-        animation: sparkleRotate 3s ease-in-out infinite;
-    }
-      .summary-card:hover {
-        transform: translateY(-8px) scale(1.03) rotateY(3deg);
-        box-shadow: 
-            0 20px 40px rgba(0,0,0,0.15),
-            0 12px 24px rgba(0,0,0,0.1),
-            0 0 30px rgba(0,212,170,0.3),
-            0 0 15px rgba(255,255,255,0.5),
-            inset 0 1px 0 rgba(255,255,255,0.9);
-        border-left-width: 8px;
-        border-left-color: #00ffcc;
-    }
-    
-    .summary-card:hover::before {
-        opacity: 1;
-        animation: megaShimmer 2s ease-in-out infinite;
-    }
-    
-    .summary-card:hover::after {
-        opacity: 1;
-        transform: scale(1.2) rotate(360deg);
-    }    /* 🎨 VIBRANT Color Variants - Super Bright & Catchy! */
-    .summary-card.blue {
-        background: linear-gradient(145deg, 
-            #ffffff 0%, 
-            #e3f2fd 20%, 
-            #2196f3 40%, 
-            #1976d2 60%, 
-            #0d47a1 80%, 
-            #003c8f 100%);
-        border-left-color: #00bcd4;
-        box-shadow: 
-            0 20px 50px rgba(33,150,243,0.3),
-            0 10px 25px rgba(33,150,243,0.2),
-            0 0 30px rgba(33,150,243,0.4),
-            inset 0 2px 0 rgba(255,255,255,0.95);
-        color: white;
-        text-shadow: 1px 1px 3px rgba(0,0,0,0.3);
-    }
-    
-    .summary-card.blue:hover {
-        background: linear-gradient(145deg, 
-            #00e5ff 0%, 
-            #00b8d4 25%, 
-            #0091ea 50%, 
-            #2962ff 75%, 
-            #304ffe 100%);
-        box-shadow: 
-            0 35px 70px rgba(33,150,243,0.4),
-            0 20px 40px rgba(33,150,243,0.3),
-            0 0 60px rgba(0,229,255,0.6),
-            0 0 30px rgba(255,255,255,0.8),
-            inset 0 2px 0 rgba(255,255,255,0.95);
-        border-left-color: #00e5ff;
-        animation: colorPulse 1.5s ease-in-out infinite;
-    }
-    
-    .summary-card.green {
-        background: linear-gradient(145deg, 
-            #ffffff 0%, 
-            #e8f5e8 20%, 
-            #4caf50 40%, 
-            #388e3c 60%, 
-            #2e7d32 80%, 
-            #1b5e20 100%);
-        border-left-color: #00e676;
-        box-shadow: 
-            0 20px 50px rgba(76,175,80,0.3),
-            0 10px 25px rgba(76,175,80,0.2),
-            0 0 30px rgba(76,175,80,0.4),
-            inset 0 2px 0 rgba(255,255,255,0.95);
-        color: white;
-        text-shadow: 1px 1px 3px rgba(0,0,0,0.3);
-    }
-    
-    .summary-card.green:hover {
-        background: linear-gradient(145deg, 
-            #00ff88 0%, 
-            #00e676 25%, 
-            #00c853 50%, 
-            #64dd17 75%, 
-            #76ff03 100%);
-        box-shadow: 
-            0 35px 70px rgba(76,175,80,0.4),
-            0 20px 40px rgba(76,175,80,0.3),
-            0 0 60px rgba(0,255,136,0.6),
-            0 0 30px rgba(255,255,255,0.8),
-            inset 0 2px 0 rgba(255,255,255,0.95);
-        border-left-color: #00ff88;
-        animation: colorPulse 1.5s ease-in-out infinite;
-    }
-    
-    .summary-card.orange {
-        background: linear-gradient(145deg, 
-            #ffffff 0%, 
-            #fff3e0 20%, 
-            #ff9800 40%, 
-            #f57c00 60%, 
-            #ef6c00 80%, 
-            #e65100 100%);
-        border-left-color: #ff6d00;
-        box-shadow: 
-            0 20px 50px rgba(255,152,0,0.3),
-            0 10px 25px rgba(255,152,0,0.2),
-            0 0 30px rgba(255,152,0,0.4),
-            inset 0 2px 0 rgba(255,255,255,0.95);
-        color: white;
-        text-shadow: 1px 1px 3px rgba(0,0,0,0.3);
-    }
-    
-    .summary-card.orange:hover {
-        background: linear-gradient(145deg, 
-            #ffab00 0%, 
-            #ff8f00 25%, 
-            #ff6f00 50%, 
-            #ff3d00 75%, 
-            #dd2c00 100%);
-        box-shadow: 
-            0 35px 70px rgba(255,152,0,0.4),
-            0 20px 40px rgba(255,152,0,0.3),
-            0 0 60px rgba(255,171,0,0.6),
-            0 0 30px rgba(255,255,255,0.8),
-            inset 0 2px 0 rgba(255,255,255,0.95);
-        border-left-color: #ffab00;
-        animation: colorPulse 1.5s ease-in-out infinite;
-    }
-    
-    .summary-card.purple {
-        background: linear-gradient(145deg, 
-            #ffffff 0%, 
-            #f3e5f5 20%, 
-            #9c27b0 40%, 
-            #7b1fa2 60%, 
-            #6a1b9a 80%, 
-            #4a148c 100%);
-        border-left-color: #e040fb;
-        box-shadow: 
-            0 20px 50px rgba(156,39,176,0.3),
-            0 10px 25px rgba(156,39,176,0.2),
-            0 0 30px rgba(156,39,176,0.4),
-            inset 0 2px 0 rgba(255,255,255,0.95);
-        color: white;
-        text-shadow: 1px 1px 3px rgba(0,0,0,0.3);
-    }
-    
-    .summary-card.purple:hover {
-        background: linear-gradient(145deg, 
-            #e040fb 0%, 
-            #d500f9 25%, 
-            #aa00ff 50%, 
-            #7c4dff 75%, 
-            #651fff 100%);
-        box-shadow: 
-            0 35px 70px rgba(156,39,176,0.4),
-            0 20px 40px rgba(156,39,176,0.3),
-            0 0 60px rgba(224,64,251,0.6),
-            0 0 30px rgba(255,255,255,0.8),
-            inset 0 2px 0 rgba(255,255,255,0.95);
-        border-left-color: #e040fb;
-        animation: colorPulse 1.5s ease-in-out infinite;
-    }
-    
-    /* Large Content Cards - For sections with extensive text */
-    .large-content-card {
-        background: linear-gradient(135deg, #f8fbff 0%, #e8f4f8 100%);
-        border-radius: 15px;
-        padding: 2rem;
-        margin: 1rem 0;
-        box-shadow: 0 6px 20px rgba(0,0,0,0.1);
-        border-left: 6px solid #00b894;
-        transition: all 0.3s ease;
-        text-align: left;
-        min-height: auto;
-    }
-    
-    .large-content-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-    }
-    
-    .large-content-card.blue {
-        background: linear-gradient(135deg, #e3f2fd 0%, #bbdefb 100%);
-        border-left-color: #2196f3;
-    }
-    
-    .large-content-card.green {
-        background: linear-gradient(135deg, #e8f5e8 0%, #c8e6c9 100%);
-        border-left-color: #4caf50;
-    }
-    
-    .large-content-card.orange {
-        background: linear-gradient(135deg, #fff3e0 0%, #ffcc80 100%);
-        border-left-color: #ff9800;
-    }
-    
-    .large-content-card.purple {
-        background: linear-gradient(135deg, #f3e5f5 0%, #ce93d8 100%);
-        border-left-color: #9c27b0;
-    }
-    
-    .large-content-card.red {
-        background: linear-gradient(135deg, #ffebee 0%, #ffcdd2 100%);
-        border-left-color: #f44336;
-    }
-    
-    .large-card-title {
-        font-size: 1.4rem;
-        font-weight: 700;
-        color: #2c3e50;
-        margin-bottom: 1.2rem;
-        text-transform: none;
-        letter-spacing: 0.5px;
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-        display: flex;
-        align-items: center;
-        gap: 0.5rem;
-    }
-    
-    .large-card-content {
-        font-size: 1rem;
-        color: #2d3748;
-        line-height: 1.6;
-        font-weight: 400;
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    }
-    
-    .large-card-content ul {
-        list-style: none;
-        padding-left: 0;
-        margin: 0;
-    }
-    
-    .large-card-content li {
-        padding: 0.5rem 0;
-        padding-left: 1.5rem;
-        position: relative;
-        border-bottom: 1px solid rgba(0,0,0,0.05);
-    }
-    
-    .large-card-content li:last-child {
-        border-bottom: none;
-    }
-    
-    .large-card-content li::before {
-        content: "▶";
-        position: absolute;
-        left: 0;
-        color: #00b894;
-        font-weight: bold;
-        font-size: 0.8rem;
-    }
-    
-    .large-card-content strong {
-        color: #1a202c;
-        font-weight: 600;
-    }    /* 🎯 Enhanced Card Text Styles - Perfect Visibility with Strong Contrast! */
-    .card-title {
-        font-size: 1.1rem;
-        font-weight: 800;
-        color: #1a202c;
-        margin-bottom: 0.8rem;
-        text-transform: uppercase;
-        letter-spacing: 0.8px;
-        font-family: 'Segoe UI', 'Arial Black', Tahoma, Geneva, Verdana, sans-serif;
-        overflow-wrap: break-word;
-        word-wrap: break-word;
-        text-shadow: 
-            2px 2px 4px rgba(0,0,0,0.5),
-            1px 1px 2px rgba(0,0,0,0.3),
-            0px 0px 8px rgba(255,255,255,0.8);
-        animation: titleGlow 2s ease-in-out infinite;
-        position: relative;
-        background: linear-gradient(135deg, #1a202c 0%, #2d3748 50%, #4a5568 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        filter: drop-shadow(2px 2px 4px rgba(0,0,0,0.5));
-    }
-    
-    /* Override for colored cards - Ensure white text on dark backgrounds */
-    .summary-card.blue .card-title,
-    .summary-card.green .card-title,
-    .summary-card.orange .card-title,
-    .summary-card.purple .card-title {
-        color: white !important;
-        -webkit-text-fill-color: white !important;
-        background: none !important;
-        text-shadow: 
-            2px 2px 6px rgba(0,0,0,0.8),
-            1px 1px 3px rgba(0,0,0,0.6),
-            0px 0px 10px rgba(0,0,0,0.4) !important;
-        font-weight: 900 !important;
-        filter: drop-shadow(3px 3px 6px rgba(0,0,0,0.7)) !important;
-    }
-    
-    .card-title::after {
-        content: "🎯";
-        position: absolute;
-        right: -25px;
-        top: 50%;
-        transform: translateY(-50%);
-        font-size: 1rem;
-        opacity: 0.8;
-        animation: iconBounce 2s ease-in-out infinite;
-        filter: drop-shadow(1px 1px 2px rgba(0,0,0,0.5));
-    }
-    
-    .card-value {
-        font-size: 2.8rem;
-        font-weight: 900;
-        color: #1a202c;
-        margin: 0.8rem 0;
-        font-family: 'Segoe UI', 'Arial Black', Tahoma, Geneva, Verdana, sans-serif;
-        line-height: 1;
-        overflow-wrap: break-word;
-        word-wrap: break-word;
-        text-shadow: 
-            3px 3px 6px rgba(0,0,0,0.4),
-            1px 1px 3px rgba(0,0,0,0.2),
-            0px 0px 10px rgba(255,255,255,0.6);
-        animation: valueCountUp 2s ease-out, valuePulse 3s ease-in-out infinite;
-        background: linear-gradient(135deg, #1a202c 0%, #2d3748 30%, #4a5568 70%, #1a202c 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        position: relative;
-        filter: drop-shadow(3px 3px 6px rgba(0,0,0,0.3));
-    }
-    
-    /* Override for colored cards - Ensure white values on dark backgrounds */
-    .summary-card.blue .card-value,
-    .summary-card.green .card-value,
-    .summary-card.orange .card-value,
-    .summary-card.purple .card-value {
-        color: white !important;
-        -webkit-text-fill-color: white !important;
-        background: none !important;
-        text-shadow: 
-            4px 4px 8px rgba(0,0,0,0.9),
-            2px 2px 4px rgba(0,0,0,0.7),
-            0px 0px 12px rgba(0,0,0,0.5) !important;
-        font-weight: 900 !important;
-        filter: drop-shadow(4px 4px 8px rgba(0,0,0,0.8)) !important;
-    }
-    
-    .card-value::before {
-        content: "✨";
-        position: absolute;
-        top: -8px;
-        left: -30px;
-        font-size: 1.4rem;
-        animation: sparkleFloat 3s ease-in-out infinite;
-        filter: drop-shadow(2px 2px 4px rgba(0,0,0,0.5));
-    }
-    
-    .card-description {
-        font-size: 0.9rem;
-        color: #4a5568;
-        margin-top: 0.8rem;
-        line-height: 1.4;
-        font-weight: 600;
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-        overflow-wrap: break-word;
-        word-wrap: break-word;
-        hyphens: auto;
-        text-shadow: 
-            1px 1px 3px rgba(0,0,0,0.3),
-            0px 0px 4px rgba(255,255,255,0.6);
-        animation: descriptionSlide 1s ease-out 0.5s backwards;
-    }
-    
-    /* Override for colored cards - Ensure white descriptions on dark backgrounds */
-    .summary-card.blue .card-description,
-    .summary-card.green .card-description,
-    .summary-card.orange .card-description,
-    .summary-card.purple .card-description {
-        color: rgba(255,255,255,0.95) !important;
-        text-shadow: 
-            2px 2px 4px rgba(0,0,0,0.8),
-            1px 1px 2px rgba(0,0,0,0.6) !important;
-        font-weight: 600 !important;
-    }/* 🎮 Perfect Responsive Grid - Optimal Size with Better Layout */
-    .cards-container {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-        gap: 1.5rem;
-        margin: 1.5rem 0;
-        padding: 0.8rem;
-        perspective: 1000px;
-    }
-    
-    /* 📱 Enhanced Mobile Responsiveness */
-    @media (max-width: 1200px) {
-        .cards-container {
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 1.2rem;
-        }
-    }
-    
-    @media (max-width: 768px) {
-        .cards-container {
-            grid-template-columns: 1fr;
-            gap: 1.2rem;
-            margin: 1.2rem 0;
-        }
-        
-        .card-value {
-            font-size: 2.2rem;
-        }
-        
-        .summary-card {
-            min-height: 140px;
-            padding: 1.5rem 1.2rem;
-            margin: 0.8rem 0.5rem;
-        }
-        
-        .card-title {
-            font-size: 0.9rem;
-        }
-        
-        .card-description {
-            font-size: 0.8rem;
-        }
-        
-        .large-content-card {
-            padding: 1.8rem;
-            margin: 0.8rem 0;
-        }
-        
-        .large-card-title {
-            font-size: 1.2rem;
-        }
-        
-        .large-card-content {
-            font-size: 0.95rem;
-        }
-    }
-    
-    @media (max-width: 480px) {
-        .summary-card {
-            min-height: 130px;
-            padding: 1.4rem 1rem;
-        }
-        
-        .card-value {
-            font-size: 2rem;
-        }
-    }
-    /* Beautiful animations */
-        visibility: visible !important;
-        opacity: 1 !important;
-    }
-    
-    /* Beautiful animations */
-    @keyframes fadeInUp {
-        from {
-            opacity: 0;
-            transform: translateY(20px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    @keyframes countUp {
-        from {
-            opacity: 0;
-            transform: scale(0.8);
-        }
-        to {
-            opacity: 1;
-            transform: scale(1);
-        }
-    }    @keyframes sparkle {
-        0%, 100% {
-            opacity: 0.3;
-            transform: rotate(0deg) scale(1);
-        }
-        50% {
-            opacity: 0.8;
-            transform: rotate(180deg) scale(1.2);
-        }
-    }    
-    .insight-box {
-        background: linear-gradient(135deg, #fff3e0, #ffe0b2);
-        padding: 1.2rem;
-        border-radius: 12px;
-        border-left: 5px solid #ff9800;
-        margin: 1rem 0;
-        box-shadow: 0 3px 15px rgba(255,152,0,0.2);
-        backdrop-filter: blur(5px);
-        border: 1px solid rgba(255,255,255,0.3);
-    }
-    
-    .warning-box {
-        background: linear-gradient(135deg, #ffebee, #ffcdd2);
-        padding: 1.2rem;
-        border-radius: 12px;
-        border-left: 5px solid #f44336;
-        margin: 1rem 0;
-        box-shadow: 0 3px 15px rgba(244,67,54,0.2);
-        backdrop-filter: blur(5px);
-        border: 1px solid rgba(255,255,255,0.3);
-    }
-    
-    .recommendations-box {
-        background: linear-gradient(135deg, #e8f5e8, #c8e6c9);
-        padding: 1.5rem;
-        border-radius: 15px;
-        border-left: 5px solid #4caf50;
-        margin: 1rem 0;
-        box-shadow: 0 4px 20px rgba(76,175,80,0.3);
-        backdrop-filter: blur(8px);
-        border: 1px solid rgba(255,255,255,0.4);
-    }
-    
-    .section-content-box {
-        background: linear-gradient(135deg, #e8f5e8, #c8e6c9);
-        padding: 1.5rem;
-        border-radius: 15px;
-        border-left: 5px solid #4caf50;
-        margin: 1rem 0;
-        box-shadow: 0 4px 20px rgba(76,175,80,0.3);
-        backdrop-filter: blur(8px);
-        border: 1px solid rgba(255,255,255,0.4);
-    }
-    
-    .financial-considerations-box {
-        background: linear-gradient(135deg, #e3f2fd, #bbdefb);
-        padding: 1.5rem;
-        border-radius: 15px;
-        border-left: 5px solid #2196f3;
-        margin: 1rem 0;
-        box-shadow: 0 4px 20px rgba(33,150,243,0.3);
-        backdrop-filter: blur(8px);
-        border: 1px solid rgba(255,255,255,0.4);
-    }
-    
-    /* Enhance plotly charts background */
-    .js-plotly-plot .plotly .modebar {
-        background: rgba(255,255,255,0.8) !important;
-        border-radius: 5px;
-    }
-    
-    /* Medical icons/patterns as subtle background elements */
-    .medical-pattern {
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        background-image: 
-            url("data:image/svg+xml,%3Csvg width='60' height='60' viewBox='0 0 60 60' xmlns='http://www.w3.org/2000/svg'%3E%3Cg fill='none' fill-rule='evenodd'%3E%3Cg fill='%23ffffff' fill-opacity='0.05'%3E%3Cpath d='M30 30c0-11.046-8.954-20-20-20s-20 8.954-20 20 8.954 20 20 20 20-8.954 20-20zm0 0c0 11.046 8.954 20 20 20s20-8.954 20-20-8.954-20-20-20-20 8.954-20 20z'/%3E%3C/g%3E%3C/g%3E%3C/svg%3E");
-        z-index: -2;
-        pointer-events: none;
-    }    /* Streamlit elements styling - Enhanced Selectbox */
-    .stSelectbox > div > div {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-        border-radius: 15px !important;
-        color: white !important;
-        font-weight: bold !important;
-        border: 2px solid rgba(255,255,255,0.3) !important;
-        padding: 1rem !important;
-        font-size: 1.1rem !important;
-    }
-    
-    .stSelectbox > div > div > div {
-        color: white !important;
-        font-weight: bold !important;
-    }
-    
-    /* Fix selectbox label */
-    .stSelectbox label {
-        color: white !important;
-        font-weight: bold !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.5);
-        font-size: 1.1rem !important;
-    }
-    
-    /* Fix selectbox dropdown and options */
-    .stSelectbox [data-baseweb="select"] {
-        color: white !important;
-    }
-    
-    .stSelectbox [data-baseweb="select"] > div {
-        color: white !important;
-        font-weight: bold !important;
-    }
-    
-    .stSelectbox [data-baseweb="select"] span {
-        color: white !important;
-        font-weight: bold !important;
-    }
-    
-    .stMetric {
-        background: rgba(255,255,255,0.1);
-        padding: 1rem;
-        border-radius: 10px;
-        backdrop-filter: blur(5px);
-    }
-    
-    /* Tab styling */
-    .stTabs [data-baseweb="tab-list"] {
-        background: rgba(255,255,255,0.1);
-        border-radius: 10px;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background: rgba(255,255,255,0.8);
-        border-radius: 8px;
-        margin: 2px;
-    }
-    
-    /* Success, warning, error message styling */
-    .stSuccess, .stWarning, .stError, .stInfo {
-        border-radius: 10px;
-        backdrop-filter: blur(5px);
-    }
-      /* Add subtle animation to headers */
-    .main-header, .section-header {
-        animation: fadeInDown 0.8s ease-out;
-    }
-    
-    /* Floating animation for the entire app */
-    .stApp {
-        animation: gentleFloat 6s ease-in-out infinite;
-    }
-    
-    /* Beautiful gradient animations */
-    .section-content-box {
-        background: linear-gradient(135deg, #e8f5e8, #c8e6c9);
-        padding: 1.5rem;
-        border-radius: 15px;
-        border-left: 5px solid #4caf50;
-        margin: 1rem 0;
-        box-shadow: 0 4px 20px rgba(76,175,80,0.3);
-        backdrop-filter: blur(8px);
-        border: 1px solid rgba(255,255,255,0.4);
-        animation: slideInUp 0.8s ease-out;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .section-content-box::before {
-        content: "";
-        position: absolute;
-        top: -50%;
-        left: -50%;
-        width: 200%;
-        height: 200%;
-        background: linear-gradient(45deg, transparent, rgba(255,255,255,0.1), transparent);
-        transform: rotate(45deg);
-        animation: shimmer 3s linear infinite;
-    }
-    
-    @keyframes fadeInDown {
-        from {
-            opacity: 0;
-            transform: translateY(-20px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    @keyframes slideInUp {
-        from {
-            opacity: 0;
-            transform: translateY(30px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    @keyframes gentleFloat {
-        0%, 100% {
-            transform: translateY(0px);
-        }
-        50% {
-            transform: translateY(-2px);
-        }
-    }    /* 🎆 MEGA Animation Collection - Exciting Interactions! */
-    @keyframes shimmer {
-        0% {
-            transform: translateX(-100%) translateY(-100%) rotate(45deg);
-            opacity: 0;
-        }
-        50% {
-            opacity: 0.6;
-        }
-        100% {
-            transform: translateX(100%) translateY(100%) rotate(45deg);
-            opacity: 0;
-        }
-    }
-    
-    @keyframes megaShimmer {
-        0% {
-            transform: translateX(-150%) translateY(-150%) rotate(45deg);
-            opacity: 0;
-        }
-        25% {
-            opacity: 0.3;
-        }
-        50% {
-            opacity: 0.8;
-            transform: translateX(0%) translateY(0%) rotate(45deg);
-        }
-        75% {
-            opacity: 0.3;
-        }
-        100% {
-            transform: translateX(150%) translateY(150%) rotate(45deg);
-            opacity: 0;
-        }
-    }
-    
-    @keyframes cardEntrance {
-        0% {
-            opacity: 0;
-            transform: translateY(50px) scale(0.8) rotateX(45deg);
-        }
-        50% {
-            opacity: 0.7;
-            transform: translateY(25px) scale(0.9) rotateX(22deg);
-        }
-        100% {
-            opacity: 1;
-            transform: translateY(0) scale(1) rotateX(0deg);
-        }
-    }
-    
-    @keyframes cardFloat {
-        0%, 100% {
-            transform: translateY(0px) rotateZ(0deg);
-        }
-        25% {
-            transform: translateY(-3px) rotateZ(0.5deg);
-        }
-        50% {
-            transform: translateY(-6px) rotateZ(0deg);
-        }
-        75% {
-            transform: translateY(-3px) rotateZ(-0.5deg);
-        }
-    }
-    
-    @keyframes colorPulse {
-        0%, 100% {
-            filter: brightness(1) saturate(1);
-        }
-        50% {
-            filter: brightness(1.2) saturate(1.3);
-        }
-    }
-    
-    @keyframes particleFloat {
-        0%, 100% {
-            transform: translateY(0px) rotate(45deg);
-        }
-        33% {
-            transform: translateY(-10px) rotate(135deg);
-        }
-        66% {
-            transform: translateY(-5px) rotate(225deg);
-        }
-    }
-    
-    @keyframes sparkleRotate {
-        0% {
-            transform: rotate(0deg) scale(0.8);
-            opacity: 0.5;
-        }
-        25% {
-            transform: rotate(90deg) scale(1.1);
-            opacity: 0.8;
-        }
-        50% {
-            transform: rotate(180deg) scale(0.9);
-            opacity: 1;
-        }
-        75% {
-            transform: rotate(270deg) scale(1.2);
-            opacity: 0.8;
-        }
-        100% {
-            transform: rotate(360deg) scale(0.8);
-            opacity: 0.5;
-        }
-    }
-      @keyframes titleGlow {
-        0%, 100% {
-            text-shadow: 
-                2px 2px 4px rgba(0,0,0,0.5),
-                1px 1px 2px rgba(0,0,0,0.3),
-                0px 0px 8px rgba(255,255,255,0.8);
-        }
-        50% {
-            text-shadow: 
-                3px 3px 6px rgba(0,0,0,0.6),
-                2px 2px 4px rgba(0,0,0,0.4),
-                0px 0px 15px rgba(0,212,170,0.5),
-                0px 0px 10px rgba(255,255,255,0.9);
-        }
-    }
-    
-    @keyframes iconBounce {
-        0%, 100% {
-            transform: translateY(-50%) scale(1);
-        }
-        50% {
-            transform: translateY(-60%) scale(1.2);
-        }
-    }
-    
-    @keyframes valueCountUp {
-        0% {
-            opacity: 0;
-            transform: translateY(20px) scale(0.5);
-        }
-        50% {
-            opacity: 0.7;
-            transform: translateY(10px) scale(0.8);
-        }
-        100% {
-            opacity: 1;
-            transform: translateY(0) scale(1);
-        }
-    }
-    
-    @keyframes valuePulse {
-        0%, 100% {
-            transform: scale(1);
-        }
-        50% {
-            transform: scale(1.05);
-        }
-    }
-    
-    @keyframes sparkleFloat {
-        0%, 100% {
-            transform: translateY(0px) rotate(0deg);
-            opacity: 0.7;
-        }
-        33% {
-            transform: translateY(-5px) rotate(120deg);
-            opacity: 1;
-        }
-        66% {
-            transform: translateY(-8px) rotate(240deg);
-            opacity: 0.8;
-        }
-    }
-    
-    @keyframes descriptionSlide {
-        0% {
-            opacity: 0;
-            transform: translateX(-20px);
-        }
-        100% {
-            opacity: 1;
-            transform: translateX(0);
-        }
-    }
-    
-    @keyframes fadeInDown {
-        from {
-            opacity: 0;
-            transform: translateY(-20px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    /* Responsive design improvements */
-    @media (max-width: 768px) {
-        .main .block-container {
-            margin: 0.5rem;
-            padding: 1rem;
-        }
-        
-        .main-header {
-            font-size: 2rem;
-            padding: 1rem;
-        }
-        
-        .section-header {
-            font-size: 1.5rem;
-        }
-    }    /* Card header style for use inside metric containers */
-    .card-header {
-        font-size: 1.2rem !important;
-        font-weight: 700 !important;
-        color: #2c3e50 !important;
-        margin: 0 0 1rem 0 !important;
-        padding: 0 !important;
-        background: none !important;
-        border-radius: 0 !important;
-        box-shadow: none !important;
-        text-shadow: none !important;
-        text-align: left !important;
-        display: block !important;
-        visibility: visible !important;
-        opacity: 1 !important;
-    }
-    /* 🎮 Interactive Elements - Buttons, Tabs, Selectboxes */
-    .stButton > button {
-        background: linear-gradient(135deg, #00d4aa 0%, #00b894 50%, #00a085 100%);
-        border: none;
-        border-radius: 15px;
-        padding: 1rem 2rem;
-        font-weight: 700;
-        font-size: 1.1rem;
-        color: white;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.3);
-        box-shadow: 
-            0 8px 20px rgba(0,184,148,0.3),
-            0 4px 10px rgba(0,184,148,0.2);
-        transition: all 0.3s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-        cursor: pointer;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .stButton > button::before {
-        content: "";
-        position: absolute;
-        top: 50%;
-        left: 50%;
-        width: 0;
-        height: 0;
-        background: rgba(255,255,255,0.3);
-        border-radius: 50%;
-        transform: translate(-50%, -50%);
-        transition: all 0.6s ease;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-3px) scale(1.05);
-        box-shadow: 
-            0 15px 40px rgba(0,184,148,0.4),
-            0 8px 20px rgba(0,184,148,0.3),
-            0 0 30px rgba(0,255,204,0.3);
-        background: linear-gradient(135deg, #00ffcc 0%, #00e6b8 50%, #00d4aa 100%);
-    }
-    
-    .stButton > button:active {
-        transform: translateY(-1px) scale(1.02);
-        animation: buttonRipple 0.6s ease;
-    }
-    
-    .stButton > button:active::before {
-        width: 300px;
-        height: 300px;
-    }
-    
-    @keyframes buttonRipple {
-        0% {
-            box-shadow: 0 0 0 0 rgba(0,255,204,0.7);
-        }
-        70% {
-            box-shadow: 0 0 0 20px rgba(0,255,204,0);
-        }
-        100% {
-            box-shadow: 0 0 0 0 rgba(0,255,204,0);
-        }
-    }    /* 🎯 Enhanced Selectbox Styling - Fix Text Visibility */
-    .stSelectbox > div > div {
-        background: linear-gradient(135deg, #2c3e50 0%, #34495e 100%) !important;
-        border-radius: 15px !important;
-        color: white !important;
-        font-weight: bold !important;
-        border: 2px solid rgba(255,255,255,0.3) !important;
-        box-shadow: 
-            0 8px 20px rgba(44,62,80,0.3),
-            0 4px 10px rgba(44,62,80,0.2) !important;
-        transition: all 0.3s ease !important;
-        padding: 1rem !important;
-        font-size: 1.1rem !important;
-    }
-    
-    /* Fix selectbox text visibility - Make text WHITE and BOLD */
-    .stSelectbox > div > div > div {
-        color: white !important;
-        font-weight: 900 !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.5) !important;
-    }
-    
-    /* Fix selectbox input text */
-    .stSelectbox input {
-        color: white !important;
-        font-weight: 900 !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.5) !important;
-    }
-    
-    /* Fix selectbox label */
-    .stSelectbox label {
-        color: white !important;
-        font-weight: 900 !important;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.7) !important;
-        font-size: 1.2rem !important;
-        margin-bottom: 0.5rem !important;
-    }
-    
-    /* Fix selectbox dropdown options */
-    .stSelectbox [role="option"] {
-        color: #2c3e50 !important;
-        font-weight: 700 !important;
-        background: white !important;
-        padding: 0.5rem 1rem !important;
-    }
-    
-    /* Fix selectbox dropdown options on hover */
-    .stSelectbox [role="option"]:hover {
-        background: #3498db !important;
-        color: white !important;
-        font-weight: 700 !important;
-    }
-      /* Fix selectbox selected value display */
-    .stSelectbox [data-baseweb="select"] > div {
-        color: white !important;
-        font-weight: 900 !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.5) !important;
-    }
-    
-    /* Fix selectbox placeholder and selected text */
-    .stSelectbox [data-baseweb="select"] span {
-        color: white !important;
-        font-weight: 900 !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.5) !important;
-    }
-    
-    /* 🔧 COMPREHENSIVE SELECTBOX TEXT VISIBILITY FIX */
-    /* Target all possible selectbox text elements */
-    .stSelectbox * {
-        color: white !important;
-    }
-    
-    /* Force white text on all selectbox child elements */
-    .stSelectbox div[role="button"] {
-        color: white !important;
-        font-weight: 900 !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-    }
-    
-    /* Target the actual selected value text */
-    .stSelectbox div[role="button"] > div {
-        color: white !important;
-        font-weight: 900 !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-    }
-    
-    /* Target selectbox text content */
-    .stSelectbox div[data-testid="stSelectbox"] {
-        color: white !important;
-    }
-    
-    /* Force visibility on all text within selectbox */
-    .stSelectbox div[data-testid="stSelectbox"] * {
-        color: white !important;
-        font-weight: 700 !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-    }
-    
-    /* Additional fallback for invisible text */
-    .stSelectbox .css-1wa3eu0-placeholder,
-    .stSelectbox .css-1uccc91-singleValue,
-    .stSelectbox .css-1dimb5e-singleValue {
-        color: white !important;
-        font-weight: 900 !important;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.9) !important;
-    }
-    
-    /* Fix all selectbox inner elements */
-    .stSelectbox [data-baseweb="select"] {
-        color: white !important;
-        font-weight: 900 !important;
-    }
-    
-    /* Fix selectbox arrow */
-    .stSelectbox [data-baseweb="select"] svg {
-        color: white !important;
-        filter: drop-shadow(1px 1px 2px rgba(0,0,0,0.5)) !important;
-    }
-      .stSelectbox > div > div:hover {
-        transform: translateY(-2px) !important;
-        box-shadow: 
-            0 12px 30px rgba(44,62,80,0.4),
-            0 6px 15px rgba(44,62,80,0.3) !important;
-        background: linear-gradient(135deg, #34495e 0%, #2c3e50 100%) !important;
-    }
-    
-    /* Additional fixes for selectbox text visibility */
-    .stSelectbox * {
-        color: white !important;
-    }
-    
-    .stSelectbox div[data-testid="stSelectbox"] > div > div {
-        color: white !important;
-        font-weight: 900 !important;
-    }
-    
-    .stSelectbox div[data-testid="stSelectbox"] label {
-        color: white !important;
-        font-weight: 900 !important;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.7) !important;
-    }/* 🌟 Enhanced Tab Styling - Bigger Tabs with Better Visibility */    .stTabs [data-baseweb="tab-list"] {
-        background: linear-gradient(135deg, rgba(255,255,255,0.25), rgba(255,255,255,0.15)) !important;
-        border-radius: 28px !important;
-        padding: 1.8rem !important;
-        backdrop-filter: blur(15px) !important;
-        box-shadow: 
-            0 15px 35px rgba(0,0,0,0.18),
-            0 8px 20px rgba(0,0,0,0.12) !important;
-        display: flex !important;
-        justify-content: space-between !important;
-        width: 100% !important;
-        gap: 2rem !important;
-        margin: 1.5rem 0 2.5rem 0 !important;
-    }
-      .stTabs [data-baseweb="tab"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-        border-radius: 20px !important;
-        margin: 0 !important;
-        color: white !important;
-        font-weight: 900 !important;
-        transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275) !important;
-        border: none !important;
-        box-shadow: 
-            0 10px 30px rgba(102,126,234,0.5),
-            0 6px 18px rgba(102,126,234,0.4),
-            inset 0 1px 0 rgba(255,255,255,0.2) !important;
-        flex: 1 !important;
-        text-align: center !important;
-        padding: 2rem 2.5rem !important;
-        min-width: 0 !important;
-        font-size: 1.4rem !important;
-        white-space: nowrap !important;
-        overflow: hidden !important;
-        text-overflow: ellipsis !important;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.4) !important;
-        letter-spacing: 0.8px !important;
-        text-transform: uppercase !important;
-        min-height: 80px !important;
-        display: flex !important;
-        align-items: center !important;
-        justify-content: center !important;
-        font-family: 'Segoe UI', 'Arial Black', sans-serif !important;
-    }
-      .stTabs [data-baseweb="tab"]:hover {
-        transform: translateY(-3px) scale(1.05) !important;
-        box-shadow: 
-            0 12px 35px rgba(102,126,234,0.5),
-            0 6px 18px rgba(102,126,234,0.4) !important;
-        background: linear-gradient(135deg, #7c8cea 0%, #8a5fb2 100%) !important;
-    }
-    
-    .stTabs [data-baseweb="tab"][aria-selected="true"] {
-        background: linear-gradient(135deg, #00d4aa 0%, #00b894 100%) !important;
-        color: white !important;
-        transform: scale(1.08) !important;
-        box-shadow: 
-            0 8px 30px rgba(0,184,148,0.5),
-            0 4px 15px rgba(0,184,148,0.4) !important;
-        animation: tabGlow 2s ease-in-out infinite !important;
-        font-weight: 900 !important;
-    }
-      @keyframes tabGlow {
-        0%, 100% {
-            box-shadow: 
-                0 6px 20px rgba(0,184,148,0.4),
-                0 3px 10px rgba(0,184,148,0.3);
-        }
-        50% {
-            box-shadow: 
-                0 8px 30px rgba(0,255,204,0.5),
-                0 4px 15px rgba(0,255,204,0.4),
-                0 0 20px rgba(0,255,204,0.3);
-        }
-    }
-      /* 📱 Responsive Tab Layout */
-    @media (max-width: 768px) {
-        .stTabs [data-baseweb="tab-list"] {
-            flex-wrap: wrap !important;
-            gap: 1rem !important;
-            padding: 1rem !important;
-        }
-        
-        .stTabs [data-baseweb="tab"] {
-            flex: 1 1 45% !important;
-            font-size: 1.1rem !important;
-            padding: 1.2rem 1.5rem !important;
-            min-height: 65px !important;
-        }
-    }
-    
-    @media (max-width: 480px) {
-        .stTabs [data-baseweb="tab"] {
-            flex: 1 1 100% !important;
-            margin-bottom: 0.5rem !important;
-            font-size: 1rem !important;
-            padding: 1rem 1.2rem !important;
-            min-height: 55px !important;
-        }
-    }
-      /* 🎨 ENHANCED CHART CONTAINER - MUCH BIGGER WITH BETTER VISIBILITY */
-    .js-plotly-plot {
-        border-radius: 25px !important;
-        overflow: hidden !important;
-        box-shadow: 
-            0 20px 50px rgba(0,0,0,0.15),
-            0 10px 25px rgba(0,0,0,0.1) !important;
-        transition: all 0.3s ease !important;
-        backdrop-filter: blur(15px) !important;
-        border: 1px solid rgba(255,255,255,0.2) !important;
-        margin: 1.5rem 0 !important;
-        min-height: 500px !important;
-    }
-    
-    .js-plotly-plot:hover {
-        transform: translateY(-5px) !important;
-        box-shadow: 
-            0 30px 70px rgba(0,0,0,0.2),
-            0 15px 35px rgba(0,0,0,0.15) !important;
-    }
-    
-    /* Enhanced chart text and labels */
-    .js-plotly-plot .plotly text {
-        font-size: 14px !important;
-        font-weight: 600 !important;
-        font-family: 'Segoe UI', Arial, sans-serif !important;
-    }
-    
-    /* Chart titles */
-    .js-plotly-plot .plotly .gtitle {
-        font-size: 18px !important;
-        font-weight: 700 !important;
-    }
-    
-    /* Axis labels */
-    .js-plotly-plot .plotly .xtitle,
-    .js-plotly-plot .plotly .ytitle {
-        font-size: 16px !important;
-        font-weight: 600 !important;
-    }
-    
-    /* Tick labels */
-    .js-plotly-plot .plotly .xtick,
-    .js-plotly-plot .plotly .ytick {
-        font-size: 14px !important;
-        font-weight: 500 !important;
-    }
-      /* Legend text */
-    .js-plotly-plot .plotly .legendtext {
-        font-size: 14px !important;
-        font-weight: 600 !important;
-    }
-    
-    /* 🎯 SIDEBAR SELECTBOX - CRITICAL FIX FOR NAVIGATION TEXT VISIBILITY */
-    /* Target sidebar selectbox specifically */
-    .css-1d391kg .stSelectbox > div > div {
-        background-color: rgba(0, 0, 0, 0.8) !important;
-        border: 2px solid #ffffff !important;
-        border-radius: 10px !important;
-    }
-    
-    /* Sidebar selectbox text - FORCE WHITE COLOR */
-    .css-1d391kg .stSelectbox > div > div > div {
-        color: #ffffff !important;
-        font-weight: bold !important;
-        font-size: 16px !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-    }
-    
-    /* Sidebar selectbox input text */
-    .css-1d391kg .stSelectbox input {
-        color: #ffffff !important;
-        font-weight: bold !important;
-    }
-    
-    /* Sidebar selectbox label */
-    .css-1d391kg .stSelectbox label {
-        color: #ffffff !important;
-        font-weight: bold !important;
-        font-size: 16px !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-    }
-    
-    /* Sidebar selectbox dropdown arrow */
-    .css-1d391kg .stSelectbox svg {
-        fill: #ffffff !important;
-    }
-    
-    /* Alternative sidebar class targeting */
-    [data-testid="stSidebar"] .stSelectbox > div > div {
-        background-color: rgba(0, 0, 0, 0.8) !important;
-        border: 2px solid #ffffff !important;
-        border-radius: 10px !important;
-    }
-    
-    [data-testid="stSidebar"] .stSelectbox > div > div > div {
-        color: #ffffff !important;
-        font-weight: bold !important;
-        font-size: 16px !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-    }
-    
-    [data-testid="stSidebar"] .stSelectbox label {
-        color: #ffffff !important;
-        font-weight: bold !important;
-        font-size: 16px !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-    }
-    
-    [data-testid="stSidebar"] .stSelectbox input {
-        color: #ffffff !important;
-        font-weight: bold !important;
-    }
-    
-    [data-testid="stSidebar"] .stSelectbox svg {
-        fill: #ffffff !important;
-    }
-    
-    /* Universal sidebar selectbox fix - most aggressive approach */
-    .stSidebar .stSelectbox * {
-        color: #ffffff !important;
-        font-weight: bold !important;
-    }
-    
-    .stSidebar .stSelectbox > div > div {
-        background-color: rgba(0, 0, 0, 0.8) !important;
-        border: 2px solid #ffffff !important;
-    }
-    
-    /* Target sidebar selectbox button role */
-    .stSidebar .stSelectbox div[role="button"] {
-        color: #ffffff !important;
-        font-weight: bold !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-    }
-    
-    /* Target sidebar selectbox button text */
-    .stSidebar .stSelectbox div[role="button"] > div {
-        color: #ffffff !important;
-        font-weight: bold !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-    }
-      /* Target sidebar selectbox selected value */
-    .stSidebar .stSelectbox [data-baseweb="select"] span {
-        color: #ffffff !important;
-        font-weight: bold !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-    }
-    
-    /* 🎨 MODERN DROPDOWN STYLING - COMPREHENSIVE FIX */
-    /* Main selectbox container - Dark mode compatible */
-    .stSelectbox > div {
-        background: linear-gradient(135deg, #2c3e50 0%, #34495e 100%) !important;
-        border: 2px solid #3498db !important;
-        border-radius: 12px !important;
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.3) !important;
-        transition: all 0.3s ease !important;
-    }
-    
-    /* Selectbox hover state */
-    .stSelectbox > div:hover {
-        border-color: #e74c3c !important;
-        box-shadow: 0 6px 20px rgba(231, 76, 60, 0.3) !important;
-        transform: translateY(-2px) !important;
-    }
-    
-    /* Selected value display - CRITICAL FOR VISIBILITY */
-    .stSelectbox [data-baseweb="select"] {
-        background: linear-gradient(135deg, #2c3e50 0%, #34495e 100%) !important;
-        border: none !important;
-        border-radius: 10px !important;
-        padding: 12px 16px !important;
-        min-height: 48px !important;
-    }
-    
-    /* Selected text - WHITE AND BOLD */
-    .stSelectbox [data-baseweb="select"] > div {
-        color: #ffffff !important;
-        font-weight: 700 !important;
-        font-size: 16px !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-        line-height: 1.4 !important;
-    }
-    
-    /* Selected value span - FORCE WHITE */
-    .stSelectbox [data-baseweb="select"] span {
-        color: #ffffff !important;
-        font-weight: 700 !important;
-        font-size: 16px !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-    }
-    
-    /* Dropdown arrow styling */
-    .stSelectbox [data-baseweb="select"] svg {
-        fill: #ffffff !important;
-        width: 20px !important;
-        height: 20px !important;
-        filter: drop-shadow(1px 1px 2px rgba(0,0,0,0.5)) !important;
-    }
-    
-    /* Focus state for accessibility */
-    .stSelectbox [data-baseweb="select"]:focus-within {
-        outline: 3px solid #e74c3c !important;
-        outline-offset: 2px !important;
-        border-color: #e74c3c !important;
-    }
-    
-    /* Dropdown menu container */
-    .stSelectbox [data-baseweb="popover"] {
-        background: linear-gradient(135deg, #2c3e50 0%, #34495e 100%) !important;
-        border: 2px solid #3498db !important;
-        border-radius: 12px !important;
-        box-shadow: 0 8px 25px rgba(0, 0, 0, 0.4) !important;
-        backdrop-filter: blur(10px) !important;
-    }
-    
-    /* Dropdown options */
-    .stSelectbox [role="option"] {
-        background: transparent !important;
-        color: #ffffff !important;
-        font-weight: 600 !important;
-        font-size: 15px !important;
-        padding: 12px 16px !important;
-        border-radius: 8px !important;
-        margin: 4px 8px !important;
-        transition: all 0.2s ease !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.6) !important;
-    }
-    
-    /* Dropdown option hover state */
-    .stSelectbox [role="option"]:hover {
-        background: linear-gradient(135deg, #e74c3c 0%, #c0392b 100%) !important;
-        color: #ffffff !important;
-        font-weight: 700 !important;
-        transform: translateX(4px) !important;
-        box-shadow: 0 4px 12px rgba(231, 76, 60, 0.3) !important;
-    }
-    
-    /* Selected option highlight */
-    .stSelectbox [role="option"][aria-selected="true"] {
-        background: linear-gradient(135deg, #27ae60 0%, #229954 100%) !important;
-        color: #ffffff !important;
-        font-weight: 700 !important;
-        box-shadow: 0 4px 12px rgba(39, 174, 96, 0.3) !important;
-    }
-    
-    /* Selectbox label styling */
-    .stSelectbox label {
-        color: #ffffff !important;
-        font-weight: 700 !important;
-        font-size: 16px !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-        margin-bottom: 8px !important;
-        display: block !important;
-    }
-    
-    /* Input element (if any) */
-    .stSelectbox input {
-        color: #ffffff !important;
-        font-weight: 700 !important;
-        background: transparent !important;
-    }
-    
-    /* 🌟 SIDEBAR SPECIFIC ENHANCEMENTS */
-    /* Sidebar selectbox with enhanced visibility */
-    .stSidebar .stSelectbox > div {
-        background: linear-gradient(135deg, #1a1a1a 0%, #2d2d2d 100%) !important;
-        border: 2px solid #ffffff !important;
-        border-radius: 12px !important;
-        box-shadow: 0 4px 15px rgba(255, 255, 255, 0.1) !important;
-    }
-    
-    .stSidebar .stSelectbox [data-baseweb="select"] {
-        background: linear-gradient(135deg, #1a1a1a 0%, #2d2d2d 100%) !important;
-        padding: 14px 18px !important;
-        min-height: 50px !important;
-    }
-    
-    .stSidebar .stSelectbox [data-baseweb="select"] > div,
-    .stSidebar .stSelectbox [data-baseweb="select"] span {
-        color: #ffffff !important;
-        font-weight: 800 !important;
-        font-size: 17px !important;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.9) !important;
-        letter-spacing: 0.5px !important;
-    }
-    
-    /* Sidebar hover effect */
-    .stSidebar .stSelectbox > div:hover {
-        border-color: #ff6b6b !important;
-        box-shadow: 0 6px 20px rgba(255, 107, 107, 0.3) !important;
-        transform: scale(1.02) !important;
-    }
-    
-    /* 🎯 UNIVERSAL FALLBACK - FORCE VISIBILITY */
-    /* Apply to any missed selectbox elements */
-    div[data-baseweb="select"] {
-        background: #2c3e50 !important;
-        color: #ffffff !important;
-    }
-    
-    div[data-baseweb="select"] * {
-        color: #ffffff !important;
-        font-weight: 600 !important;
-    }
-    
-    /* Ensure all select-related text is visible */
-    [class*="select"] span,
-    [class*="Select"] span,
-    [data-baseweb*="select"] span {
-        color: #ffffff !important;
-        font-weight: 700 !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.8) !important;
-    }
-      /* 🔧 CRITICAL FIX - SELECTED TEXT VISIBILITY */
-    /* Force selected text to be visible - Most aggressive approach */
-    .stSelectbox [data-baseweb="select"] > div > div {
-        color: #ffffff !important;
-        font-weight: 800 !important;
-        font-size: 16px !important;
-        text-shadow: 2px 2px 4px rgba(0,0,0,1) !important;
-        background: transparent !important;
-        display: flex !important;
-        align-items: center !important;
-    }
-    
-    /* Target the actual text content inside select */
-    .stSelectbox [data-baseweb="select"] [data-baseweb="base-input"] {
-        color: #ffffff !important;
-        font-weight: 800 !important;
-        background: transparent !important;
-    }
-    
-    /* Target any span or text elements in select */
-    .stSelectbox [data-baseweb="select"] span[data-baseweb],
-    .stSelectbox [data-baseweb="select"] div[data-baseweb] {
-        color: #ffffff !important;
-        font-weight: 800 !important;
-        text-shadow: 2px 2px 4px rgba(0,0,0,1) !important;
-    }
-    
-    /* Alternative targeting for selected value display */
-    .stSelectbox div[role="button"] span,
-    .stSelectbox div[role="button"] div {
-        color: #ffffff !important;
-        font-weight: 800 !important;
-        font-size: 16px !important;
-        text-shadow: 2px 2px 4px rgba(0,0,0,1) !important;
-        opacity: 1 !important;
-        visibility: visible !important;
-    }
-    
-    /* Force all text inside selectbox to be white */
-    .stSelectbox * {
-        color: #ffffff !important;
-    }
-    
-    /* Specific fix for Streamlit's select component */
-    .stSelectbox [class*="css"] {
-        color: #ffffff !important;
-        font-weight: 800 !important;
-    }
-    
-    /* Target the value display area specifically */
-    .stSelectbox [data-baseweb="select"] > div:first-child {
-        color: #ffffff !important;
-        font-weight: 800 !important;
-        background: rgba(44, 62, 80, 0.9) !important;
-        padding: 12px 16px !important;
-        border-radius: 8px !important;
-    }
-    
-    /* Ensure placeholder text is also visible */
-    .stSelectbox [data-baseweb="select"] [data-baseweb="input"] {
-        color: #ffffff !important;
-        font-weight: 600 !important;
-    }
-    
-    /* 🎯 SIDEBAR SELECTBOX - ULTRA AGGRESSIVE FIX */
-    .stSidebar .stSelectbox [data-baseweb="select"] > div > div,
-    .stSidebar .stSelectbox [data-baseweb="select"] span,
-    .stSidebar .stSelectbox [data-baseweb="select"] div {
-        color: #ffffff !important;
-        font-weight: 900 !important;
-        font-size: 18px !important;
-        text-shadow: 3px 3px 6px rgba(0,0,0,1) !important;
-        opacity: 1 !important;
-        visibility: visible !important;
-        display: block !important;
-    }
-    
-    /* Force sidebar selectbox background for better contrast */
-    .stSidebar .stSelectbox [data-baseweb="select"] {
-        background: linear-gradient(135deg, #000000 0%, #1a1a1a 100%) !important;
-        border: 3px solid #ffffff !important;
-        color: #ffffff !important;
-        padding: 16px 20px !important;
-        min-height: 55px !important;
-    }    /* Additional fallback for any missed elements */
-    .stSidebar .stSelectbox [role="button"] {
-        color: #ffffff !important;
-        font-weight: 900 !important;
-        background: linear-gradient(135deg, #000000 0%, #1a1a1a 100%) !important;
-    }
-    
-    /* 🚨 NUCLEAR OPTION - FORCE SELECTED TEXT VISIBILITY */
-    /* Target ALL possible text elements in selectbox */
-    .stSelectbox, .stSelectbox *, 
-    .stSelectbox [class*="css"], 
-    .stSelectbox [class*="st-"], 
-    .stSelectbox div, 
-    .stSelectbox span {
-        color: #ffffff !important;
-        font-weight: 900 !important;
-        text-shadow: 3px 3px 6px rgba(0,0,0,1) !important;
-    }
-    
-    /* Force visibility on ALL nested elements */
-    .stSelectbox > div > div > div > div,
-    .stSelectbox > div > div > div > div > div,
-    .stSelectbox > div > div > div > div > div > div {
-        color: #ffffff !important;
-        font-weight: 900 !important;
-        font-size: 16px !important;
-        opacity: 1 !important;
-        visibility: visible !important;
-        display: block !important;
-        text-shadow: 3px 3px 6px rgba(0,0,0,1) !important;
-    }
-    
-    /* Target Streamlit's internal CSS classes */
-    [class*="st-"] {
-        color: #ffffff !important;
-    }
-    
-    /* Force styling on dynamic CSS classes */
-    div[class^="css-"] {
-        color: #ffffff !important;
-        font-weight: 900 !important;
-    }
-    
-    /* 🎯 SIDEBAR NUCLEAR OPTION */
-    .stSidebar .stSelectbox,
-    .stSidebar .stSelectbox *,
-    .stSidebar .stSelectbox [class*="css"],
-    .stSidebar .stSelectbox [class*="st-"],
-    .stSidebar .stSelectbox div,
-    .stSidebar .stSelectbox span {
-        color: #ffffff !important;
-        font-weight: 900 !important;
-        font-size: 18px !important;
-        text-shadow: 4px 4px 8px rgba(0,0,0,1) !important;
-        background: rgba(0,0,0,0.8) !important;
-        opacity: 1 !important;
-        visibility: visible !important;
-    }
-    
-    /* Force ALL sidebar selectbox nested elements */
-    .stSidebar .stSelectbox > div > div > div > div,
-    .stSidebar .stSelectbox > div > div > div > div > div,
-    .stSidebar .stSelectbox > div > div > div > div > div > div,
-    .stSidebar .stSelectbox > div > div > div > div > div > div > div {
-        color: #ffffff !important;
-        font-weight: 900 !important;
-        font-size: 20px !important;
-        text-shadow: 4px 4px 8px rgba(0,0,0,1) !important;
-        opacity: 1 !important;
-        visibility: visible !important;
-        display: block !important;
-        background: rgba(0,0,0,0.9) !important;
-        padding: 2px 4px !important;
-    }
-    
-    /* Force text content to be visible */
-    .stSidebar .stSelectbox::before {
-        content: attr(data-selected-text) !important;
-        color: #ffffff !important;
-        font-weight: 900 !important;
-        font-size: 18px !important;
-        position: absolute !important;
-        z-index: 1000 !important;
-        background: rgba(0,0,0,0.9) !important;
-        padding: 8px !important;
-        border-radius: 4px !important;
-    }
-    
-    /* Override ANY possible hidden styles */
-    .stSelectbox [style*="color"] {
-        color: #ffffff !important;
-    }
-    
-    .stSelectbox [style*="opacity"] {
-        opacity: 1 !important;
-    }
-    
-    .stSelectbox [style*="visibility"] {
-        visibility: visible !important;
-    }
-    
-    /* 🌈 DYNAMIC ACTIVE SECTION INDICATOR GRADIENTS 🌈 */
-    
-    /* Overview Active Indicator - Royal Purple to Electric Blue */
-    .active-section-indicator.overview-active {
-        background: linear-gradient(135deg, 
-            #667eea 0%, 
-            #764ba2 25%, 
-            #5b4cdb 50%, 
-            #667eea 75%, 
-            #764ba2 100%) !important;
-        box-shadow: 
-            0 15px 35px rgba(102, 126, 234, 0.6),
-            0 5px 15px rgba(118, 75, 162, 0.4),
-            inset 0 1px 0 rgba(255, 255, 255, 0.2) !important;
-    }
-    
-    /* Screening Active Indicator - Pink Sunset to Ocean Blue */
-    .active-section-indicator.screening-active {
-        background: linear-gradient(135deg, 
-            #ff6b6b 0%, 
-            #feca57 25%, 
-            #48cae4 50%, 
-            #ff006e 75%, 
-            #4c63d2 100%) !important;
-        box-shadow: 
-            0 15px 35px rgba(255, 107, 107, 0.6),
-            0 5px 15px rgba(254, 202, 87, 0.4),
-            inset 0 1px 0 rgba(255, 255, 255, 0.2) !important;
-    }
-    
-    /* Awareness Active Indicator - Warm Peach to Rose Gold */
-    .active-section-indicator.awareness-active {
-        background: linear-gradient(135deg, 
-            #ff9a56 0%, 
-            #ffad56 25%, 
-            #ff6b9d 50%, 
-            #c44569 75%, 
-            #f8b500 100%) !important;
-        box-shadow: 
-            0 15px 35px rgba(255, 154, 86, 0.6),
-            0 5px 15px rgba(196, 69, 105, 0.4),
-            inset 0 1px 0 rgba(255, 255, 255, 0.2) !important;
-    }
-    
-    /* Analysis Active Indicator - Mint to Lavender Dream */
-    .active-section-indicator.analysis-active {
-        background: linear-gradient(135deg, 
-            #a8edea 0%, 
-            #fed6e3 25%, 
-            #a8e6cf 50%, 
-            #dda0dd 75%, 
-            #98fb98 100%) !important;
-        box-shadow: 
-            0 15px 35px rgba(168, 237, 234, 0.6),
-            0 5px 15px rgba(221, 160, 221, 0.4),
-            inset 0 1px 0 rgba(255, 255, 255, 0.2) !important;
-    }
-    
-    /* Statistics Active Indicator - Golden Hour to Purple Magic */
-    .active-section-indicator.statistics-active {
-        background: linear-gradient(135deg, 
-            #f7971e 0%, 
-            #ffd200 25%, 
-            #9c88ff 50%, 
-            #5f27cd 75%, 
-            #ff9ff3 100%) !important;
-        box-shadow: 
-            0 15px 35px rgba(247, 151, 30, 0.6),
-            0 5px 15px rgba(95, 39, 205, 0.4),
-            inset 0 1px 0 rgba(255, 255, 255, 0.2) !important;
-    }
-    
-    /* Recommendations Active Indicator - Ocean Breeze to Sky */
-    .active-section-indicator.recommendations-active {
-        background: linear-gradient(135deg, 
-            #00d2ff 0%, 
-            #3a7bd5 25%, 
-            #928dab 50%, 
-            #00d2ff 75%, 
-            #3a7bd5 100%) !important;
-        box-shadow: 
-            0 15px 35px rgba(0, 210, 255, 0.6),
-            0 5px 15px rgba(58, 123, 213, 0.4),
-            inset 0 1px 0 rgba(255, 255, 255, 0.2) !important;
-    }
-    
-    /* Card content styling */
-    .nav-card-emoji {
-        font-size: 32px;
-        display: block;
-        margin-bottom: 10px;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        animation: bounce 2s ease-in-out infinite;
-    }
-    
-    .nav-card-text {
-        font-size: 15px;
-        font-weight: 800;
-        text-transform: uppercase;
-        letter-spacing: 1.5px;
-        line-height: 1.3;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.5);
-    }
-    
-    @keyframes bounce {
-        0%, 20%, 50%, 80%, 100% {
-            transform: translateY(0);
-        }
-        40% {
-            transform: translateY(-3px);
-        }
-        60% {
-            transform: translateY(-2px);
-        }
-    }
-    
-    /* 🎯 BEAUTIFUL ACTIVE SECTION INDICATOR - MATCHING YOUR IMAGE STYLE 🎯 */
-    .active-section-indicator {
-        background: linear-gradient(135deg, 
-            #7c3aed 0%, 
-            #a855f7 25%, 
-            #3b82f6 50%, 
-            #6366f1 75%, 
-            #8b5cf6 100%);
-        background-size: 300% 300%;
-        border: 3px solid rgba(255, 255, 255, 0.3);
-        border-radius: 20px;
-        padding: 20px;
-        margin: 25px 0;
-        text-align: center;
-        color: #ffffff;
-        font-weight: 900;
-        font-size: 16px;
-        text-shadow: 2px 2px 6px rgba(0,0,0,0.8);
-        box-shadow: 
-            0 15px 35px rgba(124, 58, 237, 0.4),
-            0 5px 15px rgba(59, 130, 246, 0.3),
-            inset 0 1px 0 rgba(255, 255, 255, 0.2);
-        animation: activeIndicatorGlow 4s ease-in-out infinite, activeGradientFlow 6s ease infinite;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .active-section-indicator::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, 
-            transparent, 
-            rgba(255, 255, 255, 0.2), 
-            transparent);
-        animation: shimmer 3s ease-in-out infinite;
-    }
-    
-    @keyframes activeIndicatorGlow {
-        0%, 100% {
-            box-shadow: 
-                0 15px 35px rgba(124, 58, 237, 0.4),
-                0 5px 15px rgba(59, 
-                element.style.setProperty('text-shadow', '4px 4px 8px rgba(0,0,0,1)', 'important');
-                element.style.setProperty('background', 'rgba(0,0,0,0.9)', 'important');
-            });
-        });
-        
-        console.log('✅ Selectbox text visibility forced!');
-    }
-    
-    // Run immediately
-    forceSelectboxVisibility();
-    
-    // Run again after a delay to catch dynamic content
-    setTimeout(forceSelectboxVisibility, 1000);
-    setTimeout(forceSelectboxVisibility, 3000);
-    
-    // Run whenever the page updates
-    const observer = new MutationObserver(function(mutations) {
-        mutations.forEach(function(mutation) {
-            if (mutation.type === 'childList') {
-                forceSelectboxVisibility();
-            }
-        });
-    });
-    
-    observer.observe(document.body, {
-        childList: true,
-        subtree: true
-    });
-});
+import survey_analytics
+
+# Configure page
+st.set_page_config(
+    page_title="📊 Cervical Cancer Screening Analytics",
+    page_icon="🏥",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# 🎨 Static assets (stylesheet) live in ./static and are served by Streamlit
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+@functools.lru_cache(maxsize=None)
+def read_static_asset(name):
+    """Return a static asset's text and a short content fingerprint for cache busting"""
+    with open(os.path.join(STATIC_DIR, name), encoding="utf-8") as fh:
+        text = fh.read()
+    return text, hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+def inject_static_assets():
+    """Link the fingerprinted stylesheet, inlining it only when static serving is off"""
+    css, css_version = read_static_asset("dashboard.css")
+    if st.get_option("server.enableStaticServing"):
+        st.markdown(f'<link rel="stylesheet" href="app/static/dashboard.css?v={css_version}">', unsafe_allow_html=True)
+    else:
+        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+
+# Custom CSS for styling with beautiful background
+inject_static_assets()
+
+logger = logging.getLogger(__name__)
+
+# 💾 On-disk snapshot of the preprocessed frame, keyed by the source CSV's content hash
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".dashboard_cache")
+SNAPSHOT_VERSION = 3  # Bump whenever preprocess_data changes its output
+
+def file_digests(path, prefix_size=0, chunk_size=1 << 20):
+    """SHA-256 of a file's bytes and of its first prefix_size bytes in one read, plus the bytes hashed"""
+    digest = hashlib.sha256()
+    prefix_digest, read = None, 0
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            if prefix_digest is None and read + len(chunk) >= prefix_size > 0:
+                head = digest.copy()
+                head.update(chunk[:prefix_size - read])
+                prefix_digest = head.hexdigest()
+            digest.update(chunk)
+            read += len(chunk)
+    return digest.hexdigest(), prefix_digest, read
+
+def snapshot_path(digest):
+    """Parquet snapshot location for a given source digest"""
+    return os.path.join(SNAPSHOT_DIR, f"preprocessed-v{SNAPSHOT_VERSION}-{digest[:20]}.parquet")
+
+def read_snapshot(digest):
+    """Memory-map a cached preprocessed frame, or return None if unavailable"""
+    path = snapshot_path(digest)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path, engine="pyarrow", memory_map=True)
+    except Exception:
+        # Missing pyarrow or a corrupt/partial file - fall back to a full parse
+        return None
+    # Parquet drops the categorical dtype on non-string columns such as lev
+    return apply_schema(df)
+
+def write_snapshot(df, digest):
+    """Persist the preprocessed frame atomically; failures are non-fatal"""
+    path = snapshot_path(digest)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        df.to_parquet(tmp_path, engine="pyarrow", index=False)
+        os.replace(tmp_path, path)
+    except Exception as exc:
+        # Read-only filesystem or pyarrow not installed - keep serving from memory
+        logger.warning("Could not write preprocessed snapshot %s: %s", path, exc)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def cells_path(digest):
+    """Location of the uptake model's sufficient statistics for a given source digest"""
+    return os.path.join(SNAPSHOT_DIR, f"cells-v{SNAPSHOT_VERSION}-{digest[:20]}.pkl")
+
+def read_cells(digest):
+    """Load persisted sufficient statistics, or None if unavailable"""
+    try:
+        return pd.read_pickle(cells_path(digest))
+    except Exception:
+        return None
+
+def write_cells(cells, digest):
+    """Persist sufficient statistics atomically; failures are non-fatal"""
+    path = cells_path(digest)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        pd.to_pickle(cells, tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as exc:
+        logger.warning("Could not write sufficient statistics %s: %s", path, exc)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
-// Also run when Streamlit reloads components
-window.addEventListener('load', function() {
-    setTimeout(function() {
-        console.log('🔄 Page loaded - forcing selectbox visibility again...');
-        document.querySelectorAll('.stSelectbox *').forEach(function(el) {
-            el.style.setProperty('color', '#ffffff', 'important');
-            el.style.setProperty('font-weight', '900', 'important');
-            el.style.setProperty('opacity', '1', 'important');
-            el.style.setProperty('visibility', 'visible', 'important');
-        });
-    }, 2000);
-});
-</script>
-""", unsafe_allow_html=True)
+def source_manifest_path(data_path):
+    """Manifest recording the size and digest of the last snapshot taken of a CSV"""
+    key = hashlib.sha256(os.path.abspath(data_path).encode("utf-8")).hexdigest()[:20]
+    return os.path.join(SNAPSHOT_DIR, f"source-v{SNAPSHOT_VERSION}-{key}.json")
 
-@st.cache_data
-def load_data():
-    """Load and preprocess the cervical cancer dataset"""
+def read_source_manifest(data_path):
+    """Last recorded {'size', 'digest'} for a CSV, or None"""
+    try:
+        with open(source_manifest_path(data_path), encoding="utf-8") as fh:
+            return json.load(fh)
+    except Exception:
+        return None
+
+def write_source_manifest(data_path, size, digest):
+    """Record the snapshot's source size and digest; failures are non-fatal"""
+    path = source_manifest_path(data_path)
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({'size': size, 'digest': digest}, fh)
+    except Exception as exc:
+        # Without a manifest the next run cannot take the append path and re-reads the whole CSV
+        logger.warning("Could not write source manifest %s: %s", path, exc)
+
+def text_column_dtypes(df):
+    """Parse dtypes that keep a CSV fragment's text columns as strings, like the full-file parse did
+
+    A fragment whose amtpaid values happen to be all digits would otherwise be inferred as integers,
+    splitting categories into 10 vs '10' and leaving a mixed-type column pyarrow cannot write.
+    """
+    values = {col: df[col].cat.categories if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col] for col in df.columns}
+    return {col: str for col, series in values.items() if not pd.api.types.is_numeric_dtype(series.dtype)}
+
+def load_appended(data_path, previous, size, digest):
+    """Extend the previous snapshot with rows appended to the CSV since, preprocessing only the new rows"""
+    base = read_snapshot(previous['digest'])
+    if base is None:
+        return None
+    with open(data_path, "rb") as fh:
+        header = fh.readline()
+        fh.seek(previous['size'] - 1)
+        if fh.read(1) != b"\n":
+            return None  # The last row was still being written when the snapshot was taken
+        tail = fh.read(size - previous['size'])
+    new_rows = preprocess_data(pd.read_csv(io.BytesIO(header + tail), dtype=text_column_dtypes(base)))
+    df = apply_schema(pd.concat([base, new_rows], ignore_index=True))
+    write_snapshot(df, digest)
+
+    # Fold the new rows into the model's sufficient statistics instead of recounting every row
+    cells = read_cells(previous['digest'])
+    cells = survey_analytics.update_sufficient_stats(cells, new_rows) if cells is not None else survey_analytics.sufficient_stats(df)
+    write_cells(cells, digest)
+    return df
+
+def load_preprocessed(data_path):
+    """Load the preprocessed frame for a CSV, reusing the on-disk snapshot when the bytes match
+    and preprocessing only the appended rows when the file has grown since the last snapshot"""
+    previous = read_source_manifest(data_path)
+    digest, prefix_digest, size = file_digests(data_path, previous['size'] if previous else 0)
+    df = read_snapshot(digest)
+    if df is None and previous and size > previous['size'] and prefix_digest == previous['digest']:
+        df = load_appended(data_path, previous, size, digest)
+    if df is None:
+        df = preprocess_data(pd.read_csv(data_path))
+        write_snapshot(df, digest)
+        write_cells(survey_analytics.sufficient_stats(df), digest)
+    write_source_manifest(data_path, size, digest)
+    df.attrs['dataset_hash'] = digest
+    return df
+
+def data_source_signature(data_path="cervical cancer_csv.csv"):
+    """Size and modification time of the local CSV, so appended responses invalidate the data cache"""
+    try:
+        stat = os.stat(data_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def find_csv(directory):
+    """Return the first CSV file found under a directory"""
+    for root, _, files in os.walk(directory):
+        for file in files:
+            if file.endswith(".csv"):
+                return os.path.join(root, file)
+    return None
+
+@st.cache_data(max_entries=2)
+def load_data(source_signature=None):
+    """Load and preprocess the cervical cancer dataset (re-run when the local CSV's signature changes)"""
     try:
         # First try to load the local CSV file
         local_csv_path = "cervical cancer_csv.csv"
         if os.path.exists(local_csv_path):
-            df = pd.read_csv(local_csv_path)
-            return preprocess_data(df)
+            return load_preprocessed(local_csv_path)
         
         # Fallback: Check if running locally or in cloud
         is_kaggle = "KAGGLE_KERNEL_RUN_TYPE" in os.environ
@@ -2253,21 +225,15 @@ def load_data():
             # Download dataset using kagglehub as fallback
             dataset_name = "promisebansah/cervical-cancer-survey-ghana-female-students"
             dataset_dir = kagglehub.dataset_download(dataset_name)
-            
-            # Find CSV file
-            data_path = None
-            for root, _, files in os.walk(dataset_dir):
-                for file in files:
-                    if file.endswith(".csv"):
-                        data_path = os.path.join(root, file)
-                        break
         else:
-            data_path = "/kaggle/input/cervical-cancer-survey-ghana-female-students"
+            dataset_dir = "/kaggle/input/cervical-cancer-survey-ghana-female-students"
+        
+        # Find CSV file
+        data_path = find_csv(dataset_dir)
         
         # Load the dataset
         if data_path:
-            df = pd.read_csv(data_path)
-            return preprocess_data(df)
+            return load_preprocessed(data_path)
         else:
             st.error("Dataset not found. Please ensure the dataset is available.")
             return None
@@ -2275,211 +241,460 @@ def load_data():
         st.error(f"Error loading data: {str(e)}")
         return None
 
+# 🧮 Declarative Likert recoding spec: column -> 'forward' (agree = A) or 'reverse' (agree = D)
+LIKERT_LEVELS = ['SD', 'D', 'A', 'SA']
+KNOWLEDGE_LEVELS = ['D', 'A']  # Recoded items: code 0 = disagree/poor, 1 = agree/good
+LIKERT_RECODING_CODES = {
+    'forward': [-1, 0, 0, 1, 1],  # Leading slot catches missing/unknown responses
+    'reverse': [-1, 1, 1, 0, 0],
+}
+LIKERT_RECODING = {
+    # Risk factors
+    'multiple_sexual_partners': 'forward',
+    'age_factor': 'forward',
+    'hereditary_risk': 'forward',
+    'unprotected_sex': 'forward',
+    # Symptoms
+    'abnormal_menstrual_bleeding': 'forward',
+    'general_body_pain': 'forward',
+    'intermenstrual_bleeding': 'forward',
+    'vaginal_itching': 'forward',
+    'foul_vaginal_discharge': 'forward',
+    'postmenopausal_bleeding': 'forward',
+    'unexplained_weight_loss': 'forward',
+    'persistent_diarrhea': 'forward',
+    'blood_in_stool': 'forward',
+    'persistent_pelvic_pain': 'forward',
+    'bleeding_during_sex': 'forward',
+    # Screening knowledge
+    'knows_screening_center': 'reverse',
+    'screen_from_age_21': 'reverse',
+    'screen_every_2_years': 'reverse',
+    'screening_for_healthy': 'reverse',
+    'screening_for_early_detection': 'reverse',
+    'detection_can_prevent_cancer': 'reverse',
+    'regular_screening_helps_detection': 'reverse',
+    # Screening methods
+    'visual_is_one_method': 'forward',
+    'visual_only_method': 'reverse',
+    'visual_is_easiest_method': 'forward',
+    'visual_at_any_level': 'forward',
+}
+
+# 🗂️ Categorical schema for the non-recoded survey columns (first level = reference group)
+YES_NO_LEVELS = ['no', 'yes']
+SURVEY_SCHEMA = {
+    # Outcome, awareness and attitude items
+    'Uptake': YES_NO_LEVELS,
+    'eva_told_to_scrn': YES_NO_LEVELS,
+    'aware_of_scrn_centa': YES_NO_LEVELS,
+    'giv_oportu_to_scrn': YES_NO_LEVELS,
+    'permis_to_scrn': YES_NO_LEVELS,
+    'painful_scrn': YES_NO_LEVELS,
+    # Demographics
+    'agegrp': ['20-25years', '<20years', '>25years'],
+    'marital': ['married', 'single'],
+    'lev': [100, 200, 300, 400],
+    'reli': ['christian', 'muslim'],
+    'affiliation': ['FRANCO', 'MIDWIERY', 'TERESCO', 'UHAS'],
+    # Prevention items are kept on the raw Likert scale
+    'cancer_preventable': LIKERT_LEVELS,
+    'vaccination_prevents_cancer': LIKERT_LEVELS,
+    'screening_reduces_risk': LIKERT_LEVELS,
+    'condom_reduces_risk': LIKERT_LEVELS,
+}
+
+def recode_likert(df, spec=LIKERT_RECODING):
+    """Apply a Likert recoding spec to every listed column in one vectorized pass"""
+    cols = [col for col in spec if col in df.columns]
+    if not cols:
+        return df
+    
+    # Stack all items into one categorical code matrix (-1 = missing/unknown)
+    stacked = df[cols].to_numpy(dtype=object).ravel()
+    codes = pd.Categorical(stacked, categories=LIKERT_LEVELS).codes.reshape(len(df), len(cols))
+    
+    # One lookup-table row per column, indexed by code + 1
+    lookup = np.array([LIKERT_RECODING_CODES[spec[col]] for col in cols], dtype=np.int8)
+    recoded = lookup[np.arange(len(cols)), codes + 1]
+    
+    df[cols] = pd.DataFrame({
+        col: pd.Categorical.from_codes(recoded[:, i], categories=KNOWLEDGE_LEVELS)
+        for i, col in enumerate(cols)
+    }, index=df.index)
+    return df
+
+def apply_schema(df, schema=SURVEY_SCHEMA):
+    """Store schema columns as pd.Categorical with fixed category orders"""
+    for col, levels in schema.items():
+        if col not in df.columns:
+            continue
+        # Keep unexpected levels (e.g. new sites) rather than silently nulling them
+        observed = df[col].dropna().unique()
+        extra = sorted((value for value in observed if value not in levels), key=str)
+        df[col] = pd.Categorical(df[col], categories=list(levels) + extra)
+    return df
+
 def preprocess_data(df):
     """Preprocess the dataset for analysis"""
-    # Create copy
-    ccan = df.copy()
-    
-    # Process risk factors
-    risk_factors_cols = ['multiple_sexual_partners', 'age_factor', 'hereditary_risk', 'unprotected_sex']
-    risk_factors = ccan[risk_factors_cols].copy()
-    
-    # Recode risk factors
-    map_risk_factors = {'SD': 'D', 'D': 'D', 'A': 'A', 'SA': 'A'}
-    for col in risk_factors_cols:
-        risk_factors[col] = risk_factors[col].map(map_risk_factors)
-        ccan[col] = risk_factors[col]
-    
-    # Process symptoms
-    symptoms_cols = ['abnormal_menstrual_bleeding', 'general_body_pain', 'intermenstrual_bleeding', 
-                    'vaginal_itching', 'foul_vaginal_discharge', 'postmenopausal_bleeding',
-                    'unexplained_weight_loss', 'persistent_diarrhea', 'blood_in_stool',
-                    'persistent_pelvic_pain', 'bleeding_during_sex']
-    
-    map_symptoms = {'SD': 'D', 'D': 'D', 'A': 'A', 'SA': 'A'}
-    for col in symptoms_cols:
-        if col in ccan.columns:
-            ccan[col] = ccan[col].map(map_symptoms)
-    
-    # Process screening knowledge
-    screening_cols = ['knows_screening_center', 'screen_from_age_21', 'screen_every_2_years',
-                     'screening_for_healthy', 'screening_for_early_detection',
-                     'detection_can_prevent_cancer', 'regular_screening_helps_detection']
-    
-    # Special handling for screen_every_2_years (reverse coding)
-    ccan['screen_every_2_years'] = ccan['screen_every_2_years'].replace({'SD': 'A', 'D': 'A', 'A': 'D', 'SA': 'D'})
-    
-    map_screening = {'SD': 'A', 'D': 'A', 'A': 'D', 'SA': 'D'}
-    for col in screening_cols:
-        if col in ccan.columns and col != 'screen_every_2_years':
-            ccan[col] = ccan[col].map(map_screening)
-    
-    # Process screening methods
-    methods_cols = ['visual_is_one_method', 'visual_only_method', 'visual_is_easiest_method', 'visual_at_any_level']
-    
-    # Special handling for visual_only_method
-    ccan['visual_only_method'] = ccan['visual_only_method'].replace({'SD': 'A', 'D': 'A', 'A': 'D', 'SA': 'D'})
+    return apply_schema(recode_likert(df.copy()))
+
+# 🔎 Candidate predictors for univariable screening: demographics, awareness/attitude and knowledge items
+UPTAKE_CANDIDATES = [
+    'agegrp', 'marital', 'lev', 'reli', 'affiliation',
+    'eva_told_to_scrn', 'aware_of_scrn_centa', 'giv_oportu_to_scrn', 'permis_to_scrn', 'painful_scrn',
+] + list(LIKERT_RECODING)
+
+# 📚 Knowledge domains (recoded A/D items) shared by the knowledge section and the psychometric engines
+KNOWLEDGE_DOMAINS = {
+    'Risk Factors': ['multiple_sexual_partners', 'age_factor', 'hereditary_risk', 'unprotected_sex'],
+    'Symptoms': ['abnormal_menstrual_bleeding', 'general_body_pain', 'intermenstrual_bleeding',
+                 'vaginal_itching', 'foul_vaginal_discharge', 'postmenopausal_bleeding'],
+    'Screening': ['knows_screening_center', 'screen_from_age_21', 'screening_for_healthy',
+                  'screening_for_early_detection', 'detection_can_prevent_cancer'],
+}
+
+# 🧠 Binary A/D items scaled by the IRT engine. The items LIKERT_RECODING reverse-codes load negatively on
+# the latent trait in their recoded form, so the IRT engine keys them to raw agreement instead (recoded 'D'
+# counts as the IRT response); otherwise their 2PL slopes come out negative
+IRT_ITEMS = list(LIKERT_RECODING)
+IRT_AGREEMENT_KEYED = [item for item, direction in LIKERT_RECODING.items() if direction == 'reverse']
+
+# 🎲 Bootstrap settings: demographic breakdowns plus the modeled predictors
+BOOTSTRAP_COLUMNS = ['agegrp', 'marital', 'lev', 'affiliation', 'eva_told_to_scrn', 'aware_of_scrn_centa']
+BOOTSTRAP_REPLICATES = 2000
+BOOTSTRAP_SEED = 2024
+
+# 🎯 Cross-validation settings for the predictive model
+CV_FOLDS = 5
+CV_SEED = 2024
+
+# 🧩 Multiple imputation settings: outcome plus every candidate predictor, M completed datasets
+IMPUTATION_COLUMNS = ['Uptake'] + UPTAKE_CANDIDATES
+IMPUTATIONS = 5
+IMPUTATION_SEED = 2024
+
+# 🏫 Cluster-robust inference: respondents are clustered within institutions
+CLUSTER_COLUMN = 'affiliation'
+WILD_BOOTSTRAP_REPLICATES = 9999  # Capped at the 6^G distinct Webb weight vectors for few clusters
+WILD_BOOTSTRAP_SEED = 2024
+
+# 🎚️ What-if simulator: levers planners can move, the covariates held fixed, and subgroup choices
+INTERVENTION_LEVERS = {
+    'eva_told_to_scrn': "Ever told to screen",
+    'aware_of_scrn_centa': "Aware of a screening centre",
+    'giv_oportu_to_scrn': "Given the opportunity to screen",
+}
+INTERVENTION_COVARIATES = ['agegrp', 'affiliation', 'lev']
+INTERVENTION_GROUPS = {"Institution": 'affiliation', "Age Group": 'agegrp', "Level of Study": 'lev'}
+INTERVENTION_STEPS = np.arange(0, 105, 5)  # Dose-response grid of percentage-point increases
+
+# 🪶 Small-area estimation: subgroup columns whose uptake can be shrunk toward the pooled rate
+SHRINKAGE_COLUMNS = ['lev', 'affiliation']
+
+# 📐 Power planning grids for the next survey wave (cluster size 1 = no clustering)
+POWER_RR_GRID = np.round(np.arange(1.1, 3.01, 0.1), 2)
+POWER_BASELINE_GRID = np.round(np.arange(0.05, 0.51, 0.01), 2)
+POWER_CLUSTER_SIZES = [1, 25, 50, 100, 200]
+POWER_CLUSTER_COUNTS = [4, 6, 8, 10, 15, 20, 30, 40]
+POWER_SIM_RRS = [1.25, 1.5, 2.0, 3.0]
+POWER_SIMULATIONS = 1000
+POWER_SEED = 2024
+
+def dataset_version(df):
+    """Content hash identifying the loaded dataset, used to key per-version caches"""
+    digest = df.attrs.get('dataset_hash')
+    if digest is None:
+        digest = hashlib.sha256(pd.util.hash_pandas_object(df, index=True).values.tobytes()).hexdigest()
+        df.attrs['dataset_hash'] = digest
+    return digest
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def build_stats_cube(_df, version):
+    """Marginal counts for every column plus crosstabs against Uptake, built once per dataset version"""
+    # Shared by reference across reruns and sessions (no unpickling per lookup), so callers must not mutate it
+    df = _df
+    cube = {'n': len(df), 'counts': {}, 'pct': {}, 'by_uptake': {}, 'by_uptake_pct': {}, 'means': {}}
+    
+    for col in df.columns:
+        counts = df[col].value_counts()
+        cube['counts'][col] = counts
+        cube['pct'][col] = counts / counts.sum() * 100 if counts.sum() > 0 else counts.astype(float)
+        if pd.api.types.is_numeric_dtype(df[col]):
+            cube['means'][col] = df[col].mean()
     
-    map_methods = {'SD': 'D', 'D': 'D', 'A': 'A', 'SA': 'A'}
-    for col in methods_cols:
-        if col in ccan.columns and col != 'visual_only_method':
-            ccan[col] = ccan[col].map(map_methods)
+    if 'Uptake' in df.columns:
+        # Every crosstab against Uptake is a slice of one (column x level x Uptake) count tensor
+        crosstab_cols = [col for col in df.columns if col not in ('Uptake', 'age')]
+        tensor, levels = survey_analytics.contingency_tensor(df, crosstab_cols)
+        cube['tensor'] = (crosstab_cols, tensor, levels)
+        for j, col in enumerate(crosstab_cols):
+            ct = pd.DataFrame(
+                tensor[j, :len(levels[j])],
+                index=pd.Index(levels[j], name=col),
+                columns=pd.Index(['no', 'yes'], name='Uptake')
+            )
+            ct = ct.loc[ct.sum(axis=1) > 0]  # Drop unobserved schema levels
+            cube['by_uptake'][col] = ct
+            cube['by_uptake_pct'][col] = ct.div(ct.sum(axis=1), axis=0) * 100
     
-    return ccan
+    return cube
+
+def get_stats_cube(df):
+    """Shared, read-only summary-statistics cube for the section renderers"""
+    return build_stats_cube(df, dataset_version(df))
+
+def yes_rate(cube, col):
+    """Percentage answering 'yes' for a column, 0 when the column is absent"""
+    return cube['pct'][col].get('yes', 0) if col in cube['pct'] else 0
+
+# 🖼️ Figure factory: validated Plotly figures memoized per (dataset version, section, theme, chart)
+FIGURE_THEME = "gradient"  # Bump when chart styling changes so cached figures are rebuilt
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def _memoized_figure(version, section, theme, name, _build):
+    """Run a figure builder once per cache key"""
+    return _build()
+
+def cached_figure(df, section, name, build):
+    """Return the cached figure for a chart, building it on first use"""
+    # Figures are shared across sessions and reruns, so callers must not mutate them
+    return _memoized_figure(dataset_version(df), section, FIGURE_THEME, name, build)
+
+# 📈 Fitted model caches (keyed by dataset version and persisted to disk, so restarts never refit)
+@st.cache_data(persist="disk", show_spinner="Fitting modified Poisson models...")
+def fit_uptake_models(_df, version, cov_type='HC0'):
+    """Crude and adjusted modified Poisson risk ratios for the key uptake predictors"""
+    return survey_analytics.modified_poisson_table(_df, cov_type=cov_type, cells=read_cells(version))
+
+@st.cache_data(persist="disk", show_spinner="Running likelihood-ratio model selection...")
+def run_model_selection(_df, version, direction='both'):
+    """Stepwise selection (logistic LR tests) over every candidate predictor, plus the modified Poisson refit of the selected model"""
+    selected, log, n = survey_analytics.stepwise_select(_df, UPTAKE_CANDIDATES, direction=direction, family='logistic')
+    table = survey_analytics.modified_poisson_table(_df, selected) if selected else pd.DataFrame()
+    return selected, log, n, table
+
+@st.cache_data(persist="disk", show_spinner="Cross-validating the uptake prediction model...")
+def fit_uptake_predictor(_df, version, k=CV_FOLDS, seed=CV_SEED):
+    """Ridge logistic uptake model with nested k-fold out-of-fold predictions, AUC and calibration"""
+    return survey_analytics.cross_validated_model(_df, UPTAKE_CANDIDATES, k=k, seed=seed)
+
+@st.cache_data(persist="disk", show_spinner=False)
+def fit_model_diagnostics(_df, version):
+    """VIF and generalized VIF for the adjusted uptake model design"""
+    return survey_analytics.collinearity_diagnostics(_df)
+
+@st.cache_data(persist="disk", show_spinner="Computing cluster-robust errors...")
+def fit_cluster_robust(_df, version, n_boot=WILD_BOOTSTRAP_REPLICATES, seed=WILD_BOOTSTRAP_SEED):
+    """Adjusted risk ratios with CR1 and wild cluster bootstrap inference by institution"""
+    return survey_analytics.cluster_robust_table(
+        _df, survey_analytics.UPTAKE_PREDICTORS, cluster=CLUSTER_COLUMN, n_boot=n_boot, seed=seed
+    )
+
+@st.cache_data(persist="disk", show_spinner="Fitting the intervention model...")
+def fit_intervention_model(_df, version, group):
+    """Uptake predictions per cell for every combination of levers switched on, by subgroup"""
+    return survey_analytics.intervention_model(_df, list(INTERVENTION_LEVERS), INTERVENTION_COVARIATES, group)
+
+@st.cache_data(persist="disk", show_spinner="Estimating the effect of being told to screen...")
+def estimate_told_effect(_df, version, n_boot=BOOTSTRAP_REPLICATES, seed=BOOTSTRAP_SEED):
+    """IPW and propensity-matched effect of being told to screen on uptake, with bootstrap CIs"""
+    return survey_analytics.propensity_analysis(_df, 'eva_told_to_scrn', n_boot=n_boot, seed=seed)
+
+@st.cache_data(persist="disk", show_spinner="Decomposing the awareness pathway...")
+def estimate_pathway_mediation(_df, version, n_boot=BOOTSTRAP_REPLICATES, seed=BOOTSTRAP_SEED):
+    """Direct and opportunity-mediated effects of awareness on uptake, with bootstrap CIs"""
+    return survey_analytics.mediation_analysis(_df, 'aware_of_scrn_centa', 'giv_oportu_to_scrn', n_boot=n_boot, seed=seed)
+
+@st.cache_data(show_spinner=False)
+def shrink_subgroup_uptake(_df, version, groups):
+    """Empirical-Bayes shrunken uptake for every observed combination of the group columns"""
+    return survey_analytics.shrink_uptake(_df, list(groups))
+
+@st.cache_data(show_spinner=False)
+def estimate_uptake_icc(_df, version):
+    """Between-institution intraclass correlation of uptake"""
+    return survey_analytics.intraclass_correlation(_df, CLUSTER_COLUMN)
+
+@st.cache_data(persist="disk", show_spinner="Simulating power for clustered designs...")
+def simulate_cluster_power(baseline, icc, power_rrs=tuple(POWER_SIM_RRS), n_sims=POWER_SIMULATIONS, seed=POWER_SEED):
+    """Simulated CR1 test power over (RR x cluster size x number of institutions) at one baseline"""
+    return survey_analytics.simulated_power(
+        list(power_rrs), [baseline], POWER_CLUSTER_SIZES[1:], POWER_CLUSTER_COUNTS,
+        icc=icc, n_sims=n_sims, seed=seed
+    )[:, 0]
+
+@st.cache_data(show_spinner="Screening all candidate predictors...")
+def fit_candidate_screen(_df, version, family='poisson', cov_type='HC0'):
+    """Crude model for every candidate predictor, fitted in parallel for large datasets"""
+    return survey_analytics.fit_univariable_batch(_df, UPTAKE_CANDIDATES, family=family, cov_type=cov_type)
+
+@st.cache_data(show_spinner="Bootstrapping confidence intervals...")
+def bootstrap_uptake_cis(_df, version, seed=BOOTSTRAP_SEED, n_boot=BOOTSTRAP_REPLICATES):
+    """Percentile bootstrap CIs for uptake rates and crude RRs, drawn once per dataset version"""
+    return survey_analytics.bootstrap_uptake(_df, BOOTSTRAP_COLUMNS, n_boot=n_boot, seed=seed)
+
+def get_bootstrap_cis(df, col):
+    """Bootstrap rows for one column indexed by level (empty if the column was not resampled)"""
+    boot = bootstrap_uptake_cis(df, dataset_version(df))
+    if boot.empty:
+        return boot
+    return boot[boot['Column'] == col].set_index('Level')
+
+@st.cache_data(show_spinner=False)
+def run_association_tests(_df, version):
+    """Chi-square/Fisher tests of every candidate predictor against Uptake, corrected over the whole family"""
+    columns, tensor, levels = get_stats_cube(_df)['tensor']
+    rows = [columns.index(col) for col in UPTAKE_CANDIDATES if col in columns]
+    return survey_analytics.association_tests(tensor[rows], [levels[j] for j in rows], [columns[j] for j in rows])
+
+@st.cache_data(show_spinner=False)
+def compute_reliability(_df, version):
+    """Cronbach's alpha and item statistics for every knowledge domain"""
+    return survey_analytics.reliability_analysis(_df, KNOWLEDGE_DOMAINS)
+
+@st.cache_data(show_spinner="Scoring latent knowledge...")
+def fit_knowledge_irt(_df, version, model='2pl'):
+    """IRT item parameters and per-respondent ability scores for the knowledge items"""
+    return survey_analytics.fit_irt(_df, IRT_ITEMS, model=model, reverse=IRT_AGREEMENT_KEYED)
+
+@st.cache_data(show_spinner=False)
+def ability_uptake_effect(_df, version, model='2pl'):
+    """Uptake risk ratio per 1 SD of IRT ability"""
+    _, abilities = fit_knowledge_irt(_df, version, model)
+    return survey_analytics.ability_risk_ratio(_df, abilities['Ability'])
+
+@st.cache_resource(show_spinner="Imputing missing responses...", max_entries=4)
+def _imputed_datasets(version, m, seed, _df):
+    """Completed copies of the analysis columns, shared read-only across sections and sessions"""
+    return survey_analytics.multiple_imputation(_df, IMPUTATION_COLUMNS, m=m, seed=seed)
+
+def get_imputations(df):
+    """The M imputed datasets for the loaded data (callers must not mutate them)"""
+    return _imputed_datasets(dataset_version(df), IMPUTATIONS, IMPUTATION_SEED, df)
+
+@st.cache_data(persist="disk", show_spinner="Pooling imputed models...")
+def fit_imputed_models(_df, version, cov_type='HC0'):
+    """Adjusted risk ratios refitted on every imputed dataset and pooled with Rubin's rules"""
+    return survey_analytics.pooled_risk_ratios(get_imputations(_df), cov_type=cov_type)
+
+def format_risk_ratio(row, prefix):
+    """Format 'RR (lower-upper)' for a results row, or the reference marker"""
+    if row['Reference']:
+        return "1.00 (ref)"
+    rr = row.get(f'{prefix} RR', np.nan)
+    if pd.isna(rr):
+        return "—"
+    return f"{rr:.2f} ({row[f'{prefix} CI Lower']:.2f}–{row[f'{prefix} CI Upper']:.2f})"
+
+def format_bootstrap_ratio(boot_row):
+    """Format 'RR (lower-upper)' from a bootstrap row, or the reference marker"""
+    if boot_row is None or pd.isna(boot_row['RR']):
+        return "—"
+    if boot_row['Reference']:
+        return "1.00 (ref)"
+    return f"{boot_row['RR']:.2f} ({boot_row['RR CI Lower']:.2f}–{boot_row['RR CI Upper']:.2f})"
+
+def highlight_significance(val):
+    """Color code a 'Statistical Significance' cell"""
+    if val == "Yes":
+        return 'background-color: #d4edda; color: #155724'
+    elif val == "No":
+        return 'background-color: #f8d7da; color: #721c24'
+    return ''
+
+def format_p_value(p):
+    """Format a p-value for display"""
+    if pd.isna(p):
+        return "—"
+    return "<0.001" if p < 0.001 else f"{p:.3f}"
+
+FINDING_LABELS = {
+    'agegrp': "Age Effect",
+    'affiliation': "Institutional Effect",
+    'eva_told_to_scrn': "Told to Screen",
+    'aware_of_scrn_centa': "Awareness Impact",
+}
+
+def strongest_adjusted_effects(model_table):
+    """Lowest-p non-reference level of each predictor in the adjusted model, with its reference level"""
+    if model_table.empty or 'Adjusted p-value' not in model_table.columns:
+        return []
+    effects = []
+    for pred, rows in model_table.groupby('Predictor', sort=False):
+        fitted = rows[~rows['Reference'] & rows['Adjusted RR'].notna()]
+        if fitted.empty:
+            continue
+        best = fitted.loc[fitted['Adjusted p-value'].idxmin()]
+        effects.append((pred, rows[rows['Reference']]['Category'].iloc[0], best))
+    return effects
 
 def create_demographics_overview(df):
     """Create demographics overview section"""
     st.markdown('<div class="section-header">👥 Demographics Overview</div>', unsafe_allow_html=True)
+    
+    cube = get_stats_cube(df)
+    told_pct = yes_rate(cube, 'eva_told_to_scrn')
+    uptake_pct = yes_rate(cube, 'Uptake')
+    mean_age = cube['means'].get('age', 0)
       # Create the cards container with HTML - Repositioned Ever Told to Screen
     cards_html = f"""
     <div class="cards-container">
         <div class="summary-card green">
             <div class="card-title">👥 Total Participants</div>
-            <div class="card-value">{len(df)}</div>
+            <div class="card-value">{cube['n']}</div>
             <div class="card-description">Female tertiary students from Hohoe Municipality, Ghana</div>
         </div>
         <div class="summary-card purple">
             <div class="card-title">🧠 Ever Told to Screen</div>
-            <div class="card-value">{(df['eva_told_to_scrn'].value_counts(normalize=True)['yes'] * 100 if 'eva_told_to_scrn' in df.columns else 0):.1f}%</div>
-            <div class="card-description">{'� Low Awareness' if (df['eva_told_to_scrn'].value_counts(normalize=True)['yes'] * 100 if 'eva_told_to_scrn' in df.columns else 0) < 30 else '📊 Moderate Awareness' if (df['eva_told_to_scrn'].value_counts(normalize=True)['yes'] * 100 if 'eva_told_to_scrn' in df.columns else 0) < 60 else '🌟 High Awareness'} - Foundation for interventions</div>
+            <div class="card-value">{told_pct:.1f}%</div>
+            <div class="card-description">{'� Low Awareness' if told_pct < 30 else '📊 Moderate Awareness' if told_pct < 60 else '🌟 High Awareness'} - Foundation for interventions</div>
         </div>
         <div class="summary-card blue">
             <div class="card-title">📅 Average Age</div>
-            <div class="card-value">{df['age'].mean() if 'age' in df.columns else 0:.1f} years</div>
+            <div class="card-value">{mean_age:.1f} years</div>
             <div class="card-description">Young adult population in prime screening age</div>
         </div>
-        <div class="summary-card orange">
-            <div class="card-title">🎯 Screening Uptake Rate</div>
-            <div class="card-value">{(df['Uptake'].value_counts(normalize=True)['yes'] * 100 if 'Uptake' in df.columns else 0):.1f}%</div>
-            <div class="card-description">{'� Critical - Action needed' if (df['Uptake'].value_counts(normalize=True)['yes'] * 100 if 'Uptake' in df.columns else 0) < 20 else '⚠️ Below Target' if (df['Uptake'].value_counts(normalize=True)['yes'] * 100 if 'Uptake' in df.columns else 0) < 50 else '✅ Good Rate'}</div>        </div>    </div>
-    """
-    
-    st.markdown(cards_html, unsafe_allow_html=True)
-    
-    # 🎨 Modern Interactive Demographics Visualization - Side by Side
-    st.markdown("<br>", unsafe_allow_html=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # 📊 Age Group Distribution - Modern Donut Chart
-        if 'agegrp' in df.columns:
-            # 🍩 Modern Animated Donut Chart with Beautiful Colors
-            fig_age = px.pie(df, names='agegrp', 
-                           title=None,  # We'll add custom title
-                           hole=0.6,  # Creates donut effect
-                           color_discrete_sequence=[
-                               '#1A237E',  # Deep Indigo (contrasts with orange bg)
-                               '#004D40',  # Dark Teal
-                               '#1B5E20',  # Dark Green
-                               '#4A148C',  # Deep Purple
-                               '#B71C1C',  # Dark Red
-                               '#E65100',  # Deep Orange
-                               '#3E2723'   # Dark Brown
-                           ])
-        
-            # Enhanced styling for modern look
-            fig_age.update_traces(
-                textposition='outside',
-                textinfo='percent+label',
-                textfont_size=18,  # Larger font for visibility
-                textfont_color='white',
-                textfont_family='Arial Black',
-                marker=dict(
-                    line=dict(color='white', width=4)  # Thicker border
-                ),
-                hovertemplate='<b>%{label}</b><br>' +
-                             'Count: %{value}<br>' +
-                             'Percentage: %{percent}<br>' +
-                             '<extra></extra>',
-                hoverlabel=dict(
-                    bgcolor='rgba(0,0,0,0.8)',
-                    bordercolor='white',
-                    font_color='white',
-                    font_size=16,
-                    font_family='Arial'
-                )
-            )
-        
-            fig_age.update_layout(
-                height=600,  # Height for side-by-side display
-                showlegend=True,
-                legend=dict(
-                    orientation="v",  # Vertical legend for side-by-side
-                    yanchor="middle",
-                    y=0.5,
-                    xanchor="left",
-                    x=1.02,
-                    font=dict(size=12, color='white', family='Arial Bold'),
-                    bgcolor='rgba(0,0,0,0.2)',
-                    bordercolor='white',
-                    borderwidth=1
-                ),
-                margin=dict(l=40, r=40, t=100, b=40),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white', size=16, family='Arial'),
-                annotations=[
-                    dict(
-                        text="<b style='font-size:20px'>Age Groups</b><br><span style='font-size:14px'>Distribution</span>",
-                        x=0.5, y=0.5,
-                        font_size=18,
-                        font_color='white',
-                        font_family='Arial Black',
-                        showarrow=False
-                    ),
-                    dict(
-                        text="<b>📊 Age Group Distribution</b>",
-                        x=0.5, y=1.12,
-                        font_size=20,
-                        font_color='white',
-                        font_family='Arial Black',
-                        showarrow=False,
-                        xanchor='center'
-                    )
-                ]
-            )
-        
-            # Add animation and interactivity
-            fig_age.update_traces(
-                rotation=90,
-                pull=[0.05 if i == 0 else 0 for i in range(len(df['agegrp'].unique()))]
-            )
-        
-            st.plotly_chart(fig_age, use_container_width=True)
-        else:
-            st.info("💡 Age group data not found in the dataset")
+        <div class="summary-card orange">
+            <div class="card-title">🎯 Screening Uptake Rate</div>
+            <div class="card-value">{uptake_pct:.1f}%</div>
+            <div class="card-description">{'� Critical - Action needed' if uptake_pct < 20 else '⚠️ Below Target' if uptake_pct < 50 else '✅ Good Rate'}</div>        </div>    </div>
+    """
     
-    with col2:
-        # 🏫 Institutional Affiliation - Modern Donut Chart
-        if 'affiliation' in df.columns:
-            affiliation_counts = df['affiliation'].value_counts()
-        
-            if len(affiliation_counts) > 0:
-                # 🌟 Modern Interactive Donut Chart with Bold Percentages
-                fig_aff = px.pie(df, names='affiliation', 
+    st.markdown(cards_html, unsafe_allow_html=True)
+    
+    # 🎨 Modern Interactive Demographics Visualization - Side by Side
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # 📊 Age Group Distribution - Modern Donut Chart
+        if 'agegrp' in df.columns:
+            # 🍩 Modern Animated Donut Chart with Beautiful Colors
+            def build_figure():
+                fig_age = px.pie(df, names='agegrp', 
                                title=None,  # We'll add custom title
-                               hole=0.5,  # Creates donut effect
+                               hole=0.6,  # Creates donut effect
                                color_discrete_sequence=[
-                                   '#2E1F7B',  # Deep Navy Blue
-                                   '#8B0000',  # Dark Red
-                                   '#006400',  # Dark Green  
-                                   '#4B0082',  # Indigo
-                                   '#8B4513',  # Saddle Brown
-                                   '#2F4F4F',  # Dark Slate Gray
-                                   '#800080',  # Purple
-                                   '#556B2F'   # Dark Olive Green
+                                   '#1A237E',  # Deep Indigo (contrasts with orange bg)
+                                   '#004D40',  # Dark Teal
+                                   '#1B5E20',  # Dark Green
+                                   '#4A148C',  # Deep Purple
+                                   '#B71C1C',  # Dark Red
+                                   '#E65100',  # Deep Orange
+                                   '#3E2723'   # Dark Brown
                                ])
-            
+        
                 # Enhanced styling for modern look
-                fig_aff.update_traces(
+                fig_age.update_traces(
                     textposition='outside',
                     textinfo='percent+label',
-                    textfont_size=16,
+                    textfont_size=18,  # Larger font for visibility
                     textfont_color='white',
                     textfont_family='Arial Black',
                     marker=dict(
-                        line=dict(color='white', width=4)
+                        line=dict(color='white', width=4)  # Thicker border
                     ),
                     hovertemplate='<b>%{label}</b><br>' +
                                  'Count: %{value}<br>' +
@@ -2493,8 +708,8 @@ def create_demographics_overview(df):
                         font_family='Arial'
                     )
                 )
-            
-                fig_aff.update_layout(
+        
+                fig_age.update_layout(
                     height=600,  # Height for side-by-side display
                     showlegend=True,
                     legend=dict(
@@ -2504,7 +719,7 @@ def create_demographics_overview(df):
                         xanchor="left",
                         x=1.02,
                         font=dict(size=12, color='white', family='Arial Bold'),
-                        bgcolor='rgba(0,0,0,0.1)',
+                        bgcolor='rgba(0,0,0,0.2)',
                         bordercolor='white',
                         borderwidth=1
                     ),
@@ -2514,7 +729,7 @@ def create_demographics_overview(df):
                     font=dict(color='white', size=16, family='Arial'),
                     annotations=[
                         dict(
-                            text="<b>Institutional<br>Affiliation</b>",
+                            text="<b style='font-size:20px'>Age Groups</b><br><span style='font-size:14px'>Distribution</span>",
                             x=0.5, y=0.5,
                             font_size=18,
                             font_color='white',
@@ -2522,7 +737,7 @@ def create_demographics_overview(df):
                             showarrow=False
                         ),
                         dict(
-                            text="<b>🏫 Institutional Affiliation</b>",
+                            text="<b>📊 Age Group Distribution</b>",
                             x=0.5, y=1.12,
                             font_size=20,
                             font_color='white',
@@ -2532,11 +747,112 @@ def create_demographics_overview(df):
                         )
                     ]
                 )
-            
-                # Add pull effect for the first slice
-                fig_aff.update_traces(
-                    pull=[0.1 if i == 0 else 0 for i in range(len(affiliation_counts))]
+        
+                # Add animation and interactivity
+                fig_age.update_traces(
+                    rotation=90,
+                    pull=[0.05 if i == 0 else 0 for i in range(len(df['agegrp'].unique()))]
                 )
+                return fig_age
+            
+            fig_age = cached_figure(df, 'overview', 'age_donut', build_figure)
+        
+            st.plotly_chart(fig_age, use_container_width=True)
+        else:
+            st.info("💡 Age group data not found in the dataset")
+    
+    with col2:
+        # 🏫 Institutional Affiliation - Modern Donut Chart
+        if 'affiliation' in df.columns:
+            affiliation_counts = cube['counts']['affiliation']
+            affiliation_counts = affiliation_counts[affiliation_counts > 0]
+        
+            if len(affiliation_counts) > 0:
+                # 🌟 Modern Interactive Donut Chart with Bold Percentages
+                def build_figure():
+                    fig_aff = px.pie(df, names='affiliation', 
+                                   title=None,  # We'll add custom title
+                                   hole=0.5,  # Creates donut effect
+                                   color_discrete_sequence=[
+                                       '#2E1F7B',  # Deep Navy Blue
+                                       '#8B0000',  # Dark Red
+                                       '#006400',  # Dark Green  
+                                       '#4B0082',  # Indigo
+                                       '#8B4513',  # Saddle Brown
+                                       '#2F4F4F',  # Dark Slate Gray
+                                       '#800080',  # Purple
+                                       '#556B2F'   # Dark Olive Green
+                                   ])
+            
+                    # Enhanced styling for modern look
+                    fig_aff.update_traces(
+                        textposition='outside',
+                        textinfo='percent+label',
+                        textfont_size=16,
+                        textfont_color='white',
+                        textfont_family='Arial Black',
+                        marker=dict(
+                            line=dict(color='white', width=4)
+                        ),
+                        hovertemplate='<b>%{label}</b><br>' +
+                                     'Count: %{value}<br>' +
+                                     'Percentage: %{percent}<br>' +
+                                     '<extra></extra>',
+                        hoverlabel=dict(
+                            bgcolor='rgba(0,0,0,0.8)',
+                            bordercolor='white',
+                            font_color='white',
+                            font_size=16,
+                            font_family='Arial'
+                        )
+                    )
+            
+                    fig_aff.update_layout(
+                        height=600,  # Height for side-by-side display
+                        showlegend=True,
+                        legend=dict(
+                            orientation="v",  # Vertical legend for side-by-side
+                            yanchor="middle",
+                            y=0.5,
+                            xanchor="left",
+                            x=1.02,
+                            font=dict(size=12, color='white', family='Arial Bold'),
+                            bgcolor='rgba(0,0,0,0.1)',
+                            bordercolor='white',
+                            borderwidth=1
+                        ),
+                        margin=dict(l=40, r=40, t=100, b=40),
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        font=dict(color='white', size=16, family='Arial'),
+                        annotations=[
+                            dict(
+                                text="<b>Institutional<br>Affiliation</b>",
+                                x=0.5, y=0.5,
+                                font_size=18,
+                                font_color='white',
+                                font_family='Arial Black',
+                                showarrow=False
+                            ),
+                            dict(
+                                text="<b>🏫 Institutional Affiliation</b>",
+                                x=0.5, y=1.12,
+                                font_size=20,
+                                font_color='white',
+                                font_family='Arial Black',
+                                showarrow=False,
+                                xanchor='center'
+                            )
+                        ]
+                    )
+            
+                    # Add pull effect for the first slice
+                    fig_aff.update_traces(
+                        pull=[0.1 if i == 0 else 0 for i in range(len(affiliation_counts))]
+                    )
+                    return fig_aff
+                
+                fig_aff = cached_figure(df, 'overview', 'affiliation_donut', build_figure)
             
                 st.plotly_chart(fig_aff, use_container_width=True)
             else:
@@ -2544,14 +860,84 @@ def create_demographics_overview(df):
         else:
             st.info("💡 Institutional affiliation data not found in the dataset")
 
+def create_shrinkage_chart(df, col):
+    """Shrunken uptake with 95% credible intervals next to the observed rate for one subgroup column"""
+    shrunk = shrink_subgroup_uptake(df, dataset_version(df), (col,))
+    if shrunk.empty:
+        st.info("💡 Not enough subgroups to fit a shrinkage prior.")
+        return
+    labels = shrunk[col].astype(str)
+    
+    def build_figure():
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            name='Shrunken Estimate',
+            x=labels,
+            y=shrunk['Shrunken (%)'],
+            marker_color='#16a085',
+            text=[f'{val:.1f}%' for val in shrunk['Shrunken (%)']],
+            textposition='auto',
+            textfont=dict(size=14, family='Arial Black', color='white'),
+            error_y=dict(
+                type='data',
+                array=(shrunk['CrI Upper (%)'] - shrunk['Shrunken (%)']).to_numpy(),
+                arrayminus=(shrunk['Shrunken (%)'] - shrunk['CrI Lower (%)']).to_numpy(),
+                color='#2c3e50',
+                thickness=2,
+                width=6
+            ),
+            customdata=shrunk[['CrI Lower (%)', 'CrI Upper (%)', 'N']].to_numpy(),
+            hovertemplate='<b>%{x}</b><br>Shrunken: %{y:.1f}%<br>95% CrI: %{customdata[0]:.1f}%–%{customdata[1]:.1f}%<br>n = %{customdata[2]}<extra></extra>'
+        ))
+        fig.add_trace(go.Scatter(
+            name='Observed Rate',
+            x=labels,
+            y=shrunk['Observed (%)'],
+            mode='markers',
+            marker=dict(symbol='diamond', size=14, color='#e74c3c', line=dict(color='white', width=2)),
+            hovertemplate='<b>%{x}</b><br>Observed: %{y:.1f}%<extra></extra>'
+        ))
+        fig.add_hline(y=shrunk['Screened'].sum() / shrunk['N'].sum() * 100, line_dash='dash', line_color='#7f8c8d',
+                      annotation_text='Overall rate', annotation_position='top left')
+        fig.update_layout(
+            title=dict(
+                text=f"Small-Area Uptake Estimates by {col.replace('_', ' ').title()}",
+                x=0.5,
+                font=dict(size=20, color='#2c3e50', family='Arial Black')
+            ),
+            xaxis_title=col.replace('_', ' ').title(),
+            yaxis_title='Ever Screened (%)',
+            height=550,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=16, family='Arial')),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            margin=dict(t=80, b=60, l=60, r=60)
+        )
+        return fig
+    
+    fig = cached_figure(df, 'screening', f'uptake_shrunk_{col}', build_figure)
+    st.plotly_chart(fig, use_container_width=True)
+    if shrunk.attrs['complete_pooling']:
+        st.caption(
+            f"No variation in uptake by {col.replace('_', ' ')} beyond sampling noise (ρ ≤ 0), so the beta-binomial estimates are "
+            "completely pooled: every group gets the overall rate and its 95% credible interval."
+        )
+    else:
+        st.caption(
+            f"Beta-binomial empirical Bayes: Beta({shrunk.attrs['prior_a']:.1f}, {shrunk.attrs['prior_b']:.1f}) prior centred on the pooled rate, "
+            f"fitted across {len(shrunk)} groups by method of moments; bars are posterior means with 95% credible intervals."
+        )
+
 def create_screening_uptake_analysis(df):
     """Create screening uptake analysis section"""
     st.markdown('<div class="section-header">🎯 Screening Uptake Analysis</div>', unsafe_allow_html=True)
     
+    cube = get_stats_cube(df)
+    
     # Overall uptake
     if 'Uptake' in df.columns:
-        uptake_counts = df['Uptake'].value_counts()
-        uptake_pct = df['Uptake'].value_counts(normalize=True) * 100
+        uptake_counts = cube['counts']['Uptake']
+        uptake_pct = cube['pct']['Uptake']
         
         # Create summary cards for screening uptake overview
         cards_html = f"""
@@ -2585,53 +971,57 @@ def create_screening_uptake_analysis(df):
         st.markdown("<br>", unsafe_allow_html=True)
         
         # Large vertical donut chart with better colors and bigger labels
-        fig = go.Figure(data=[go.Pie(
-            labels=['Never Screened', 'Ever Screened'],
-            values=[uptake_counts['no'], uptake_counts['yes']],
-            hole=0.5,  # Larger hole for better donut effect
-            marker_colors=['#e74c3c', '#2ecc71'],  # Red for never screened, Green for screened
-            textinfo='label+percent+value',
-            textfont=dict(size=20, family='Arial Black', color='white'),  # Larger, bolder text
-            textposition='outside',  # Outside positioning for better visibility
-            hovertemplate='<b>%{label}</b><br>Count: %{value}<br>Percentage: %{percent}<extra></extra>',
-            marker=dict(line=dict(color='white', width=4)),  # Thicker borders
-            pull=[0.05, 0]  # Slightly pull out the "never screened" slice for emphasis
-        )])
+        def build_figure():
+            fig = go.Figure(data=[go.Pie(
+                labels=['Never Screened', 'Ever Screened'],
+                values=[uptake_counts['no'], uptake_counts['yes']],
+                hole=0.5,  # Larger hole for better donut effect
+                marker_colors=['#e74c3c', '#2ecc71'],  # Red for never screened, Green for screened
+                textinfo='label+percent+value',
+                textfont=dict(size=20, family='Arial Black', color='white'),  # Larger, bolder text
+                textposition='outside',  # Outside positioning for better visibility
+                hovertemplate='<b>%{label}</b><br>Count: %{value}<br>Percentage: %{percent}<extra></extra>',
+                marker=dict(line=dict(color='white', width=4)),  # Thicker borders
+                pull=[0.05, 0]  # Slightly pull out the "never screened" slice for emphasis
+            )])
         
-        fig.update_layout(
-            title=dict(
-                text="<b>Cervical Cancer Screening Uptake Distribution</b>",
-                x=0.5,
-                font=dict(size=24, color='white', family='Arial Black')
-            ),
-            height=700,  # Much larger height for vertical display
-            showlegend=True,
-            legend=dict(
-                font=dict(size=18, family='Arial Bold', color='white'),
-                orientation="h",  # Horizontal legend at bottom
-                yanchor="top",
-                y=-0.15,
-                xanchor="center",
-                x=0.5,
-                bgcolor='rgba(0,0,0,0.2)',
-                bordercolor='white',
-                borderwidth=1
-            ),
-            font=dict(size=18, family='Arial'),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            margin=dict(t=100, b=120, l=40, r=40),
-            annotations=[
-                dict(
-                    text=f"<b style='font-size:28px'>Total</b><br><span style='font-size:20px'>{uptake_counts.sum()} Students</span>",
-                    x=0.5, y=0.5,
-                    font_size=24,
-                    font_color='white',
-                    font_family='Arial Black',
-                    showarrow=False
-                )
-            ]
-        )
+            fig.update_layout(
+                title=dict(
+                    text="<b>Cervical Cancer Screening Uptake Distribution</b>",
+                    x=0.5,
+                    font=dict(size=24, color='white', family='Arial Black')
+                ),
+                height=700,  # Much larger height for vertical display
+                showlegend=True,
+                legend=dict(
+                    font=dict(size=18, family='Arial Bold', color='white'),
+                    orientation="h",  # Horizontal legend at bottom
+                    yanchor="top",
+                    y=-0.15,
+                    xanchor="center",
+                    x=0.5,
+                    bgcolor='rgba(0,0,0,0.2)',
+                    bordercolor='white',
+                    borderwidth=1
+                ),
+                font=dict(size=18, family='Arial'),
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                margin=dict(t=100, b=120, l=40, r=40),
+                annotations=[
+                    dict(
+                        text=f"<b style='font-size:28px'>Total</b><br><span style='font-size:20px'>{uptake_counts.sum()} Students</span>",
+                        x=0.5, y=0.5,
+                        font_size=24,
+                        font_color='white',
+                        font_family='Arial Black',
+                        showarrow=False
+                    )
+                ]
+            )
+            return fig
+        
+        fig = cached_figure(df, 'screening', 'uptake_donut', build_figure)
         
         st.plotly_chart(fig, use_container_width=True)
         
@@ -2659,7 +1049,11 @@ def create_screening_uptake_analysis(df):
     
     # Sankey Diagram for Screening Pathway
     st.markdown("### 🔄 Screening Uptake Pathway Analysis")
-    create_sankey_diagram(df)
+    sankey_col, mediation_col = st.columns([3, 2])
+    with sankey_col:
+        create_sankey_diagram(df)
+    with mediation_col:
+        create_mediation_panel(df)
     
     # Uptake by demographics with improved colors
     demo_cols = ['agegrp', 'marital', 'lev', 'affiliation']
@@ -2670,80 +1064,218 @@ def create_screening_uptake_analysis(df):
         'affiliation': ['#2c3e50', '#c0392b'] # Dark Blue/Dark Red
     }
     
+    small_area = 'Uptake' in df.columns and st.toggle(
+        "🪶 Small-area estimates (empirical Bayes)",
+        key="uptake_small_area",
+        help="Shrink level and institution uptake toward the overall rate in proportion to how little data each subgroup has"
+    )
+    
     for col in demo_cols:
         if col in df.columns and 'Uptake' in df.columns:
             st.subheader(f"📊 Screening Uptake by {col.replace('_', ' ').title()}")
             
-            # Create crosstab
-            ct = pd.crosstab(df[col], df['Uptake'], normalize='index') * 100
+            if small_area and col in SHRINKAGE_COLUMNS:
+                create_shrinkage_chart(df, col)
+                continue
+            
+            # Row percentages from the shared stats cube
+            ct = cube['by_uptake_pct'][col]
+            boot = get_bootstrap_cis(df, col)
               # Create grouped bar chart with custom colors
-            fig = go.Figure()
+            def build_figure():
+                fig = go.Figure()
             
-            colors = color_palettes.get(col, ['#66c2a5', '#fc8d62'])
+                colors = color_palettes.get(col, ['#66c2a5', '#fc8d62'])
+                ever = ct['yes'] if 'yes' in ct.columns else pd.Series(0.0, index=ct.index)
+                
+                # 95% bootstrap CI whiskers on the uptake bars
+                error_y, customdata = None, None
+                if not boot.empty:
+                    ci = boot.reindex(ct.index)[['Rate CI Lower (%)', 'Rate CI Upper (%)']]
+                    error_y = dict(
+                        type='data',
+                        array=(ci['Rate CI Upper (%)'] - ever).clip(lower=0).to_numpy(),
+                        arrayminus=(ever - ci['Rate CI Lower (%)']).clip(lower=0).to_numpy(),
+                        color='#2c3e50',
+                        thickness=2,
+                        width=6
+                    )
+                    customdata = ci.to_numpy()
             
-            fig.add_trace(go.Bar(
-                name='Ever Screened',
-                x=ct.index,
-                y=ct['yes'] if 'yes' in ct.columns else [0] * len(ct.index),
-                marker_color=colors[0],
-                text=[f'{val:.1f}%' for val in (ct['yes'] if 'yes' in ct.columns else [0] * len(ct.index))],
-                textposition='auto',
-                textfont=dict(size=14, family='Arial Black', color='white'),
-                hovertemplate='<b>%{x}</b><br>Ever Screened: %{y}%<extra></extra>'
-            ))
+                fig.add_trace(go.Bar(
+                    name='Ever Screened',
+                    x=ct.index,
+                    y=ever,
+                    marker_color=colors[0],
+                    text=[f'{val:.1f}%' for val in ever],
+                    textposition='auto',
+                    textfont=dict(size=14, family='Arial Black', color='white'),
+                    error_y=error_y,
+                    customdata=customdata,
+                    hovertemplate=(
+                        '<b>%{x}</b><br>Ever Screened: %{y}%'
+                        + ('<br>95% CI: %{customdata[0]:.1f}%–%{customdata[1]:.1f}%' if customdata is not None else '')
+                        + '<extra></extra>'
+                    )
+                ))
             
-            fig.add_trace(go.Bar(
-                name='Never Screened',
-                x=ct.index,
-                y=ct['no'] if 'no' in ct.columns else [0] * len(ct.index),
-                marker_color=colors[1],
-                text=[f'{val:.1f}%' for val in (ct['no'] if 'no' in ct.columns else [0] * len(ct.index))],
-                textposition='auto',
-                textfont=dict(size=14, family='Arial Black', color='white'),
-                hovertemplate='<b>%{x}</b><br>Never Screened: %{y}%<extra></extra>'
-            ))
+                fig.add_trace(go.Bar(
+                    name='Never Screened',
+                    x=ct.index,
+                    y=ct['no'] if 'no' in ct.columns else [0] * len(ct.index),
+                    marker_color=colors[1],
+                    text=[f'{val:.1f}%' for val in (ct['no'] if 'no' in ct.columns else [0] * len(ct.index))],
+                    textposition='auto',
+                    textfont=dict(size=14, family='Arial Black', color='white'),
+                    hovertemplate='<b>%{x}</b><br>Never Screened: %{y}%<extra></extra>'
+                ))
             
-            fig.update_layout(
-                title=dict(
-                    text=f"Screening Uptake by {col.replace('_', ' ').title()}",
-                    x=0.5,
-                    font=dict(size=20, color='#2c3e50', family='Arial Black')
-                ),
-                xaxis_title=col.replace('_', ' ').title(),
-                yaxis_title='Percentage (%)',
-                barmode='group',
-                height=550,
-                showlegend=True,
-                legend=dict(
-                    orientation="h", 
-                    yanchor="bottom", 
-                    y=1.02, 
-                    xanchor="right", 
-                    x=1,
-                    font=dict(size=16, family='Arial')                ),
-                xaxis=dict(
-                    title=dict(text=col.replace('_', ' ').title(), font=dict(size=16, family='Arial Black')),
-                    tickfont=dict(size=14, family='Arial')
-                ),
-                yaxis=dict(
-                    title=dict(text='Percentage (%)', font=dict(size=16, family='Arial Black')),
-                    tickfont=dict(size=14, family='Arial'),
-                    showgrid=True,
-                    gridwidth=1,
-                    gridcolor='rgba(128,128,128,0.2)'
-                ),
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                margin=dict(t=80, b=60, l=60, r=60)
-            )
+                fig.update_layout(
+                    title=dict(
+                        text=f"Screening Uptake by {col.replace('_', ' ').title()}",
+                        x=0.5,
+                        font=dict(size=20, color='#2c3e50', family='Arial Black')
+                    ),
+                    xaxis_title=col.replace('_', ' ').title(),
+                    yaxis_title='Percentage (%)',
+                    barmode='group',
+                    height=550,
+                    showlegend=True,
+                    legend=dict(
+                        orientation="h", 
+                        yanchor="bottom", 
+                        y=1.02, 
+                        xanchor="right", 
+                        x=1,
+                        font=dict(size=16, family='Arial')                ),
+                    xaxis=dict(
+                        title=dict(text=col.replace('_', ' ').title(), font=dict(size=16, family='Arial Black')),
+                        tickfont=dict(size=14, family='Arial')
+                    ),
+                    yaxis=dict(
+                        title=dict(text='Percentage (%)', font=dict(size=16, family='Arial Black')),
+                        tickfont=dict(size=14, family='Arial'),
+                        showgrid=True,
+                        gridwidth=1,
+                        gridcolor='rgba(128,128,128,0.2)'
+                    ),
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    margin=dict(t=80, b=60, l=60, r=60)
+                )
+                return fig
+            
+            fig = cached_figure(df, 'screening', f'uptake_by_{col}', build_figure)
             
             st.plotly_chart(fig, use_container_width=True)
+    
+    if small_area and all(col in df.columns for col in SHRINKAGE_COLUMNS):
+        with st.expander("🪶 Small-area estimates for every institution × level cell"):
+            cells = shrink_subgroup_uptake(df, dataset_version(df), tuple(SHRINKAGE_COLUMNS))
+            if not cells.empty:
+                st.dataframe(
+                    cells.assign(**{
+                        'lev': cells['lev'].astype(str),
+                        'Shrinkage': cells['Shrinkage'].round(2),
+                        **{name: cells[name].round(1) for name in ['Observed (%)', 'Shrunken (%)', 'CrI Lower (%)', 'CrI Upper (%)']}
+                    }).rename(columns={'lev': 'Level', 'affiliation': 'Institution'}),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                st.caption(
+                    f"Beta-binomial prior fitted across all {len(cells)} cells (intra-cell correlation ρ = {cells.attrs['rho']:.3f}"
+                    f"{'; complete pooling, so every cell gets the overall rate' if cells.attrs['complete_pooling'] else ''}). "
+                    "Shrinkage is the weight each cell's estimate places on the overall rate."
+                )
+
+def create_told_effect_section(df):
+    """Create propensity-score analysis of being told to screen on uptake"""
+    effect = estimate_told_effect(df, dataset_version(df))
+    if not effect:
+        return
+    estimates = effect['estimates']
+    
+    st.markdown("### ⚖️ Does Being Told to Screen Raise Uptake?")
+    col1, col2, col3 = st.columns(3)
+    for column, (_, row) in zip((col1, col2, col3), estimates.iterrows()):
+        column.metric(
+            f"{row['Method']} Risk Difference",
+            f"{row['Risk Difference (pp)']:+.1f} pp",
+            help=f"95% CI {row['RD CI Lower']:+.1f} to {row['RD CI Upper']:+.1f} pp"
+        )
+    
+    def build_figure():
+        fig = go.Figure(go.Scatter(
+            x=estimates['Risk Ratio'],
+            y=estimates['Method'],
+            mode='markers',
+            marker=dict(size=16, color=['#95a5a6', '#3498db', '#9b59b6'], line=dict(color='white', width=2)),
+            error_x=dict(
+                type='data',
+                array=(estimates['RR CI Upper'] - estimates['Risk Ratio']).to_numpy(),
+                arrayminus=(estimates['Risk Ratio'] - estimates['RR CI Lower']).to_numpy(),
+                color='#2c3e50',
+                thickness=2,
+                width=8
+            ),
+            customdata=estimates[['RR CI Lower', 'RR CI Upper']].to_numpy(),
+            hovertemplate='<b>%{y}</b><br>RR: %{x:.2f}<br>95% CI: %{customdata[0]:.2f}–%{customdata[1]:.2f}<extra></extra>'
+        ))
+        fig.add_vline(x=1, line_dash='dash', line_color='#7f8c8d')
+        fig.update_layout(
+            title=dict(text="Effect of Being Told to Screen on Uptake (Risk Ratio)", x=0.5, font=dict(size=20, color='#2c3e50', family='Arial Black')),
+            xaxis_title="Risk Ratio (95% bootstrap CI)",
+            xaxis_type='log',
+            height=380,
+            showlegend=False,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            margin=dict(t=80, b=60, l=140, r=40)
+        )
+        return fig
+    
+    fig = cached_figure(df, 'awareness', 'told_effect', build_figure)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    estimates_df = pd.DataFrame({
+        'Method': estimates['Method'],
+        'Uptake if Told (%)': estimates['Risk Exposed (%)'].round(1),
+        'Uptake if Not Told (%)': estimates['Risk Unexposed (%)'].round(1),
+        'Risk Difference (95% CI)': [
+            f"{rd:+.1f} pp ({lo:+.1f} to {hi:+.1f})"
+            for rd, lo, hi in zip(estimates['Risk Difference (pp)'], estimates['RD CI Lower'], estimates['RD CI Upper'])
+        ],
+        'Risk Ratio (95% CI)': [
+            f"{rr:.2f} ({lo:.2f}–{hi:.2f})"
+            for rr, lo, hi in zip(estimates['Risk Ratio'], estimates['RR CI Lower'], estimates['RR CI Upper'])
+        ]
+    })
+    st.dataframe(estimates_df, use_container_width=True, hide_index=True)
+    st.caption(
+        f"Propensity of being told to screen modelled on {', '.join(c.replace('_', ' ') for c in survey_analytics.CONFOUNDERS)} "
+        f"({effect['n_treated']} told, {effect['n_control']} not told). IPW: normalized inverse-probability weights (effect in everyone). "
+        f"Matched: nearest-neighbour matching with replacement within {survey_analytics.PROPENSITY_CALIPER} SD of the logit propensity "
+        f"({effect['matched_treated']} of {effect['n_treated']} told respondents matched; effect in those told). "
+        f"Percentile CIs from {effect['n_boot']:,} bootstrap resamples that refit the propensity model. "
+        "Unmeasured confounding can still bias these estimates."
+    )
+    
+    with st.expander("⚖️ Covariate balance before and after weighting"):
+        balance = effect['balance']
+        st.dataframe(pd.DataFrame({
+            'Covariate': balance['Covariate'].str.replace('_', ' ').str.title(),
+            'Level': balance['Level'].astype(str),
+            'SMD Before': balance['SMD Before'].round(3),
+            'SMD After IPW': balance['SMD After IPW'].round(3)
+        }), use_container_width=True, hide_index=True)
+        st.caption("Standardized mean differences between told and not-told respondents; |SMD| < 0.1 is conventionally balanced.")
 
 def create_awareness_section(df):
     """Create awareness analysis section"""
     st.markdown('<div class="section-header">🧠 Awareness Assessment</div>', unsafe_allow_html=True)
     
     awareness_cols = ['eva_told_to_scrn', 'aware_of_scrn_centa']
+    cube = get_stats_cube(df)
     
     if all(col in df.columns for col in awareness_cols):
         # Create side-by-side comparison with enhanced colors
@@ -2754,54 +1286,58 @@ def create_awareness_section(df):
         titles = ["Ever Told to Screen", "Aware of Screening Centre"]
         
         for i, col in enumerate(awareness_cols):
-            counts = df[col].value_counts()
-            pct = df[col].value_counts(normalize=True) * 100
+            counts = cube['counts'][col]
+            pct = cube['pct'][col]
             
             title = titles[i]
             color_pair = colors[i];
               # Create enhanced bar chart
-            fig = go.Figure()
+            def build_figure():
+                fig = go.Figure()
             
-            fig.add_trace(go.Bar(
-                x=['No', 'Yes'],
-                y=[counts.get('no', 0), counts.get('yes', 0)],
-                marker_color=color_pair,
-                text=[f'{pct.get("no", 0):.1f}%<br>({counts.get("no", 0)})', 
-                      f'{pct.get("yes", 0):.1f}%<br>({counts.get("yes", 0)})'],
-                textposition='auto',
-                textfont=dict(color='white', size=16, family='Arial Black'),
-                hovertemplate='<b>%{x}</b><br>Count: %{y}<br>Percentage: %{text}<extra></extra>',
-                marker=dict(line=dict(color='white', width=2))
-            ))
+                fig.add_trace(go.Bar(
+                    x=['No', 'Yes'],
+                    y=[counts.get('no', 0), counts.get('yes', 0)],
+                    marker_color=color_pair,
+                    text=[f'{pct.get("no", 0):.1f}%<br>({counts.get("no", 0)})', 
+                          f'{pct.get("yes", 0):.1f}%<br>({counts.get("yes", 0)})'],
+                    textposition='auto',
+                    textfont=dict(color='white', size=16, family='Arial Black'),
+                    hovertemplate='<b>%{x}</b><br>Count: %{y}<br>Percentage: %{text}<extra></extra>',
+                    marker=dict(line=dict(color='white', width=2))
+                ))
             
-            fig.update_layout(
-                title=dict(
-                    text=title, 
-                    x=0.5, 
-                    font=dict(size=20, color='#2c3e50', family='Arial Black')
-                ),
-                yaxis_title="Count",
-                xaxis_title="Response",
-                height=500,
-                showlegend=False,
-                plot_bgcolor='rgba(0,0,0,0)',                paper_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(
-                    title=dict(text="Response", font=dict(size=16, family='Arial Black')),
-                    tickfont=dict(size=14, family='Arial')
-                ),
-                yaxis=dict(
-                    title=dict(text="Count", font=dict(size=16, family='Arial Black')),
-                    tickfont=dict(size=14, family='Arial'),
-                    showgrid=True,
-                    gridwidth=1,
-                    gridcolor='rgba(128,128,128,0.2)'
-                ),
-                margin=dict(t=80, b=60, l=60, r=60)
-            )
+                fig.update_layout(
+                    title=dict(
+                        text=title, 
+                        x=0.5, 
+                        font=dict(size=20, color='#2c3e50', family='Arial Black')
+                    ),
+                    yaxis_title="Count",
+                    xaxis_title="Response",
+                    height=500,
+                    showlegend=False,
+                    plot_bgcolor='rgba(0,0,0,0)',                paper_bgcolor='rgba(0,0,0,0)',
+                    xaxis=dict(
+                        title=dict(text="Response", font=dict(size=16, family='Arial Black')),
+                        tickfont=dict(size=14, family='Arial')
+                    ),
+                    yaxis=dict(
+                        title=dict(text="Count", font=dict(size=16, family='Arial Black')),
+                        tickfont=dict(size=14, family='Arial'),
+                        showgrid=True,
+                        gridwidth=1,
+                        gridcolor='rgba(128,128,128,0.2)'
+                    ),
+                    margin=dict(t=80, b=60, l=60, r=60)
+                )
             
-            # Add grid
-            fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
-            fig.update_xaxes(showgrid=False)
+                # Add grid
+                fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
+                fig.update_xaxes(showgrid=False)
+                return fig
+            
+            fig = cached_figure(df, 'awareness', f'awareness_{col}', build_figure)
             
             if i == 0:
                 col1.plotly_chart(fig, use_container_width=True)
@@ -2850,24 +1386,31 @@ def create_awareness_section(df):
             values = [len(both_aware), partial_aware, len(neither_aware)]
             percentages = [v/len(df_awareness)*100 for v in values]
             
-            fig = go.Figure(data=[go.Bar(
-                x=categories,
-                y=values,
-                marker_color=['#2ecc71', '#f39c12', '#e74c3c'],
-                text=[f'{p:.1f}%<br>({v} students)' for p, v in zip(percentages, values)],
-                textposition='auto',
-                textfont=dict(color='white', size=11, family='Arial Black')
-            )])
+            def build_figure():
+                fig = go.Figure(data=[go.Bar(
+                    x=categories,
+                    y=values,
+                    marker_color=['#2ecc71', '#f39c12', '#e74c3c'],
+                    text=[f'{p:.1f}%<br>({v} students)' for p, v in zip(percentages, values)],
+                    textposition='auto',
+                    textfont=dict(color='white', size=11, family='Arial Black')
+                )])
             
-            fig.update_layout(
-                title='Combined Awareness Levels',
-                yaxis_title='Number of Students',
-                xaxis_title='Awareness Level',
-                height=450,
-                showlegend=False
-            )
+                fig.update_layout(
+                    title='Combined Awareness Levels',
+                    yaxis_title='Number of Students',
+                    xaxis_title='Awareness Level',
+                    height=450,
+                    showlegend=False
+                )
+                return fig
+            
+            fig = cached_figure(df, 'awareness', 'awareness_combined', build_figure)
             
-            st.plotly_chart(fig, use_container_width=True)      # Key insights with enhanced styling using large content card
+            st.plotly_chart(fig, use_container_width=True)
+        
+        if 'Uptake' in df.columns:
+            create_told_effect_section(df)      # Key insights with enhanced styling using large content card
     st.markdown("""
     <div class="large-content-card green">
         <div class="large-card-title">💡 Key Awareness Insights</div>
@@ -2901,21 +1444,22 @@ def create_knowledge_assessment(df):
     # Knowledge domains with better color schemes
     domains = {
         'Risk Factors': {
-            'cols': ['multiple_sexual_partners', 'age_factor', 'hereditary_risk', 'unprotected_sex'],
+            'cols': KNOWLEDGE_DOMAINS['Risk Factors'],
             'colors': ['#e74c3c', '#c0392b']  # Red shades
         },
         'Symptoms': {
-            'cols': ['abnormal_menstrual_bleeding', 'general_body_pain', 'intermenstrual_bleeding', 
-                    'vaginal_itching', 'foul_vaginal_discharge', 'postmenopausal_bleeding'],
+            'cols': KNOWLEDGE_DOMAINS['Symptoms'],
             'colors': ['#f39c12', '#e67e22']  # Orange shades
         },
         'Screening': {
-            'cols': ['knows_screening_center', 'screen_from_age_21', 'screening_for_healthy',
-                     'screening_for_early_detection', 'detection_can_prevent_cancer'],
+            'cols': KNOWLEDGE_DOMAINS['Screening'],
             'colors': ['#3498db', '#2980b9']  # Blue shades
         }
     }
     
+    cube = get_stats_cube(df)
+    reliability = compute_reliability(df, dataset_version(df))
+    
     # Process each knowledge domain
     for domain_name, domain_info in domains.items():
         available_cols = [col for col in domain_info['cols'] if col in df.columns]
@@ -2927,9 +1471,9 @@ def create_knowledge_assessment(df):
             knowledge_data = []
             for col in available_cols:
                 if col in df.columns:
-                    value_counts = df[col].value_counts()
-                    agree_pct = (value_counts.get('A', 0) / len(df)) * 100
-                    disagree_pct = (value_counts.get('D', 0) / len(df)) * 100
+                    value_counts = cube['counts'][col]
+                    agree_pct = (value_counts.get('A', 0) / cube['n']) * 100
+                    disagree_pct = (value_counts.get('D', 0) / cube['n']) * 100
                     knowledge_data.append({
                         'Item': col.replace('_', ' ').title(),
                         'Good Knowledge': agree_pct,
@@ -2940,71 +1484,75 @@ def create_knowledge_assessment(df):
                 knowledge_df = pd.DataFrame(knowledge_data)
                 
                 # Create horizontal bar chart
-                fig = go.Figure()
+                def build_figure():
+                    fig = go.Figure()
                 
-                # Add Good Knowledge bars
-                fig.add_trace(go.Bar(
-                    name='Good Knowledge',
-                    y=knowledge_df['Item'],
-                    x=knowledge_df['Good Knowledge'],
-                    orientation='h',
-                    marker_color=colors[0],
-                    text=[f'{val:.1f}%' for val in knowledge_df['Good Knowledge']],
-                    textposition='inside',
-                    textfont=dict(color='white', size=14, family='Arial Black'),
-                    hovertemplate='<b>%{y}</b><br>Good Knowledge: %{x:.1f}%<extra></extra>',
-                    marker=dict(line=dict(color='white', width=1))
-                ))
+                    # Add Good Knowledge bars
+                    fig.add_trace(go.Bar(
+                        name='Good Knowledge',
+                        y=knowledge_df['Item'],
+                        x=knowledge_df['Good Knowledge'],
+                        orientation='h',
+                        marker_color=colors[0],
+                        text=[f'{val:.1f}%' for val in knowledge_df['Good Knowledge']],
+                        textposition='inside',
+                        textfont=dict(color='white', size=14, family='Arial Black'),
+                        hovertemplate='<b>%{y}</b><br>Good Knowledge: %{x:.1f}%<extra></extra>',
+                        marker=dict(line=dict(color='white', width=1))
+                    ))
                 
-                # Add Poor Knowledge bars
-                fig.add_trace(go.Bar(
-                    name='Poor Knowledge',
-                    y=knowledge_df['Item'],
-                    x=knowledge_df['Poor Knowledge'],
-                    orientation='h',
-                    marker_color=colors[1],
-                    text=[f'{val:.1f}%' for val in knowledge_df['Poor Knowledge']],
-                    textposition='inside',
-                    textfont=dict(color='white', size=14, family='Arial Black'),
-                    hovertemplate='<b>%{y}</b><br>Poor Knowledge: %{x:.1f}%<extra></extra>',
-                    marker=dict(line=dict(color='white', width=1))
-                ))
+                    # Add Poor Knowledge bars
+                    fig.add_trace(go.Bar(
+                        name='Poor Knowledge',
+                        y=knowledge_df['Item'],
+                        x=knowledge_df['Poor Knowledge'],
+                        orientation='h',
+                        marker_color=colors[1],
+                        text=[f'{val:.1f}%' for val in knowledge_df['Poor Knowledge']],
+                        textposition='inside',
+                        textfont=dict(color='white', size=14, family='Arial Black'),
+                        hovertemplate='<b>%{y}</b><br>Poor Knowledge: %{x:.1f}%<extra></extra>',
+                        marker=dict(line=dict(color='white', width=1))
+                    ))
                 
-                fig.update_layout(
-                    title=dict(
-                        text=f'Knowledge Assessment: {domain_name}',
-                        x=0.5,
-                        font=dict(size=22, color='#2c3e50', family='Arial Black')
-                    ),
-                    xaxis_title='Percentage (%)',
-                    yaxis_title='Knowledge Items',
-                    height=max(500, len(available_cols) * 60),
-                    barmode='stack',
-                    showlegend=True,
-                    legend=dict(
-                        orientation="h", 
-                        yanchor="bottom", 
-                        y=1.02, 
-                        xanchor="right", 
-                        x=1,
-                        font=dict(size=16, family='Arial')
-                    ),
-                    font=dict(size=14, family='Arial'),
-                    xaxis=dict(
-                        title=dict(text='Percentage (%)', font=dict(size=16, family='Arial Black')),
-                        tickfont=dict(size=14, family='Arial'),
-                        showgrid=True,
-                        gridwidth=1,
-                        gridcolor='rgba(128,128,128,0.2)'
-                    ),
-                    yaxis=dict(
-                        title=dict(text='Knowledge Items', font=dict(size=16, family='Arial Black')),
-                        tickfont=dict(size=12, family='Arial')
-                    ),
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    margin=dict(t=80, b=60, l=150, r=60)
-                )
+                    fig.update_layout(
+                        title=dict(
+                            text=f'Knowledge Assessment: {domain_name}',
+                            x=0.5,
+                            font=dict(size=22, color='#2c3e50', family='Arial Black')
+                        ),
+                        xaxis_title='Percentage (%)',
+                        yaxis_title='Knowledge Items',
+                        height=max(500, len(available_cols) * 60),
+                        barmode='stack',
+                        showlegend=True,
+                        legend=dict(
+                            orientation="h", 
+                            yanchor="bottom", 
+                            y=1.02, 
+                            xanchor="right", 
+                            x=1,
+                            font=dict(size=16, family='Arial')
+                        ),
+                        font=dict(size=14, family='Arial'),
+                        xaxis=dict(
+                            title=dict(text='Percentage (%)', font=dict(size=16, family='Arial Black')),
+                            tickfont=dict(size=14, family='Arial'),
+                            showgrid=True,
+                            gridwidth=1,
+                            gridcolor='rgba(128,128,128,0.2)'
+                        ),
+                        yaxis=dict(
+                            title=dict(text='Knowledge Items', font=dict(size=16, family='Arial Black')),
+                            tickfont=dict(size=12, family='Arial')
+                        ),
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        margin=dict(t=80, b=60, l=150, r=60)
+                    )
+                    return fig
+                
+                fig = cached_figure(df, 'analysis', f'knowledge_{domain_name}', build_figure)
                 
                 st.plotly_chart(fig, use_container_width=True)
                 
@@ -3025,6 +1573,23 @@ def create_knowledge_assessment(df):
                     
                     st.info(f"**Best:** {best_item}")
                     st.warning(f"**Needs Improvement:** {worst_item}")
+                
+                # Internal consistency of the domain's items
+                domain_reliability = reliability[reliability['Domain'] == domain_name] if not reliability.empty else reliability
+                if not domain_reliability.empty:
+                    alpha = domain_reliability['Domain Alpha'].iloc[0]
+                    with st.expander(f"🧪 Reliability: Cronbach's α = {alpha:.2f} (n = {domain_reliability['N'].iloc[0]})"):
+                        reliability_df = pd.DataFrame({
+                            'Item': domain_reliability['Item'].str.replace('_', ' ').str.title(),
+                            'Good Knowledge (%)': (domain_reliability['Item Mean'] * 100).round(1),
+                            'Corrected Item-Total r': domain_reliability['Item-Total r'].round(3),
+                            "α if Item Deleted": domain_reliability['Alpha if Deleted'].round(3)
+                        })
+                        st.dataframe(reliability_df, use_container_width=True, hide_index=True)
+                        st.caption(
+                            "Computed on respondents answering every item in the domain. Items whose deletion raises α "
+                            "or with item-total r below 0.2 weaken the domain score."
+                        )
         
         else:
             st.warning(f"No data available for {domain_name} assessment")
@@ -3042,56 +1607,60 @@ def create_knowledge_assessment(df):
         overall_scores = []
         for col in all_knowledge_cols:
             if col in df.columns:
-                good_knowledge_pct = (df[col].value_counts().get('A', 0) / len(df)) * 100
+                good_knowledge_pct = (cube['counts'][col].get('A', 0) / cube['n']) * 100
                 overall_scores.append(good_knowledge_pct)
         
         if overall_scores:
             avg_overall = np.mean(overall_scores)
               # Create gauge chart for overall knowledge
-            fig = go.Figure(go.Indicator(
-                mode = "gauge+number+delta",
-                value = avg_overall,
-                domain = {'x': [0, 1], 'y': [0, 1]},
-                title = {
-                    'text': "Overall Knowledge Score",
-                    'font': {'size': 24, 'color': '#2c3e50', 'family': 'Arial Black'}
-                },
-                delta = {'reference': 50},
-                number = {
-                    'font': {'size': 32, 'color': '#2c3e50', 'family': 'Arial Black'},
-                    'suffix': '%'
-                },
-                gauge = {
-                    'axis': {
-                        'range': [None, 100],
-                        'tickwidth': 2,
-                        'tickcolor': '#2c3e50',
-                        'tickfont': {'size': 16, 'family': 'Arial'}
+            def build_figure():
+                fig = go.Figure(go.Indicator(
+                    mode = "gauge+number+delta",
+                    value = avg_overall,
+                    domain = {'x': [0, 1], 'y': [0, 1]},
+                    title = {
+                        'text': "Overall Knowledge Score",
+                        'font': {'size': 24, 'color': '#2c3e50', 'family': 'Arial Black'}
                     },
-                    'bar': {'color': "#2ecc71", 'thickness': 0.8},
-                    'bgcolor': "white",
-                    'borderwidth': 3,
-                    'bordercolor': "#2c3e50",
-                    'steps': [
-                        {'range': [0, 50], 'color': "#ffebee"},
-                        {'range': [50, 75], 'color': "#fff3e0"},
-                        {'range': [75, 100], 'color': "#e8f5e8"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "#e74c3c", 'width': 6},
-                        'thickness': 0.8,
-                        'value': 50
+                    delta = {'reference': 50},
+                    number = {
+                        'font': {'size': 32, 'color': '#2c3e50', 'family': 'Arial Black'},
+                        'suffix': '%'
+                    },
+                    gauge = {
+                        'axis': {
+                            'range': [None, 100],
+                            'tickwidth': 2,
+                            'tickcolor': '#2c3e50',
+                            'tickfont': {'size': 16, 'family': 'Arial'}
+                        },
+                        'bar': {'color': "#2ecc71", 'thickness': 0.8},
+                        'bgcolor': "white",
+                        'borderwidth': 3,
+                        'bordercolor': "#2c3e50",
+                        'steps': [
+                            {'range': [0, 50], 'color': "#ffebee"},
+                            {'range': [50, 75], 'color': "#fff3e0"},
+                            {'range': [75, 100], 'color': "#e8f5e8"}
+                        ],
+                        'threshold': {
+                            'line': {'color': "#e74c3c", 'width': 6},
+                            'thickness': 0.8,
+                            'value': 50
+                        }
                     }
-                }
-            ))
+                ))
+            
+                fig.update_layout(
+                    height=400,
+                    font=dict(size=16, family='Arial'),
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    margin=dict(t=80, b=40, l=40, r=40)
+                )
+                return fig
             
-            fig.update_layout(
-                height=400,
-                font=dict(size=16, family='Arial'),
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                margin=dict(t=80, b=40, l=40, r=40)
-            )
+            fig = cached_figure(df, 'analysis', 'knowledge_gauge', build_figure)
             col1, col2 = st.columns([2, 1])
             with col1:
                 st.plotly_chart(fig, use_container_width=True)
@@ -3119,6 +1688,303 @@ def create_knowledge_assessment(df):
                         <strong>Average Score:</strong> {avg_overall:.1f}%
                     </div>
                 </div>                """, unsafe_allow_html=True)
+    
+    create_latent_knowledge_section(df)
+
+def create_latent_knowledge_section(df):
+    """Create IRT latent knowledge section"""
+    if 'Uptake' not in df.columns or not any(item in df.columns for item in IRT_ITEMS):
+        return
+    
+    st.markdown("### 🧠 Latent Knowledge Scores (Item Response Theory)")
+    # A common slope only makes sense when every item loads positively, so check the 2PL signs first
+    calibration, _ = fit_knowledge_irt(df, dataset_version(df), '2pl')
+    negative = calibration.loc[calibration['Discrimination'] < 0, 'Item']
+    model_labels = {"2PL": '2pl', "Rasch": 'rasch'}
+    if len(negative):
+        st.warning(
+            f"{len(negative)} item(s) have negative 2PL discriminations ({', '.join(negative.str.replace('_', ' '))}), "
+            "so they are keyed against the rest of the scale; only the 2PL model is shown."
+        )
+        model_labels = {"2PL": '2pl'}
+    model_label = st.radio("IRT model", list(model_labels), horizontal=True, key="irt_model")
+    model = model_labels.get(model_label, '2pl')
+    item_params, abilities = fit_knowledge_irt(df, dataset_version(df), model)
+    
+    scored = abilities.assign(Uptake=df['Uptake']).dropna(subset=['Ability', 'Uptake'])
+    
+    def build_figure():
+        fig = go.Figure()
+        for uptake, name, color in [('yes', 'Ever Screened', '#2ecc71'), ('no', 'Never Screened', '#e74c3c')]:
+            fig.add_trace(go.Histogram(
+                x=scored.loc[scored['Uptake'] == uptake, 'Ability'],
+                name=name,
+                marker_color=color,
+                opacity=0.75,
+                histnorm='percent',
+                nbinsx=30,
+                hovertemplate='Ability: %{x}<br>%{y:.1f}% of group<extra></extra>'
+            ))
+        fig.update_layout(
+            title=dict(
+                text=f"Latent Knowledge Distribution by Screening Uptake ({model_label})",
+                x=0.5,
+                font=dict(size=20, color='#2c3e50', family='Arial Black')
+            ),
+            barmode='overlay',
+            height=450,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=16, family='Arial')),
+            xaxis=dict(
+                title=dict(text='Knowledge ability (θ, EAP)', font=dict(size=16, family='Arial Black')),
+                tickfont=dict(size=14, family='Arial')
+            ),
+            yaxis=dict(
+                title=dict(text='Percentage of group (%)', font=dict(size=16, family='Arial Black')),
+                tickfont=dict(size=14, family='Arial'),
+                showgrid=True,
+                gridwidth=1,
+                gridcolor='rgba(128,128,128,0.2)'
+            ),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            margin=dict(t=80, b=60, l=60, r=60)
+        )
+        return fig
+    
+    fig = cached_figure(df, 'analysis', f'irt_abilities_{model}', build_figure)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Ability as a continuous covariate for uptake
+    effect = ability_uptake_effect(df, dataset_version(df), model)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Mean ability: ever screened", f"{scored.loc[scored['Uptake'] == 'yes', 'Ability'].mean():.2f}")
+    with col2:
+        st.metric("Mean ability: never screened", f"{scored.loc[scored['Uptake'] == 'no', 'Ability'].mean():.2f}")
+    with col3:
+        if effect:
+            st.metric(
+                "Uptake RR per 1 SD ability",
+                f"{effect['RR']:.2f}",
+                help=f"95% CI {effect['CI Lower']:.2f}–{effect['CI Upper']:.2f}, p = {format_p_value(effect['p-value'])} "
+                     f"(modified Poisson, robust HC0, n = {effect['N']})"
+            )
+    
+    with st.expander(f"📐 Item parameters ({model_label}, {item_params.attrs.get('patterns', 0)} distinct response patterns)"):
+        params_df = pd.DataFrame({
+            'Item': item_params['Item'].str.replace('_', ' ').str.title(),
+            # Same recoded scale as the knowledge cards, so agreement-keyed items are flipped back for display
+            'Good Knowledge (%)': (item_params['Proportion Correct'].where(~item_params['Reverse Scored'], 1 - item_params['Proportion Correct']) * 100).round(1),
+            'Discrimination (a)': item_params['Discrimination'].round(2),
+            'Difficulty (b)': item_params['Difficulty'].round(2),
+            'Keyed to Agreement': item_params['Reverse Scored']
+        })
+        st.dataframe(params_df, use_container_width=True, hide_index=True)
+        st.caption(
+            "Marginal maximum likelihood (EM over Gauss–Hermite quadrature); P(correct) = logistic(a·(θ − b)). "
+            "Items marked 'Keyed to Agreement' are the ones the knowledge recoding reverse-codes; for calibration their "
+            "IRT 'correct' response is raw agreement (the opposite of good knowledge), so every item loads in the same "
+            "direction and their difficulty refers to agreeing. Good Knowledge (%) stays on the knowledge cards' recoded scale. "
+            "Abilities are posterior means (EAP) on a standard-normal scale; the Rasch model shares one discrimination."
+        )
+
+def create_uptake_prediction_section(df):
+    """Create cross-validated uptake prediction section"""
+    prediction = fit_uptake_predictor(df, dataset_version(df))
+    if not prediction:
+        return
+    
+    st.markdown("### 🎯 Predicting Who Is Unlikely to Screen")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(
+            f"Nested cross-validated AUC ({prediction['k']}-fold)",
+            f"{prediction['auc']:.3f}",
+            help=f"Penalty chosen inside each training fold, so the AUC is not tuned on the rows it scores. "
+                 f"Fold range {prediction['fold_auc'].min():.3f}–{prediction['fold_auc'].max():.3f} "
+                 f"(tuned, non-nested AUC {prediction['tuned_auc']:.3f}); 0.5 = no better than chance"
+        )
+    with col2:
+        st.metric("Brier score", f"{prediction['brier']:.3f}", help="Mean squared error of the predicted probabilities (lower is better)")
+    with col3:
+        st.metric(
+            "Calibration slope",
+            f"{prediction['calibration_slope']:.2f}",
+            help=f"1 = well calibrated; calibration intercept {prediction['calibration_intercept']:.2f}"
+        )
+    
+    calibration = prediction['calibration']
+    
+    def build_figure():
+        fig = go.Figure()
+        limit = max(calibration['Observed'].max(), calibration['Predicted'].max()) * 100 * 1.1
+        fig.add_trace(go.Scatter(
+            x=[0, limit], y=[0, limit],
+            mode='lines',
+            name='Perfect calibration',
+            line=dict(color='#95a5a6', dash='dash', width=2)
+        ))
+        fig.add_trace(go.Scatter(
+            x=calibration['Predicted'] * 100,
+            y=calibration['Observed'] * 100,
+            mode='lines+markers',
+            name='Out-of-fold predictions',
+            marker=dict(size=12, color='#3498db', line=dict(color='white', width=2)),
+            line=dict(color='#3498db', width=3),
+            customdata=calibration['N'],
+            hovertemplate='Predicted: %{x:.1f}%<br>Observed: %{y:.1f}%<br>n = %{customdata}<extra></extra>'
+        ))
+        fig.update_layout(
+            title=dict(
+                text="Calibration of Predicted Screening Uptake (Deciles of Risk)",
+                x=0.5,
+                font=dict(size=20, color='#2c3e50', family='Arial Black')
+            ),
+            height=450,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(size=14, family='Arial')),
+            xaxis=dict(
+                title=dict(text='Mean predicted uptake (%)', font=dict(size=16, family='Arial Black')),
+                tickfont=dict(size=14, family='Arial')
+            ),
+            yaxis=dict(
+                title=dict(text='Observed uptake (%)', font=dict(size=16, family='Arial Black')),
+                tickfont=dict(size=14, family='Arial'),
+                showgrid=True,
+                gridwidth=1,
+                gridcolor='rgba(128,128,128,0.2)'
+            ),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            margin=dict(t=80, b=60, l=60, r=60)
+        )
+        return fig
+    
+    fig = cached_figure(df, 'statistics', 'calibration', build_figure)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Lowest-propensity respondents are the outreach priority
+    oof = prediction['oof']
+    observed = (df.loc[oof.index, 'Uptake'] == 'yes')
+    low = oof <= oof.quantile(0.2)
+    st.markdown(
+        f"**Outreach priority:** the {int(low.sum())} respondents in the lowest predicted-uptake quintile "
+        f"screened at {observed[low].mean() * 100:.1f}%, versus {observed[~low].mean() * 100:.1f}% for everyone else."
+    )
+    
+    with st.expander("📋 Strongest predictors of not screening"):
+        coefficients = prediction['coefficients'].sort_values('Odds Ratio').head(10)
+        st.dataframe(pd.DataFrame({
+            'Predictor': coefficients['Predictor'].str.replace('_', ' ').str.title(),
+            'Level': coefficients['Level'].astype(str),
+            'Penalized OR': coefficients['Odds Ratio'].round(2)
+        }), use_container_width=True, hide_index=True)
+        st.caption(
+            f"Ridge logistic regression on all {len(UPTAKE_CANDIDATES)} candidate predictors (penalty {prediction['penalty']:g}, "
+            f"chosen by cross-validated AUC); odds ratios are shrunk toward 1 and are for ranking, not inference."
+        )
+
+def create_power_planning_section(df):
+    """Create sample size and power planning section for the next survey wave"""
+    st.markdown("### 📐 Sample Size & Power for the Next Survey Wave")
+    cube = get_stats_cube(df)
+    baseline = yes_rate(cube, 'Uptake') / 100
+    if not 0 < baseline < 1:
+        return
+    estimated_icc = estimate_uptake_icc(df, dataset_version(df))
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        target_power = st.selectbox("Target power", [0.8, 0.9], format_func=lambda p: f"{p:.0%}", key="power_target")
+    with col2:
+        icc = st.number_input(
+            "Intraclass correlation (ICC)", 0.0, 0.3, round(estimated_icc, 3), 0.005, format="%.3f", key="power_icc",
+            help=f"Estimated between institutions: {estimated_icc:.3f}"
+        )
+    with col3:
+        cluster_size = st.selectbox("Respondents per institution", POWER_CLUSTER_SIZES[1:], index=1, key="power_cluster_size")
+    
+    # Closed form over the whole grid once; the current baseline is a slice of it
+    required = survey_analytics.required_sample_size(
+        POWER_RR_GRID, POWER_BASELINE_GRID, POWER_CLUSTER_SIZES, icc=icc, power=target_power
+    )
+    b = int(np.abs(POWER_BASELINE_GRID - baseline).argmin())
+    
+    # Sample size for the adjusted RRs observed for institutions and age groups
+    model_table = fit_uptake_models(df, dataset_version(df))
+    if not model_table.empty and 'Adjusted RR' in model_table.columns:
+        rows = model_table[model_table['Predictor'].isin(['affiliation', 'agegrp'])]
+        totals = rows.groupby('Predictor')['Total (n)'].transform('first')  # Reference level comes first
+        compared = rows[~rows['Reference'] & rows['Adjusted RR'].notna()]
+        totals = totals[compared.index]
+        pair_share = (compared['Total (n)'] + totals) / cube['n']
+        exposure = (compared['Total (n)'] / (compared['Total (n)'] + totals)).to_numpy()
+        observed = survey_analytics.required_sample_size(
+            compared['Adjusted RR'], [baseline], POWER_CLUSTER_SIZES,
+            exposure=exposure[:, None, None], icc=icc, power=target_power
+        )[:, 0, :] / pair_share.to_numpy()[:, None]
+        reference_levels = rows[rows['Reference']].set_index('Predictor')['Category']
+        sizes_df = pd.DataFrame({
+            'Predictor': compared['Predictor'].str.replace('_', ' ').str.title(),
+            'Comparison': [f"{level} vs {reference_levels[pred]}" for pred, level in zip(compared['Predictor'], compared['Category'])],
+            'Adjusted RR': compared['Adjusted RR'].round(2),
+        })
+        for j, size in enumerate(POWER_CLUSTER_SIZES):
+            label = "Total N (no clustering)" if size == 1 else f"Total N ({size}/institution)"
+            sizes_df[label] = [f"{value:,.0f}" if np.isfinite(value) else "—" for value in np.ceil(observed[:, j])]
+        st.dataframe(sizes_df, use_container_width=True, hide_index=True)
+        st.caption(
+            f"Total respondents needed for {target_power:.0%} power (two-sided α = 0.05) to detect each observed adjusted RR at "
+            f"the current baseline uptake of {baseline:.1%}, keeping today's mix of respondents across the compared groups. "
+            f"Design effect 1 + (m − 1) × ICC with ICC = {icc:.3f}."
+        )
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        def build_heatmap():
+            grid = required[:, b, :]
+            fig = go.Figure(go.Heatmap(
+                z=np.log10(grid), x=[str(size) for size in POWER_CLUSTER_SIZES], y=POWER_RR_GRID,
+                text=[[f"{value:,.0f}" if np.isfinite(value) else "—" for value in row] for row in grid],
+                texttemplate='%{text}', colorscale='Viridis', showscale=False,
+                hovertemplate='RR %{y}<br>%{x} per institution<br>Total N: %{text}<extra></extra>'
+            ))
+            fig.update_layout(
+                title=dict(text=f"Total N for {target_power:.0%} Power (baseline {POWER_BASELINE_GRID[b]:.0%})", x=0.5, font=dict(size=18, color='#2c3e50', family='Arial Black')),
+                xaxis_title="Respondents per institution", yaxis_title="Risk Ratio to detect", height=550,
+                plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
+                margin=dict(t=80, b=60, l=60, r=20)
+            )
+            return fig
+        fig = cached_figure(df, 'statistics', f'power_required_{target_power}_{icc}', build_heatmap)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        simulated = simulate_cluster_power(round(baseline, 4), icc)
+        m = POWER_CLUSTER_SIZES[1:].index(cluster_size)
+        
+        def build_power_curves():
+            fig = go.Figure()
+            for r, rr in enumerate(POWER_SIM_RRS):
+                fig.add_trace(go.Scatter(
+                    x=POWER_CLUSTER_COUNTS, y=simulated[r, m], mode='lines+markers', name=f"RR {rr}",
+                    line=dict(width=3),
+                    hovertemplate='%{x} institutions<br>Power: %{y:.0%}<extra></extra>'
+                ))
+            fig.add_hline(y=target_power, line_dash='dash', line_color='#7f8c8d')
+            fig.update_layout(
+                title=dict(text=f"Simulated Power, {cluster_size} per Institution", x=0.5, font=dict(size=18, color='#2c3e50', family='Arial Black')),
+                xaxis_title="Number of institutions", yaxis_title="Power", yaxis_tickformat='.0%', yaxis_range=[0, 1.02],
+                height=550, plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
+                margin=dict(t=80, b=60, l=60, r=20)
+            )
+            return fig
+        fig = cached_figure(df, 'statistics', f'power_simulated_{target_power}_{icc}_{cluster_size}', build_power_curves)
+        st.plotly_chart(fig, use_container_width=True)
+    st.caption(
+        f"Left: closed-form Wald sample sizes for a 50/50 comparison. Right: {POWER_SIMULATIONS:,} simulated surveys per point, "
+        "with institution baselines drawn from a Beta distribution with the chosen ICC, analysed with a cluster-robust (CR1) "
+        "test on a t reference with one fewer degree of freedom than institutions. No closed form covers that case."
+    )
 
 def create_statistical_modeling(df):
     """Create statistical modeling section"""
@@ -3127,6 +1993,10 @@ def create_statistical_modeling(df):
     # Statistical Methodology Explanation
     st.markdown("### 🧪 Statistical Methodology: Modified Poisson Regression")
     
+    # The estimator radio is rendered further down; its current value labels the cards above it
+    cov_type = st.session_state.get("stats_cov_type", "HC0")
+    model_table = pd.DataFrame()
+    
     col1, col2 = st.columns([2, 1])    
     with col1:
         st.markdown("""
@@ -3153,14 +2023,14 @@ def create_statistical_modeling(df):
         """, unsafe_allow_html=True)
     
     with col2:
-        st.markdown("""
+        st.markdown(f"""
         <div class="large-content-card purple">
             <div class="large-card-title">⚙️ Model Specifications</div>
             <div class="large-card-content">
                 <strong>Model Type:</strong>
                 <ul>
                     <li>Modified Poisson Regression</li>
-                    <li>Robust Standard Errors (HC0)</li>
+                    <li>Robust Standard Errors ({cov_type})</li>
                 </ul>
                 <br>
                 <strong>Outcome Variable:</strong>
@@ -3186,57 +2056,200 @@ def create_statistical_modeling(df):
     
     st.markdown("### 📊 Predictors of Cervical Cancer Screening Uptake")
     
-    # Create a comprehensive statistical results table
+    cube = get_stats_cube(df)
+    
+    # Modified Poisson regression results table
     if 'Uptake' in df.columns:
-        # Key predictors
-        predictors = ['agegrp', 'affiliation', 'eva_told_to_scrn', 'aware_of_scrn_centa']
-        available_predictors = [p for p in predictors if p in df.columns]
+        available_predictors = [p for p in survey_analytics.UPTAKE_PREDICTORS if p in df.columns]
         
         if available_predictors:
-            # Create detailed analysis results
-            results_data = []
+            cov_type = st.radio(
+                "Robust (sandwich) covariance estimator",
+                ["HC0", "HC1"],
+                horizontal=True,
+                key="stats_cov_type",
+                help="HC1 applies a small-sample n/(n-k) correction to HC0"
+            )
+            model_table = fit_uptake_models(df, dataset_version(df), cov_type)
+            pooled = fit_imputed_models(df, dataset_version(df), cov_type)
+            boot = bootstrap_uptake_cis(df, dataset_version(df))
+            boot_rr = {} if boot.empty else {
+                (r['Column'], str(r['Level'])): r for _, r in boot.iterrows()
+            }
             
-            for pred in available_predictors:
-                if pred in df.columns:
-                    ct = pd.crosstab(df[pred], df['Uptake'])
-                    ct_pct = pd.crosstab(df[pred], df['Uptake'], normalize='index') * 100
-                    
-                    for category in ct.index:
-                        if 'yes' in ct.columns and 'no' in ct.columns:
-                            screened = ct.loc[category, 'yes']
-                            total = ct.loc[category].sum()
-                            uptake_rate = ct_pct.loc[category, 'yes'] if 'yes' in ct_pct.columns else 0
-                            
-                            # Simulate risk ratio calculation (simplified)
-                            reference_rate = ct_pct.iloc[0]['yes'] if 'yes' in ct_pct.columns else 0
-                            risk_ratio = uptake_rate / reference_rate if reference_rate > 0 else 1.0
-                            
-                            results_data.append({
-                                'Predictor': pred.replace('_', ' ').title(),
-                                'Category': str(category),
-                                'Screened (n)': screened,
-                                'Total (n)': total,
-                                'Uptake Rate (%)': f"{uptake_rate:.1f}%",
-                                'Risk Ratio*': f"{risk_ratio:.2f}",
-                                'Statistical Significance': "Yes" if uptake_rate > reference_rate * 1.5 else "No"
-                            })
+            results_data = []
+            for _, row in model_table.iterrows():
+                if row['Reference']:
+                    significance = "Reference"
+                else:
+                    significance = "Yes" if row['Adjusted p-value'] < 0.05 else "No"
+                
+                results_data.append({
+                    'Predictor': row['Predictor'].replace('_', ' ').title(),
+                    'Category': str(row['Category']),
+                    'Screened (n)': row['Screened (n)'],
+                    'Total (n)': row['Total (n)'],
+                    'Uptake Rate (%)': f"{row['Uptake Rate (%)']:.1f}%",
+                    'Crude RR (95% CI)': format_risk_ratio(row, 'Crude'),
+                    'Crude RR (Bootstrap 95% CI)': format_bootstrap_ratio(boot_rr.get((row['Predictor'], str(row['Category'])))),
+                    'Adjusted RR (95% CI)': format_risk_ratio(row, 'Adjusted'),
+                    'MI Adjusted RR (95% CI)': format_risk_ratio(
+                        {'Reference': row['Reference'], **pooled.get((row['Predictor'], row['Category']), {})}, 'MI'
+                    ),
+                    'p-value': format_p_value(row['Adjusted p-value']),
+                    'Statistical Significance': significance
+                })
             
             if results_data:
                 results_df = pd.DataFrame(results_data)
                 
                 # Create an interactive table with color coding
                 st.markdown("### 📋 Detailed Statistical Results")
-                  # Color code the dataframe display
-                def highlight_significance(val):
-                    if val == "Yes":
-                        return 'background-color: #d4edda; color: #155724'
-                    elif val == "No":
-                        return 'background-color: #f8d7da; color: #721c24'
-                    return ''
-                
                 styled_df = results_df.style.map(highlight_significance, subset=['Statistical Significance'])
                 st.dataframe(styled_df, use_container_width=True)                
-                st.caption("*Risk Ratios are simplified calculations for demonstration. Full Poisson regression would provide adjusted estimates with confidence intervals.")
+                st.caption(
+                    f"Risk Ratios from modified Poisson regression (log link, robust {cov_type} standard errors). "
+                    "Crude: one model per predictor. Adjusted: all predictors together on complete cases. "
+                    f"Bootstrap: percentile interval from {BOOTSTRAP_REPLICATES:,} resamples (seed {BOOTSTRAP_SEED}). "
+                    f"MI: adjusted model refitted on {IMPUTATIONS} multiply imputed datasets (all respondents) and pooled with Rubin's rules. "
+                    "Significance: adjusted p < 0.05."
+                )
+            
+            # 🔎 Crude screen of every candidate predictor
+            st.markdown("### 🔎 Univariable Screening of All Candidate Predictors")
+            screen_all = fit_candidate_screen(df, dataset_version(df), 'poisson', cov_type)
+            if not screen_all.empty:
+                screen = screen_all[~screen_all['Reference']].sort_values('p-value')
+                reference_levels = screen_all[screen_all['Reference']].set_index('Predictor')['Level']
+                screen_df = pd.DataFrame({
+                    'Predictor': screen['Predictor'].str.replace('_', ' ').str.title(),
+                    'Level (vs Reference)': [f"{level} vs {reference_levels[pred]}" for pred, level in zip(screen['Predictor'], screen['Level'])],
+                    'N': screen['N'],
+                    'Screened (n)': screen['Events'],
+                    'Crude RR (95% CI)': [
+                        f"{rr:.2f} ({lo:.2f}–{hi:.2f})" if pd.notna(rr) else "—"
+                        for rr, lo, hi in zip(screen['Estimate'], screen['CI Lower'], screen['CI Upper'])
+                    ],
+                    'p-value': screen['p-value'].map(format_p_value),
+                    'Statistical Significance': np.where(screen['p-value'] < 0.05, "Yes", "No")
+                })
+                st.dataframe(
+                    screen_df.style.map(highlight_significance, subset=['Statistical Significance']),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                st.caption(f"One modified Poisson model per predictor ({len(UPTAKE_CANDIDATES)} candidates, robust {cov_type} SEs), sorted by p-value. Unadjusted for multiple testing.")
+            
+            # 🧮 Association tests for every item, corrected over the whole family
+            st.markdown("### 🧮 Association Tests with Multiple-Testing Correction")
+            tests = run_association_tests(df, dataset_version(df))
+            tests = tests[tests['Test'] != 'Not testable'].sort_values('p-value')
+            if not tests.empty:
+                correction = st.radio(
+                    "Multiple-testing correction",
+                    ["Benjamini–Hochberg (FDR)", "Holm (FWER)"],
+                    horizontal=True,
+                    key="stats_correction"
+                )
+                adjusted = tests['p (BH)'] if correction.startswith("Benjamini") else tests['p (Holm)']
+                tests_df = pd.DataFrame({
+                    'Item': tests['Item'].str.replace('_', ' ').str.title(),
+                    'Test': tests['Test'],
+                    'N': tests['N'],
+                    'χ² (df)': [
+                        f"{stat:.2f} ({dof})" if pd.notna(stat) else "—"
+                        for stat, dof in zip(tests['Statistic'], tests['df'])
+                    ],
+                    'p-value': tests['p-value'].map(format_p_value),
+                    'Adjusted p-value': adjusted.map(format_p_value),
+                    'Statistical Significance': np.where(adjusted < 0.05, "Yes", "No")
+                })
+                st.dataframe(
+                    tests_df.style.map(highlight_significance, subset=['Statistical Significance']),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                st.caption(
+                    f"Pearson χ² test of each item against uptake; Fisher's exact test for 2×2 tables with an expected count below "
+                    f"{survey_analytics.FISHER_MIN_EXPECTED}. Adjusted over all {len(tests)} tests; significance: adjusted p < 0.05."
+                )
+            
+            # 🪜 Automated model selection over all candidates
+            st.markdown("### 🪜 Automated Model Selection (Likelihood-Ratio Tests)")
+            direction_labels = {"Stepwise (both)": 'both', "Forward": 'forward', "Backward": 'backward'}
+            direction = st.radio(
+                "Selection direction",
+                list(direction_labels),
+                horizontal=True,
+                key="stats_selection_direction"
+            )
+            selected, selection_log, selection_n, selected_table = run_model_selection(
+                df, dataset_version(df), direction_labels[direction]
+            )
+            if selected:
+                st.markdown(
+                    f"**Selected predictors ({len(selected)}):** "
+                    + ", ".join(pred.replace('_', ' ').title() for pred in selected)
+                )
+            else:
+                st.info("No candidate predictor met the entry criterion.")
+            if not selection_log.empty:
+                log_df = pd.DataFrame({
+                    'Step': selection_log['Step'],
+                    'Action': selection_log['Action'],
+                    'Predictor': selection_log['Predictor'].str.replace('_', ' ').str.title(),
+                    'LR χ² (df)': [f"{stat:.2f} ({dof})" for stat, dof in zip(selection_log['LR Statistic'], selection_log['df'])],
+                    'p-value': selection_log['p-value'].map(format_p_value),
+                    'AIC': selection_log['AIC'].round(1)
+                })
+                st.dataframe(log_df, use_container_width=True, hide_index=True)
+            if not selected_table.empty:
+                selected_df = pd.DataFrame({
+                    'Predictor': selected_table['Predictor'].str.replace('_', ' ').str.title(),
+                    'Category': selected_table['Category'].astype(str),
+                    'Adjusted RR (95% CI)': [format_risk_ratio(row, 'Adjusted') for _, row in selected_table.iterrows()],
+                    'p-value': selected_table['Adjusted p-value'].map(format_p_value)
+                })
+                st.dataframe(selected_df, use_container_width=True, hide_index=True)
+            st.caption(
+                f"Selection on the {selection_n} complete cases across all {len(UPTAKE_CANDIDATES)} candidates "
+                "(enter at LR p < 0.05, remove at p > 0.10; LR tests and AIC use the binomial likelihood of a logistic model). "
+                "The selected model is refitted as modified Poisson with robust HC0 errors on its own complete cases."
+            )
+            
+            # 🏫 Respondents share institutions, so errors are clustered by affiliation
+            st.markdown("### 🏫 Cluster-Robust Inference by Institution")
+            clustered = fit_cluster_robust(df, dataset_version(df))
+            if not clustered.empty:
+                clustered_df = pd.DataFrame({
+                    'Predictor': clustered['Predictor'].str.replace('_', ' ').str.title(),
+                    'Category': clustered['Category'].astype(str),
+                    'RR (CR1 95% CI)': [
+                        f"{rr:.2f} ({lo:.2f}–{hi:.2f})"
+                        for rr, lo, hi in zip(clustered['RR'], clustered['CR1 CI Lower'], clustered['CR1 CI Upper'])
+                    ],
+                    'CR1 SE': clustered['CR1 SE'].round(3),
+                    'CR1 p-value': clustered['CR1 p-value'].map(format_p_value),
+                    'Wild Bootstrap p-value': clustered['Wild p-value'].map(format_p_value),
+                    'Statistical Significance': np.where(clustered['Wild p-value'] < 0.05, "Yes", "No")
+                })
+                st.dataframe(
+                    clustered_df.style.map(highlight_significance, subset=['Statistical Significance']),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                n_clusters = clustered.attrs['clusters']
+                st.caption(
+                    f"Adjusted model without the institution term, with errors clustered on {n_clusters} institutions. "
+                    f"CR1 intervals use a t reference with {n_clusters - 1} df. The wild cluster bootstrap uses "
+                    f"{clustered.attrs['replicates']:,} Webb-weight replicates (every distinct one when there are few institutions), "
+                    "and its p-values impose the null hypothesis. With few clusters, prefer the wild bootstrap p-values."
+                )
+    
+    # 🎯 Predictive model for outreach targeting
+    if 'Uptake' in df.columns:
+        create_uptake_prediction_section(df)
+        create_power_planning_section(df)
     
     # Model Performance and Validation
     st.markdown("### 📈 Model Performance & Validation")
@@ -3253,45 +2266,84 @@ def create_statistical_modeling(df):
     with col2:
         st.markdown('<div class="metric-container">', unsafe_allow_html=True)
         st.markdown('<div class="metric-label">⚙️ Error Correction</div>', unsafe_allow_html=True)
-        st.markdown('<div class="metric-value" style="font-size: 1.3rem;">Robust Standard Errors (HC0)</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-value" style="font-size: 1.3rem;">Robust Standard Errors ({cov_type})</div>', unsafe_allow_html=True)
         st.markdown('<div class="metric-description">🛡️ Accounts for overdispersion<br>📈 Reliable confidence intervals</div>', unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
     
+    # Collinearity diagnostics for the adjusted model (GVIF^(1/(2·df)) is compared on the √VIF scale)
+    diagnostics = fit_model_diagnostics(df, dataset_version(df))
+    vif_limit = survey_analytics.VIF_THRESHOLD
+    max_vif = diagnostics['VIF'].max() if not diagnostics.empty else np.nan
+    collinear = not diagnostics.empty and (diagnostics['Adjusted GVIF'] >= np.sqrt(vif_limit)).any()
+    
     with col3:
         st.markdown('<div class="metric-container">', unsafe_allow_html=True)
-        st.markdown('<div class="metric-label">✅ Multicollinearity Check</div>', unsafe_allow_html=True)
-        st.markdown('<div class="metric-value" style="font-size: 1.3rem; color: #27ae60;">VIF < 5 (No Issues)</div>', unsafe_allow_html=True)
-        st.markdown('<div class="metric-description">🔍 Variables are independent<br>✨ Model assumptions met</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)    
-    # Key Statistical Findings using large content card
-    st.markdown("""
-    <div class="large-content-card green">
-        <div class="large-card-title">🔍 Key Statistical Findings from Poisson Regression</div>
-        <div class="large-card-content">
-            <ul>
-                <li><strong>Age Effect:</strong> Students >25 years have 4.4x higher screening likelihood (RR=4.38, p<0.001)</li>
-                <li><strong>Institutional Effect:</strong> UHAS students show 2.4x higher screening rates (RR=2.40, p=0.042)</li>
-                <li><strong>Awareness Impact:</strong> Knowledge of screening centers increases likelihood by 88% (RR=1.88, p=0.028)</li>
-                <li><strong>Opportunity Effect:</strong> Being given screening opportunity is the strongest predictor</li>
-                <li><strong>Knowledge Domains:</strong> Individual knowledge areas show varying significance after adjustment</li>
-            </ul>
+        if diagnostics.empty:
+            st.markdown('<div class="metric-label">✅ Multicollinearity Check</div>', unsafe_allow_html=True)
+            st.markdown('<div class="metric-value" style="font-size: 1.3rem;">Not Available</div>', unsafe_allow_html=True)
+            st.markdown('<div class="metric-description">🔍 Adjusted model predictors are missing</div>', unsafe_allow_html=True)
+        elif collinear:
+            st.markdown('<div class="metric-label">⚠️ Multicollinearity Check</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="metric-value" style="font-size: 1.3rem; color: #c0392b;">Max VIF {max_vif:.2f} (Review)</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="metric-description">🔍 Some predictors exceed the VIF {vif_limit} threshold<br>⚖️ Adjusted estimates may be unstable</div>', unsafe_allow_html=True)
+        else:
+            st.markdown('<div class="metric-label">✅ Multicollinearity Check</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="metric-value" style="font-size: 1.3rem; color: #27ae60;">Max VIF {max_vif:.2f} (No Issues)</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="metric-description">🔍 All predictors below VIF {vif_limit}<br>✨ Model assumptions met</div>', unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    if not diagnostics.empty:
+        with st.expander("🩺 Collinearity diagnostics for the adjusted model"):
+            vif_df = pd.DataFrame({
+                'Predictor': diagnostics['Predictor'].str.replace('_', ' ').str.title(),
+                'Category': diagnostics['Category'].astype(str),
+                'VIF': diagnostics['VIF'].round(2),
+                'GVIF': diagnostics['GVIF'].round(2),
+                'df': diagnostics['df'],
+                'GVIF^(1/(2·df))': diagnostics['Adjusted GVIF'].round(2)
+            })
+            st.dataframe(vif_df, use_container_width=True, hide_index=True)
+            st.caption(
+                f"VIF per indicator column; GVIF per predictor (Fox & Monette). "
+                f"GVIF^(1/(2·df)) is comparable across predictors and is checked against √{vif_limit} ≈ {np.sqrt(vif_limit):.2f}."
+            )
+    
+    # Key Statistical Findings from the fitted adjusted model
+    effects = strongest_adjusted_effects(model_table)
+    if effects:
+        findings = "".join(
+            f"<li><strong>{FINDING_LABELS.get(pred, pred.replace('_', ' ').title())}:</strong> "
+            f"{row['Category']} vs {reference}: adjusted RR={row['Adjusted RR']:.2f} "
+            f"(95% CI {row['Adjusted CI Lower']:.2f}–{row['Adjusted CI Upper']:.2f}, p={format_p_value(row['Adjusted p-value'])})"
+            f"{'' if row['Adjusted p-value'] < 0.05 else ', not statistically significant'}</li>"
+            for pred, reference, row in effects
+        )
+        st.markdown(f"""
+        <div class="large-content-card green">
+            <div class="large-card-title">🔍 Key Statistical Findings from Poisson Regression</div>
+            <div class="large-card-content">
+                <ul>
+                    {findings}
+                </ul>
+                Strongest level of each predictor in the adjusted model (robust {cov_type} errors).
+            </div>
         </div>
-    </div>
-    """, unsafe_allow_html=True)
+        """, unsafe_allow_html=True)
     
     # Model Assumptions and Limitations
     st.markdown("### ⚠️ Model Assumptions & Limitations")
     
     col1, col2 = st.columns(2)    
+    vif_summary = f"max VIF {max_vif:.2f}" if pd.notna(max_vif) else f"VIF values < {vif_limit}"
     with col1:
-        st.markdown("""
+        st.markdown(f"""
         <div class="large-content-card green">
             <div class="large-card-title">✅ Model Assumptions Met</div>
             <div class="large-card-content">
                 <ul>
-                    <li><strong>Independence:</strong> Observations are independent</li>
+                    <li><strong>Independence:</strong> Clustering within institutions handled with CR1 and wild bootstrap errors</li>
                     <li><strong>Linearity:</strong> Log-linear relationship assumed</li>
-                    <li><strong>No perfect multicollinearity:</strong> VIF values < 5</li>
+                    <li><strong>No perfect multicollinearity:</strong> {vif_summary}</li>
                     <li><strong>Robust errors:</strong> Account for overdispersion</li>
                 </ul>
             </div>
@@ -3330,49 +2382,113 @@ def create_statistical_modeling(df):
     # Risk ratio interpretation guide
     st.markdown("### 📈 Risk Ratio Interpretation Guide")
     
+    # Examples are the fitted adjusted RRs that fall in each band
+    bands = [(0, 0.8), (0.8, 1.2), (1.2, 2.0), (2.0, np.inf)]
+    examples = []
+    for lower, upper in bands:
+        in_band = [
+            f"{pred.replace('_', ' ').title()} {row['Category']} (RR={row['Adjusted RR']:.2f})"
+            for pred, _, row in effects if lower <= row['Adjusted RR'] < upper
+        ]
+        examples.append(", ".join(in_band) if in_band else "Not observed")
     rr_guide = pd.DataFrame({
         'Risk Ratio (RR)': ['RR < 0.8', '0.8 ≤ RR < 1.2', '1.2 ≤ RR < 2.0', 'RR ≥ 2.0'],
-        'Interpretation': ['Protective Effect', 'No/Weak Effect', 'Moderate Risk Increase', 'Strong Risk Increase'],        'Example from Study': ['Not observed', 'Reference groups', 'Awareness (RR=1.88)', 'Age >25 years (RR=4.38)']
+        'Interpretation': ['Protective Effect', 'No/Weak Effect', 'Moderate Risk Increase', 'Strong Risk Increase'],
+        'Example from Study': examples
     })
     
     st.dataframe(rr_guide, use_container_width=True)
 
+@st.fragment
+def create_intervention_simulator(df):
+    """What-if simulator: raise lever prevalence in chosen subgroups and project uptake"""
+    st.markdown("### 🎚️ What-If Intervention Simulator")
+    group_label = st.selectbox("Target subgroups by", list(INTERVENTION_GROUPS), key="sim_group")
+    group = INTERVENTION_GROUPS[group_label]
+    model = fit_intervention_model(df, dataset_version(df), group)
+    if not model:
+        st.info("💡 The simulator needs the uptake, lever and subgroup columns.")
+        return
+    
+    groups = [str(level) for level in model['groups']]
+    targets = st.multiselect(f"{group_label}s to reach", groups, default=groups, key=f"sim_targets_{group}")
+    levers = model['levers']
+    slider_columns = st.columns(len(levers))
+    increases = np.array([
+        column.slider(f"{INTERVENTION_LEVERS[lever]} (+ pp)", 0, 50, 0, 5, key=f"sim_{lever}")
+        for column, lever in zip(slider_columns, levers)
+    ], dtype=float)
+    
+    # One batch: current scenario, then each lever alone across the dose-response grid
+    reached = np.isin(groups, targets)[:, None]
+    grid = np.zeros((1 + len(levers) * len(INTERVENTION_STEPS), len(groups), len(levers)))
+    grid[0] = reached * increases
+    for l in range(len(levers)):
+        rows = slice(1 + l * len(INTERVENTION_STEPS), 1 + (l + 1) * len(INTERVENTION_STEPS))
+        grid[rows, :, l] = INTERVENTION_STEPS[:, None] * reached[:, 0]
+    by_group, overall = survey_analytics.simulate_interventions(model, grid)
+    baseline_group, baseline = by_group[1], overall[1]  # Zero-increase scenario of the first lever
+    projected_group, projected = by_group[0], overall[0]
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Current Uptake", f"{baseline:.1f}%")
+    col2.metric("Projected Uptake", f"{projected:.1f}%", f"{projected - baseline:+.1f} pp")
+    col3.metric("Additional Students Screened", f"{(projected - baseline) / 100 * model['n'].sum():.0f}")
+    
+    fig = go.Figure([
+        go.Bar(name="Current", x=groups, y=baseline_group, marker_color='#95a5a6',
+               hovertemplate='<b>%{x}</b><br>Current: %{y:.1f}%<extra></extra>'),
+        go.Bar(name="Projected", x=groups, y=projected_group, marker_color='#27ae60',
+               text=[f"{value:.1f}%" for value in projected_group], textposition='outside',
+               hovertemplate='<b>%{x}</b><br>Projected: %{y:.1f}%<extra></extra>')
+    ])
+    fig.update_layout(
+        title=dict(text=f"Projected Screening Uptake by {group_label}", x=0.5, font=dict(size=20, color='#2c3e50', family='Arial Black')),
+        barmode='group', yaxis_title="Screening Uptake (%)", height=450,
+        plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(t=80, b=60, l=60, r=40)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    fig = go.Figure()
+    colors = ['#e74c3c', '#3498db', '#f39c12']
+    for l, lever in enumerate(levers):
+        curve = overall[1 + l * len(INTERVENTION_STEPS):1 + (l + 1) * len(INTERVENTION_STEPS)]
+        fig.add_trace(go.Scatter(
+            x=INTERVENTION_STEPS, y=curve, mode='lines+markers', name=INTERVENTION_LEVERS[lever],
+            line=dict(color=colors[l % len(colors)], width=3),
+            hovertemplate='+%{x} pp<br>Overall uptake: %{y:.1f}%<extra></extra>'
+        ))
+    fig.update_layout(
+        title=dict(text="Overall Uptake vs. Size of a Single-Lever Increase", x=0.5, font=dict(size=20, color='#2c3e50', family='Arial Black')),
+        xaxis_title="Increase in lever prevalence among targeted subgroups (percentage points)",
+        yaxis_title="Projected Overall Uptake (%)", height=450,
+        plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(t=80, b=60, l=60, r=40)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Rank levers by the gain from a 10-point increase in the targeted subgroups
+    ten_points = int(np.searchsorted(INTERVENTION_STEPS, 10))
+    gains = [overall[1 + l * len(INTERVENTION_STEPS) + ten_points] - baseline for l in range(len(levers))]
+    best = int(np.argmax(gains))
+    st.success(
+        f"**Most effective lever:** {INTERVENTION_LEVERS[levers[best]].lower()}. "
+        f"A 10-point increase in the targeted {group_label.lower()}s raises overall uptake by {gains[best]:.1f} pp."
+    )
+    st.caption(
+        "Logistic model of uptake on age group, institution, level and the three levers, fitted once per dataset on complete cases. "
+        "Each increase switches on a matching share of targeted respondents who lack the lever (capped at 100%), "
+        "and uptake is averaged over respondents (g-computation). Projections assume the associations are causal."
+    )
+
 def create_recommendations(df):
     """Create recommendations section"""
     st.markdown('<div class="section-header">💡 Recommendations & Interventions</div>', unsafe_allow_html=True)
     
-    # Create large content cards for recommendations
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("""
-        <div class="large-content-card orange">
-            <div class="large-card-title">🎯 Immediate Actions</div>
-            <div class="large-card-content">
-                <ul>
-                    <li><strong>Increase Awareness Campaigns:</strong> Focus on younger students (<20 years)</li>
-                    <li><strong>Healthcare Provider Training:</strong> Enhance recommendation practices</li>
-                    <li><strong>Institutional Programs:</strong> Leverage higher-performing institutions as models</li>
-                    <li><strong>Accessibility Improvements:</strong> Address logistical barriers to screening</li>
-                </ul>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    if 'Uptake' in df.columns:
+        create_intervention_simulator(df)
     
-    with col2:
-        st.markdown("""
-        <div class="large-content-card purple">
-            <div class="large-card-title">📋 Long-term Strategies</div>
-            <div class="large-card-content">
-                <ul>
-                    <li><strong>Curriculum Integration:</strong> Include cervical cancer education in health courses</li>
-                    <li><strong>Peer Education Programs:</strong> Train student health ambassadors</li>
-                    <li><strong>Mobile Screening Units:</strong> Bring services directly to campuses</li>
-                    <li><strong>Follow-up Systems:</strong> Implement reminder and tracking systems</li>
-                </ul>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
       # Cost considerations
     if 'amtpaid' in df.columns or 'amt_pref_pay_for_scrn' in df.columns:
         st.markdown("""
@@ -3404,48 +2520,53 @@ def create_payment_analysis(df):
         col1, col2 = st.columns(2)
         
         colors = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6']
+        cube = get_stats_cube(df)
         
         for i, col in enumerate(available_payment_cols):
             if col in df.columns:
-                value_counts = df[col].value_counts().head(5)  # Top 5 categories
+                value_counts = cube['counts'][col].head(5)  # Top 5 categories
                 
                 title = "Amount Willing to Pay" if col == 'amtpaid' else "Preferred Payment Amount"
                 
-                fig = go.Figure(data=[go.Bar(
-                    x=value_counts.index,
-                    y=value_counts.values,
-                    marker_color=colors[:len(value_counts)],
-                    text=[f'{v}<br>({v/len(df)*100:.1f}%)' for v in value_counts.values],
-                    textposition='auto',
-                    textfont=dict(color='white', size=14, family='Arial Black'),
-                    hovertemplate='<b>%{x}</b><br>Count: %{y}<br>Percentage: %{text}<extra></extra>',
-                    marker=dict(line=dict(color='white', width=2))
-                )])
+                def build_figure():
+                    fig = go.Figure(data=[go.Bar(
+                        x=value_counts.index,
+                        y=value_counts.values,
+                        marker_color=colors[:len(value_counts)],
+                        text=[f'{v}<br>({v/cube["n"]*100:.1f}%)' for v in value_counts.values],
+                        textposition='auto',
+                        textfont=dict(color='white', size=14, family='Arial Black'),
+                        hovertemplate='<b>%{x}</b><br>Count: %{y}<br>Percentage: %{text}<extra></extra>',
+                        marker=dict(line=dict(color='white', width=2))
+                    )])
                 
-                fig.update_layout(
-                    title=dict(
-                        text=title,
-                        x=0.5,
-                        font=dict(size=20, color='#2c3e50', family='Arial Black')
-                    ),
-                    xaxis_title="Payment Category",
-                    yaxis_title="Number of Students",
-                    height=500,                    showlegend=False,
-                    xaxis=dict(
-                        title=dict(text="Payment Category", font=dict(size=16, family='Arial Black')),
-                        tickfont=dict(size=12, family='Arial'),
-                        tickangle=45
-                    ),
-                    yaxis=dict(
-                        title=dict(text="Number of Students", font=dict(size=16, family='Arial Black')),
-                        tickfont=dict(size=14, family='Arial'),
-                        showgrid=True,
-                        gridwidth=1,
-                        gridcolor='rgba(128,128,128,0.2)'
-                    ),
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    margin=dict(t=80, b=100, l=60, r=60)                )
+                    fig.update_layout(
+                        title=dict(
+                            text=title,
+                            x=0.5,
+                            font=dict(size=20, color='#2c3e50', family='Arial Black')
+                        ),
+                        xaxis_title="Payment Category",
+                        yaxis_title="Number of Students",
+                        height=500,                    showlegend=False,
+                        xaxis=dict(
+                            title=dict(text="Payment Category", font=dict(size=16, family='Arial Black')),
+                            tickfont=dict(size=12, family='Arial'),
+                            tickangle=45
+                        ),
+                        yaxis=dict(
+                            title=dict(text="Number of Students", font=dict(size=16, family='Arial Black')),
+                            tickfont=dict(size=14, family='Arial'),
+                            showgrid=True,
+                            gridwidth=1,
+                            gridcolor='rgba(128,128,128,0.2)'
+                        ),
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        margin=dict(t=80, b=100, l=60, r=60)                )
+                    return fig
+                
+                fig = cached_figure(df, 'screening', f'payment_{col}', build_figure)
                 
                 if i == 0:
                     col1.plotly_chart(fig, use_container_width=True)
@@ -3485,55 +2606,60 @@ def create_payment_analysis(df):
 def create_screening_reasons(df):
     """Create screening reasons analysis"""
     if 'why_go_scrn' in df.columns:
-        reasons = df['why_go_scrn'].value_counts()
-        reasons_pct = df['why_go_scrn'].value_counts(normalize=True) * 100          # Create large vertical donut chart for reasons
-        fig = go.Figure(data=[go.Pie(
-            labels=reasons.index,
-            values=reasons.values,
-            hole=0.5,  # Larger hole for better donut effect
-            marker_colors=['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6', '#ff6b6b', '#17a2b8', '#fd7e14'],
-            textinfo='label+percent+value',
-            textfont=dict(size=18, family='Arial Black', color='white'),  # Larger text
-            textposition='outside',  # Outside positioning for better visibility
-            hovertemplate='<b>%{label}</b><br>Count: %{value}<br>Percentage: %{percent}<extra></extra>',
-            marker=dict(line=dict(color='white', width=4)),  # Thicker borders
-            pull=[0.03 if i == 0 else 0 for i in range(len(reasons))]  # Slight pull for emphasis
-        )])
+        cube = get_stats_cube(df)
+        reasons = cube['counts']['why_go_scrn']
+        reasons_pct = cube['pct']['why_go_scrn']          # Create large vertical donut chart for reasons
+        def build_figure():
+            fig = go.Figure(data=[go.Pie(
+                labels=reasons.index,
+                values=reasons.values,
+                hole=0.5,  # Larger hole for better donut effect
+                marker_colors=['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6', '#ff6b6b', '#17a2b8', '#fd7e14'],
+                textinfo='label+percent+value',
+                textfont=dict(size=18, family='Arial Black', color='white'),  # Larger text
+                textposition='outside',  # Outside positioning for better visibility
+                hovertemplate='<b>%{label}</b><br>Count: %{value}<br>Percentage: %{percent}<extra></extra>',
+                marker=dict(line=dict(color='white', width=4)),  # Thicker borders
+                pull=[0.03 if i == 0 else 0 for i in range(len(reasons))]  # Slight pull for emphasis
+            )])
         
-        fig.update_layout(
-            title=dict(
-                text="<b>Reasons for Cervical Cancer Screening</b>",
-                x=0.5,
-                font=dict(size=24, color='white', family='Arial Black')
-            ),
-            height=700,  # Much larger height for vertical display
-            showlegend=True,
-            legend=dict(
-                font=dict(size=16, family='Arial Bold', color='white'),
-                orientation="h",  # Horizontal legend at bottom
-                yanchor="top",
-                y=-0.15,
-                xanchor="center",
-                x=0.5,
-                bgcolor='rgba(0,0,0,0.2)',
-                bordercolor='white',
-                borderwidth=1
-            ),
-            font=dict(size=18, family='Arial'),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            margin=dict(t=100, b=150, l=40, r=40),
-            annotations=[
-                dict(
-                    text=f"<b style='font-size:28px'>Total</b><br><span style='font-size:20px'>{reasons.sum()} Responses</span>",
-                    x=0.5, y=0.5,
-                    font_size=24,
-                    font_color='white',
-                    font_family='Arial Black',
-                    showarrow=False
-                )
-            ]
-        )
+            fig.update_layout(
+                title=dict(
+                    text="<b>Reasons for Cervical Cancer Screening</b>",
+                    x=0.5,
+                    font=dict(size=24, color='white', family='Arial Black')
+                ),
+                height=700,  # Much larger height for vertical display
+                showlegend=True,
+                legend=dict(
+                    font=dict(size=16, family='Arial Bold', color='white'),
+                    orientation="h",  # Horizontal legend at bottom
+                    yanchor="top",
+                    y=-0.15,
+                    xanchor="center",
+                    x=0.5,
+                    bgcolor='rgba(0,0,0,0.2)',
+                    bordercolor='white',
+                    borderwidth=1
+                ),
+                font=dict(size=18, family='Arial'),
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                margin=dict(t=100, b=150, l=40, r=40),
+                annotations=[
+                    dict(
+                        text=f"<b style='font-size:28px'>Total</b><br><span style='font-size:20px'>{reasons.sum()} Responses</span>",
+                        x=0.5, y=0.5,
+                        font_size=24,
+                        font_color='white',
+                        font_family='Arial Black',
+                        showarrow=False
+                    )
+                ]
+            )
+            return fig
+        
+        fig = cached_figure(df, 'screening', 'reasons_donut', build_figure)
         
         st.plotly_chart(fig, use_container_width=True)
         
@@ -3543,7 +2669,7 @@ def create_screening_reasons(df):
         st.markdown('<div class="metric-container">', unsafe_allow_html=True)
         st.markdown("### 📊 Key Findings")
         for reason, count in reasons.items():
-            percentage = (count / len(df)) * 100
+            percentage = (count / cube['n']) * 100
             st.markdown(f"**{reason}**: {percentage:.1f}% ({count} students)")
         st.markdown('</div>', unsafe_allow_html=True)# Screening motivation insights as summary cards
         cards_html = """
@@ -3575,6 +2701,49 @@ def create_screening_reasons(df):
     else:
         st.info("💡 Screening reasons analysis will be available when reason data is present")
 
+def create_mediation_panel(df):
+    """Direct and indirect effects of awareness on uptake through being given the opportunity"""
+    mediation = estimate_pathway_mediation(df, dataset_version(df)) if 'Uptake' in df.columns else {}
+    if not mediation:
+        st.info("💡 Mediation analysis requires awareness, opportunity and uptake data")
+        return
+    
+    st.markdown("#### 🔗 Awareness → Opportunity → Uptake")
+    effects = mediation['effects'].set_index('Effect')
+    for effect, label in [('Total Effect', "Total effect"), ('Natural Direct Effect', "Direct effect"),
+                          ('Natural Indirect Effect', "Indirect via opportunity")]:
+        row = effects.loc[effect]
+        st.metric(
+            label,
+            f"{row['Risk Difference (pp)']:+.1f} pp",
+            help=f"95% CI {row['RD CI Lower']:+.1f} to {row['RD CI Upper']:+.1f} pp; RR {row['Risk Ratio']:.2f} ({row['RR CI Lower']:.2f}–{row['RR CI Upper']:.2f})"
+        )
+    mediated = mediation['proportion_mediated']
+    lower, upper = mediation['proportion_mediated_ci']
+    st.markdown(f"**Proportion mediated:** {mediated:.0%} (95% CI {lower:.0%} to {upper:.0%})")
+    
+    with st.expander("📋 Effect decomposition"):
+        st.dataframe(pd.DataFrame({
+            'Effect': effects.index,
+            'Risk Difference (95% CI)': [
+                f"{rd:+.1f} pp ({lo:+.1f} to {hi:+.1f})"
+                for rd, lo, hi in zip(effects['Risk Difference (pp)'], effects['RD CI Lower'], effects['RD CI Upper'])
+            ],
+            'Risk Ratio (95% CI)': [
+                f"{rr:.2f} ({lo:.2f}–{hi:.2f})"
+                for rr, lo, hi in zip(effects['Risk Ratio'], effects['RR CI Lower'], effects['RR CI Upper'])
+            ]
+        }), use_container_width=True, hide_index=True)
+        potential = mediation['potential_outcomes']
+        st.caption(
+            f"Standardized uptake: not aware {potential['Y(0, M(0))']:.1f}%, aware with unaware-level opportunity "
+            f"{potential['Y(1, M(0))']:.1f}%, aware {potential['Y(1, M(1))']:.1f}%."
+        )
+    st.caption(
+        f"Natural effects of awareness of a screening centre by the g-formula, adjusted for demographics, on {mediation['n']} complete cases; "
+        f"percentile CIs from {mediation['n_boot']:,} bootstrap resamples. Assumes no unmeasured confounding of any pathway."
+    )
+
 def create_sankey_diagram(df):
     """Create Sankey diagram showing pathways from opportunity/perception to screening uptake"""
     
@@ -3588,30 +2757,35 @@ def create_sankey_diagram(df):
     
     try:
         # Prepare data for Sankey diagram
-        # Filter out missing values
-        sankey_df = df[available_cols].dropna()
+        # Multiply imputed copies keep respondents with missing answers; fall back to complete cases
+        imputations = get_imputations(df)
+        if imputations and all(col in imputations[0].columns for col in available_cols):
+            frames = [imp[available_cols] for imp in imputations]
+        else:
+            frames = [df[available_cols].dropna()]
+        n_incomplete = int(df[available_cols].isna().any(axis=1).sum())
         
-        if len(sankey_df) == 0:
+        if len(frames[0]) == 0:
             st.warning("⚠️ No complete data available for Sankey diagram")
             return
         
         # Create flow data
         if 'giv_oportu_to_scrn' in df.columns and 'Uptake' in df.columns:
             
-            # Count flows
-            opportunity_yes = sankey_df[sankey_df['giv_oportu_to_scrn'] == 'yes']
-            opportunity_no = sankey_df[sankey_df['giv_oportu_to_scrn'] == 'no']
+            # Count flows, averaged over the imputed datasets
+            flows = np.mean([
+                [
+                    ((frame['giv_oportu_to_scrn'] == opportunity) & (frame['Uptake'] == uptake)).sum()
+                    for opportunity in ('yes', 'no') for uptake in ('yes', 'no')
+                ]
+                for frame in frames
+            ], axis=0)
+            opp_yes_uptake_yes, opp_yes_uptake_no, opp_no_uptake_yes, opp_no_uptake_no = np.round(flows, 1)
             
             # Calculate percentages
-            total_participants = len(sankey_df)
-            opp_yes_count = len(opportunity_yes)
-            opp_no_count = len(opportunity_no)
-            
-            # From opportunity to uptake
-            opp_yes_uptake_yes = len(opportunity_yes[opportunity_yes['Uptake'] == 'yes'])
-            opp_yes_uptake_no = len(opportunity_yes[opportunity_yes['Uptake'] == 'no'])
-            opp_no_uptake_yes = len(opportunity_no[opportunity_no['Uptake'] == 'yes'])
-            opp_no_uptake_no = len(opportunity_no[opportunity_no['Uptake'] == 'no'])
+            total_participants = len(frames[0])
+            opp_yes_count = opp_yes_uptake_yes + opp_yes_uptake_no
+            opp_no_count = opp_no_uptake_yes + opp_no_uptake_no
             
             # Define nodes
             labels = [
@@ -3624,39 +2798,50 @@ def create_sankey_diagram(df):
             targets = [2, 3, 2, 3]  # To uptake nodes
             values = [opp_yes_uptake_yes, opp_yes_uptake_no, opp_no_uptake_yes, opp_no_uptake_no]
               # Create Sankey diagram
-            fig = go.Figure(data=[go.Sankey(
-                node=dict(
-                    pad=20,
-                    thickness=25,
-                    line=dict(color="black", width=2),
-                    label=labels,
-                    color=["#3498db", "#e74c3c", "#2ecc71", "#f39c12"],
-                    hovertemplate='<b>%{label}</b><br>Count: %{value}<extra></extra>'
-                ),
-                link=dict(
-                    source=sources,
-                    target=targets,
-                    value=values,
-                    color=["rgba(52, 152, 219, 0.7)", "rgba(52, 152, 219, 0.5)", 
-                           "rgba(231, 76, 60, 0.7)", "rgba(231, 76, 60, 0.5)"],
-                    hovertemplate='<b>%{source.label}</b> → <b>%{target.label}</b><br>Count: %{value}<extra></extra>'
+            def build_figure():
+                fig = go.Figure(data=[go.Sankey(
+                    node=dict(
+                        pad=20,
+                        thickness=25,
+                        line=dict(color="black", width=2),
+                        label=labels,
+                        color=["#3498db", "#e74c3c", "#2ecc71", "#f39c12"],
+                        hovertemplate='<b>%{label}</b><br>Count: %{value}<extra></extra>'
+                    ),
+                    link=dict(
+                        source=sources,
+                        target=targets,
+                        value=values,
+                        color=["rgba(52, 152, 219, 0.7)", "rgba(52, 152, 219, 0.5)", 
+                               "rgba(231, 76, 60, 0.7)", "rgba(231, 76, 60, 0.5)"],
+                        hovertemplate='<b>%{source.label}</b> → <b>%{target.label}</b><br>Count: %{value}<extra></extra>'
+                    )
+                )])
+            
+                fig.update_layout(
+                    title=dict(
+                        text="Screening Uptake Pathway: From Opportunity to Action",
+                        x=0.5,
+                        font=dict(size=22, color='#2c3e50', family='Arial Black')
+                    ),
+                    font=dict(size=16, family='Arial'),
+                    height=500,
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    margin=dict(t=80, b=60, l=60, r=60)
                 )
-            )])
+                return fig
             
-            fig.update_layout(
-                title=dict(
-                    text="Screening Uptake Pathway: From Opportunity to Action",
-                    x=0.5,
-                    font=dict(size=22, color='#2c3e50', family='Arial Black')
-                ),
-                font=dict(size=16, family='Arial'),
-                height=500,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                margin=dict(t=80, b=60, l=60, r=60)
-            )
+            fig = cached_figure(df, 'screening', 'sankey', build_figure)
+            
+            st.plotly_chart(fig, use_container_width=True)
+            if n_incomplete and len(frames) > 1:
+                st.caption(
+                    f"{n_incomplete} respondents with a missing opportunity or uptake answer are included via "
+                    f"{len(frames)} multiple imputations; flows are averaged across the imputed datasets."
+                )
             
-            st.plotly_chart(fig, use_container_width=True)              # Add insights as summary cards
+            # Add insights as summary cards
             conversion_rate_opp_yes = (opp_yes_uptake_yes / opp_yes_count) * 100 if opp_yes_count > 0 else 0
             conversion_rate_opp_no = (opp_no_uptake_yes / opp_no_count) * 100 if opp_no_count > 0 and opp_no_uptake_yes > 0 else 0
             opportunity_rate = (opp_yes_count / total_participants) * 100
@@ -3706,711 +2891,67 @@ def create_sankey_diagram(df):
 
 # ...existing code...
 
-def main():
-    """Main dashboard function"""
-    
-    # 🎨 BEAUTIFUL CARD-STYLE NAVIGATION SYSTEM CSS
-    st.markdown("""
-    <style>
-    /* Custom card-style navigation tiles */
-    .nav-card {
-        display: block;
-        padding: 20px;
-        margin: 12px 0;
-        border-radius: 20px;
-        text-decoration: none;
-        color: white;
-        font-weight: 700;
-        font-size: 16px;
-        text-align: center;
-        cursor: pointer;
-        transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-        border: 2px solid transparent;
-        box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-        position: relative;
-        overflow: hidden;
-        background-size: 200% 200%;
-        animation: gradientShift 4s ease infinite;
-    }
-    
-    .nav-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-        transition: left 0.5s;
-    }
-    
-    .nav-card:hover::before {
-        left: 100%;
-    }
-    
-    .nav-card:hover {
-        transform: translateY(-8px) scale(1.05) rotateY(5deg);
-        box-shadow: 0 15px 40px rgba(0,0,0,0.3);
-        border-color: rgba(255,255,255,0.4);
-        animation: gradientShift 2s ease infinite;
-    }
-    
-    .nav-card.active {
-        transform: scale(1.08) translateY(-2px);
-        border-color: #ffffff;
-        box-shadow: 0 12px 35px rgba(255,255,255,0.3), 0 0 30px rgba(39, 174, 96, 0.5);
-        animation: activeGlow 3s ease-in-out infinite alternate, gradientShift 3s ease infinite;
-    }
-    
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateX(-20px); }
-        to { opacity: 1; transform: translateX(0); }
-    }
-    
-    @keyframes activeGlow {
-        from { 
-            box-shadow: 0 12px 35px rgba(255,255,255,0.3), 0 0 30px rgba(39, 174, 96, 0.5);
-            transform: scale(1.08) translateY(-2px);
-        }
-        to { 
-            box-shadow: 0 15px 45px rgba(255,255,255,0.4), 0 0 40px rgba(39, 174, 96, 0.7);
-            transform: scale(1.1) translateY(-4px);
-        }
-    }
-    
-    @keyframes gradientShift {
-        0% { background-position: 0% 50%; }
-        50% { background-position: 100% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-    
-    @keyframes shimmer {
-        0% { transform: translateX(-100%); }
-        100% { transform: translateX(100%); }
-    }
-    
-    /* 🌈 STUNNING ANIMATED GRADIENTS FOR EACH NAVIGATION CARD 🌈 */
-    
-    /* Overview Card - Royal Purple to Electric Blue */
-    .nav-card.overview { 
-        background: linear-gradient(135deg, 
-            #667eea 0%, 
-            #764ba2 25%, 
-            #667eea 50%, 
-            #5b4cdb 75%, 
-            #667eea 100%);
-        background-size: 400% 400%;
-        animation: overviewGradient 6s ease infinite;
-    }
-    
-    @keyframes overviewGradient {
-        0% { background-position: 0% 50%; }
-        50% { background-position: 100% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-    
-    /* Screening Card - Pink Sunset to Ocean Blue */
-    .nav-card.screening { 
-        background: linear-gradient(135deg, 
-            #ff6b6b 0%, 
-            #feca57 25%, 
-            #48cae4 50%, 
-            #ff006e 75%, 
-            #4c63d2 100%);
-        background-size: 400% 400%;
-        animation: screeningGradient 7s ease infinite;
-    }
-    
-    @keyframes screeningGradient {
-        0% { background-position: 0% 50%; }
-        25% { background-position: 25% 75%; }
-        50% { background-position: 100% 50%; }
-        75% { background-position: 75% 25%; }
-        100% { background-position: 0% 50%; }
-    }
-    
-    /* Awareness Card - Warm Peach to Rose Gold */
-    .nav-card.awareness { 
-        background: linear-gradient(135deg, 
-            #ff9a56 0%, 
-            #ffad56 25%, 
-            #ff6b9d 50%, 
-            #c44569 75%, 
-            #f8b500 100%);
-        background-size: 400% 400%;
-        animation: awarenessGradient 8s ease infinite;
-    }
-    
-    @keyframes awarenessGradient {
-        0% { background-position: 0% 50%; }
-        33% { background-position: 100% 25%; }
-        66% { background-position: 0% 75%; }
-        100% { background-position: 0% 50%; }
-    }
-    
-    /* Analysis Card - Mint to Lavender Dream */
-    .nav-card.analysis { 
-        background: linear-gradient(135deg, 
-            #a8edea 0%, 
-            #fed6e3 25%, 
-            #a8e6cf 50%, 
-            #dda0dd 75%, 
-            #98fb98 100%);
-        background-size: 400% 400%;
-        animation: analysisGradient 9s ease infinite;
-    }
-    
-    @keyframes analysisGradient {
-        0% { background-position: 0% 50%; }
-        40% { background-position: 100% 100%; }
-        80% { background-position: 0% 0%; }
-        100% { background-position: 0% 50%; }
-    }
-    
-    /* Statistics Card - Golden Hour to Purple Magic */
-    .nav-card.statistics { 
-        background: linear-gradient(135deg, 
-            #f7971e 0%, 
-            #ffd200 25%, 
-            #9c88ff 50%, 
-            #5f27cd 75%, 
-            #ff9ff3 100%);
-        background-size: 400% 400%;
-        animation: statisticsGradient 10s ease infinite;
-    }
-    
-    @keyframes statisticsGradient {
-        0% { background-position: 0% 50%; }
-        20% { background-position: 50% 100%; }
-        40% { background-position: 100% 50%; }
-        60% { background-position: 50% 0%; }
-        80% { background-position: 0% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-    
-    /* Recommendations Card - Ocean Breeze to Sky Gradient */
-    .nav-card.recommendations { 
-        background: linear-gradient(135deg, 
-            #00d2ff 0%, 
-            #3a7bd5 25%, 
-            #00d2ff 50%, 
-            #928dab 75%, 
-            #00d2ff 100%);
-        background-size: 400% 400%;
-        animation: recommendationsGradient 11s ease infinite;
-    }
-    
-    @keyframes recommendationsGradient {
-        0% { background-position: 0% 50%; }
-        25% { background-position: 100% 0%; }
-        50% { background-position: 0% 100%; }
-        75% { background-position: 100% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-    
-    /* 🎨 ENHANCED HOVER EFFECTS WITH INTENSIFIED GRADIENTS 🎨 */
-    .nav-card.overview:hover {
-        background: linear-gradient(135deg, 
-            #764ba2 0%, 
-            #667eea 25%, 
-            #5b4cdb 50%, 
-            #764ba2 75%, 
-            #667eea 100%);
-        background-size: 300% 300%;
-        animation: overviewGradient 3s ease infinite;
-        box-shadow: 0 20px 50px rgba(118, 75, 162, 0.6), 0 0 30px rgba(102, 126, 234, 0.4);
-    }
-    
-    .nav-card.screening:hover {
-        background: linear-gradient(135deg, 
-            #ff006e 0%, 
-            #ff6b6b 25%, 
-            #48cae4 50%, 
-            #feca57 75%, 
-            #4c63d2 100%);
-        background-size: 300% 300%;
-        animation: screeningGradient 3.5s ease infinite;
-        box-shadow: 0 20px 50px rgba(255, 0, 110, 0.6), 0 0 30px rgba(255, 107, 107, 0.4);
-    }
-    
-    .nav-card.awareness:hover {
-        background: linear-gradient(135deg, 
-            #c44569 0%, 
-            #ff9a56 25%, 
-            #ff6b9d 50%, 
-            #f8b500 75%, 
-            #ffad56 100%);
-        background-size: 300% 300%;
-        animation: awarenessGradient 4s ease infinite;
-        box-shadow: 0 20px 50px rgba(196, 69, 105, 0.6), 0 0 30px rgba(255, 154, 86, 0.4);
-    }
-    
-    .nav-card.analysis:hover {
-        background: linear-gradient(135deg, 
-            #dda0dd 0%, 
-            #a8edea 25%, 
-            #98fb98 50%, 
-            #fed6e3 75%, 
-            #a8e6cf 100%);
-        background-size: 300% 300%;
-        animation: analysisGradient 4.5s ease infinite;
-        box-shadow: 0 20px 50px rgba(221, 160, 221, 0.6), 0 0 30px rgba(168, 237, 234, 0.4);
-    }
-    
-    .nav-card.statistics:hover {
-        background: linear-gradient(135deg, 
-            #5f27cd 0%, 
-            #f7971e 25%, 
-            #ff9ff3 50%, 
-            #ffd200 75%, 
-            #9c88ff 100%);
-        background-size: 300% 300%;
-        animation: statisticsGradient 5s ease infinite;
-        box-shadow: 0 20px 50px rgba(95, 39, 205, 0.6), 0 0 30px rgba(247, 151, 30, 0.4);
-    }
-    
-    .nav-card.recommendations:hover {
-        background: linear-gradient(135deg, 
-            #3a7bd5 0%, 
-            #00d2ff 25%, 
-            #928dab 50%, 
-            #00d2ff 75%, 
-            #3a7bd5 100%);
-        background-size: 300% 300%;
-        animation: recommendationsGradient 5.5s ease infinite;
-        box-shadow: 0 20px 50px rgba(58, 123, 213, 0.6), 0 0 30px rgba(0, 210, 255, 0.4);
-    }
-    
-    /* Card content styling */
-    .nav-card-emoji {
-        font-size: 32px;
-        display: block;
-        margin-bottom: 10px;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        animation: bounce 2s ease-in-out infinite;
-    }
-    
-    .nav-card-text {
-        font-size: 15px;
-        font-weight: 800;
-        text-transform: uppercase;
-        letter-spacing: 1.5px;
-        line-height: 1.3;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.5);
-    }
-    
-    @keyframes bounce {
-        0%, 20%, 50%, 80%, 100% {
-            transform: translateY(0);
-        }
-        40% {
-            transform: translateY(-3px);
-        }
-        60% {
-            transform: translateY(-2px);
-        }
-    }
-    
-    /* 🎯 BEAUTIFUL ACTIVE SECTION INDICATOR - MATCHING YOUR IMAGE STYLE 🎯 */
-    .active-section-indicator {
-        background: linear-gradient(135deg, 
-            #7c3aed 0%, 
-            #a855f7 25%, 
-            #3b82f6 50%, 
-            #6366f1 75%, 
-            #8b5cf6 100%);
-        background-size: 300% 300%;
-        border: 3px solid rgba(255, 255, 255, 0.3);
-        border-radius: 20px;
-        padding: 20px;
-        margin: 25px 0;
-        text-align: center;
-        color: #ffffff;
-        font-weight: 900;
-        font-size: 16px;
-        text-shadow: 2px 2px 6px rgba(0,0,0,0.8);
-        box-shadow: 
-            0 15px 35px rgba(124, 58, 237, 0.4),
-            0 5px 15px rgba(59, 130, 246, 0.3),
-            inset 0 1px 0 rgba(255, 255, 255, 0.1);
-        animation: activeIndicatorGlow 4s ease-in-out infinite, activeGradientFlow 6s ease infinite;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .active-section-indicator::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, 
-            transparent, 
-            rgba(255, 255, 255, 0.2), 
-            transparent);
-        animation: shimmerFlow 3s ease-in-out infinite;
-    }
-    
-    @keyframes activeIndicatorGlow {
-        0%, 100% {
-            box-shadow: 
-                0 15px 35px rgba(124, 58, 237, 0.4),
-                0 5px 15px rgba(59, 130, 246, 0.3),
-                inset 0 1px 0 rgba(255, 255, 255, 0.1);
-            transform: scale(1);
-        }
-        50% {
-            box-shadow: 
-                0 20px 45px rgba(124, 58, 237, 0.6),
-                0 8px 25px rgba(59, 130, 246, 0.5),
-                inset 0 1px 0 rgba(255, 255, 255, 0.2);
-            transform: scale(1.02);
-        }
-    }
-    
-    @keyframes activeGradientFlow {
-        0% { background-position: 0% 50%; }
-        50% { background-position: 100% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-    
-    @keyframes shimmerFlow {
-        0% { left: -100%; }
-        50% { left: -50%; }
-        100% { left: 100%; }
-    }
-    
-    @keyframes pulse {
-        0%, 100% { transform: scale(1); }
-        50% { transform: scale(1.02); }
-    }
-    
-    /* Enhanced Streamlit button styling to look like beautiful cards */
-    div[data-testid="stSidebar"] .stButton > button {
-        width: 100%;
-        height: auto;
-        padding: 20px;
-        margin: 12px 0;
-        border-radius: 20px;
-        border: 2px solid transparent;
-        font-weight: 700;
-        font-size: 16px;
-        text-align: center;
-        color: white !important;
-        cursor: pointer;
-        transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-        box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-        position: relative;
-        overflow: hidden;
-        background-size: 400% 400% !important;
-        animation: gradientShift 4s ease infinite;
-        opacity: 1 !important;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.5);
-    }
-    
-    div[data-testid="stSidebar"] .stButton > button::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-        transition: left 0.5s;
-    }
-    
-    div[data-testid="stSidebar"] .stButton > button:hover::before {
-        left: 100%;
-    }
-    
-    div[data-testid="stSidebar"] .stButton > button:hover {
-        transform: translateY(-8px) scale(1.05) rotateY(5deg) !important;
-        box-shadow: 0 15px 40px rgba(0,0,0,0.3) !important;
-        border-color: rgba(255,255,255,0.4) !important;
-        animation: gradientShift 2s ease infinite !important;
-    }
-    
-    div[data-testid="stSidebar"] .stButton > button:focus {
-        transform: scale(1.08) translateY(-2px) !important;
-        border-color: #ffffff !important;
-        box-shadow: 0 12px 35px rgba(255,255,255,0.3), 0 0 30px rgba(39, 174, 96, 0.5) !important;
-        animation: activeGlow 3s ease-in-out infinite alternate, gradientShift 3s ease infinite !important;
-        outline: none !important;
-    }
-    
-    /* 🌈 BEAUTIFUL ANIMATED GRADIENT ASSIGNMENTS FOR NAVIGATION BUTTONS 🌈 */
-    
-    /* 🌈 ULTRA-BEAUTIFUL NAVIGATION BUTTON GRADIENTS - MATCHING YOUR IMAGE STYLE 🌈 */
-    
-    /* Overview Button - Royal Purple to Electric Blue (like your image) */
-    div[data-testid="stSidebar"] .stButton:nth-child(1) > button {
-        background: linear-gradient(135deg, 
-            #7c3aed 0%, 
-            #a855f7 20%, 
-            #3b82f6 40%, 
-            #6366f1 60%, 
-            #8b5cf6 80%,
-            #7c3aed 100%) !important;
-        background-size: 400% 400% !important;
-        animation: overviewGradient 6s ease infinite !important;
-        border-radius: 16px !important;
-        box-shadow: 0 8px 25px rgba(124, 58, 237, 0.3), 0 0 20px rgba(59, 130, 246, 0.2) !important;
-    }
-    
-    /* Screening Button - Vibrant Coral to Teal */
-    div[data-testid="stSidebar"] .stButton:nth-child(2) > button {
-        background: linear-gradient(135deg, 
-            #ef4444 0%, 
-            #f97316 20%, 
-            #eab308 40%, 
-            #06b6d4 60%, 
-            #3b82f6 80%,
-            #ef4444 100%) !important;
-        background-size: 400% 400% !important;
-        animation: screeningGradient 7s ease infinite !important;
-        border-radius: 16px !important;
-        box-shadow: 0 8px 25px rgba(239, 68, 68, 0.3), 0 0 20px rgba(6, 182, 212, 0.2) !important;
-    }
-    
-    /* Awareness Button - Warm Sunset to Pink */
-    div[data-testid="stSidebar"] .stButton:nth-child(3) > button {
-        background: linear-gradient(135deg, 
-            #f59e0b 0%, 
-            #f97316 20%, 
-            #ec4899 40%, 
-            #d946ef 60%, 
-            #f59e0b 80%,
-            #f97316 100%) !important;
-        background-size: 400% 400% !important;
-        animation: awarenessGradient 8s ease infinite !important;
-        border-radius: 16px !important;
-        box-shadow: 0 8px 25px rgba(245, 158, 11, 0.3), 0 0 20px rgba(236, 72, 153, 0.2) !important;
-    }
-    
-    /* Analysis Button - Fresh Mint to Lavender */
-    div[data-testid="stSidebar"] .stButton:nth-child(4) > button {
-        background: linear-gradient(135deg, 
-            #10b981 0%, 
-            #06b6d4 20%, 
-            #8b5cf6 40%, 
-            #a855f7 60%, 
-            #10b981 80%,
-            #06b6d4 100%) !important;
-        background-size: 400% 400% !important;
-        animation: analysisGradient 9s ease infinite !important;
-        border-radius: 16px !important;
-        box-shadow: 0 8px 25px rgba(16, 185, 129, 0.3), 0 0 20px rgba(139, 92, 246, 0.2) !important;
-    }
-    
-    /* Statistics Button - Golden Hour Magic */
-    div[data-testid="stSidebar"] .stButton:nth-child(5) > button {
-        background: linear-gradient(135deg, 
-            #f59e0b 0%, 
-            #eab308 20%, 
-            #d946ef 40%, 
-            #7c3aed 60%, 
-            #f59e0b 80%,
-            #eab308 100%) !important;
-        background-size: 400% 400% !important;
-        animation: statisticsGradient 10s ease infinite !important;
-        border-radius: 16px !important;
-        box-shadow: 0 8px 25px rgba(245, 158, 11, 0.3), 0 0 20px rgba(217, 70, 239, 0.2) !important;
-    }
-    
-    /* Recommendations Button - Ocean Blue Dream */
-    div[data-testid="stSidebar"] .stButton:nth-child(6) > button {
-        background: linear-gradient(135deg, 
-            #0ea5e9 0%, 
-            #06b6d4 20%, 
-            #3b82f6 40%, 
-            #6366f1 60%, 
-            #0ea5e9 80%,
-            #06b6d4 100%) !important;
-        background-size: 400% 400% !important;
-        animation: recommendationsGradient 11s ease infinite !important;
-        border-radius: 16px !important;
-        box-shadow: 0 8px 25px rgba(14, 165, 233, 0.3), 0 0 20px rgba(59, 130, 246, 0.2) !important;
-    }
-    
-    /* 🎨 ENHANCED HOVER EFFECTS WITH INTENSIFIED ANIMATED GRADIENTS 🎨 */
-    
-    /* Overview Button Hover - Intensified Royal Purple to Electric Blue */
-    div[data-testid="stSidebar"] .stButton:nth-child(1) > button:hover {
-        background: linear-gradient(135deg, 
-            #764ba2 0%, 
-            #667eea 25%, 
-            #5b4cdb 50%, 
-            #764ba2 75%, 
-            #667eea 100%) !important;
-        background-size: 300% 300% !important;
-        animation: overviewGradient 3s ease infinite !important;
-        box-shadow: 0 20px 50px rgba(118, 75, 162, 0.6), 0 0 30px rgba(102, 126, 234, 0.4) !important;
-    }
-    
-    /* Screening Button Hover - Intensified Pink Sunset to Ocean Blue */
-    div[data-testid="stSidebar"] .stButton:nth-child(2) > button:hover {
-        background: linear-gradient(135deg, 
-            #ff006e 0%, 
-            #ff6b6b 25%, 
-            #48cae4 50%, 
-            #feca57 75%, 
-            #4c63d2 100%) !important;
-        background-size: 300% 300% !important;
-        animation: screeningGradient 3.5s ease infinite !important;
-        box-shadow: 0 20px 50px rgba(255, 0, 110, 0.6), 0 0 30px rgba(255, 107, 107, 0.4) !important;
-    }
-    
-    /* Awareness Button Hover - Intensified Warm Peach to Rose Gold */
-    div[data-testid="stSidebar"] .stButton:nth-child(3) > button:hover {
-        background: linear-gradient(135deg, 
-            #c44569 0%, 
-            #ff9a56 25%, 
-            #ff6b9d 50%, 
-            #f8b500 75%, 
-            #ffad56 100%) !important;
-        background-size: 300% 300% !important;
-        animation: awarenessGradient 4s ease infinite !important;
-        box-shadow: 0 20px 50px rgba(196, 69, 105, 0.6), 0 0 30px rgba(255, 154, 86, 0.4) !important;
-    }
-    
-    /* Analysis Button Hover - Intensified Mint to Lavender Dream */
-    div[data-testid="stSidebar"] .stButton:nth-child(4) > button:hover {
-        background: linear-gradient(135deg, 
-            #dda0dd 0%, 
-            #a8edea 25%, 
-            #98fb98 50%, 
-            #fed6e3 75%, 
-            #a8e6cf 100%) !important;
-        background-size: 300% 300% !important;
-        animation: analysisGradient 4.5s ease infinite !important;
-        box-shadow: 0 20px 50px rgba(221, 160, 221, 0.6), 0 0 30px rgba(168, 237, 234, 0.4) !important;
-    }
-    
-    /* Statistics Button Hover - Intensified Golden Hour to Purple Magic */
-    div[data-testid="stSidebar"] .stButton:nth-child(5) > button:hover {
-        background: linear-gradient(135deg, 
-            #5f27cd 0%, 
-            #f7971e 25%, 
-            #ff9ff3 50%, 
-            #ffd200 75%, 
-            #9c88ff 100%) !important;
-        background-size: 300% 300% !important;
-        animation: statisticsGradient 5s ease infinite !important;
-        box-shadow: 0 20px 50px rgba(95, 39, 205, 0.6), 0 0 30px rgba(247, 151, 30, 0.4) !important;
-    }
-    
-    /* Recommendations Button Hover - Intensified Ocean Breeze to Sky Gradient */
-    div[data-testid="stSidebar"] .stButton:nth-child(6) > button:hover {
-        background: linear-gradient(135deg, 
-            #3a7bd5 0%, 
-            #00d2ff 25%, 
-            #928dab 50%, 
-            #00d2ff 75%, 
-            #3a7bd5 100%) !important;
-        background-size: 300% 300% !important;
-        animation: recommendationsGradient 5.5s ease infinite !important;
-        box-shadow: 0 20px 50px rgba(58, 123, 213, 0.6), 0 0 30px rgba(0, 210, 255, 0.4) !important;
-    }
-    
-    /* Enhanced sidebar background */
-    div[data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #f8f9fa 0%, #e9ecef 100%);
-    }
-    
-    /* Add subtle animation to the entire sidebar */
-    div[data-testid="stSidebar"] > div:first-child {
-        background: linear-gradient(180deg, #f8f9fa 0%, #e9ecef 100%);
-        animation: fadeIn 1s ease-in-out;
-    }
-    
-    /* 🌈 DYNAMIC ACTIVE SECTION INDICATOR GRADIENTS 🌈 */
-    
-    /* Overview Active Indicator - Royal Purple to Electric Blue */
-    .active-section-indicator.overview-active {
-        background: linear-gradient(135deg, 
-            #667eea 0%, 
-            #764ba2 25%, 
-            #5b4cdb 50%, 
-            #667eea 75%, 
-            #764ba2 100%) !important;
-        box-shadow: 
-            0 15px 35px rgba(102, 126, 234, 0.6),
-            0 5px 15px rgba(118, 75, 162, 0.4),
-            inset 0 1px 0 rgba(255, 255, 255, 0.2) !important;
-    }
+def select_section(section_key):
+    """Navigation callback: switch the active section"""
+    st.session_state.active_section = section_key
+
+@st.fragment
+def render_section(df, selected_section):
+    """Render one dashboard section as a fragment so in-section widgets rerun only this section"""
+    # 🎯 MAIN CONTENT AREA - SECTION SWITCHING LOGIC
+    if selected_section == "📊 Overview":
+        st.markdown("### 🎯 Study Overview")
+        
+        cube = get_stats_cube(df)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.info(f"**Total Participants**: {cube['n']}")
+        with col2:
+            uptake_rate = yes_rate(cube, 'Uptake')
+            st.warning(f"**Screening Uptake**: {uptake_rate:.1f}%")
+        with col3:
+            awareness_rate = yes_rate(cube, 'eva_told_to_scrn')
+            st.success(f"**Awareness Rate**: {awareness_rate:.1f}%")
+        
+        st.markdown("""
+        ### 📋 Study Objectives
+        
+        This comprehensive analysis examines cervical cancer screening uptake among female tertiary students 
+        in the Hohoe Municipality, Ghana. The study focuses on:
+        
+        1. **Awareness Assessment** - Understanding current knowledge levels
+        2. **Screening Uptake Patterns** - Identifying demographic and behavioral factors
+        3. **Knowledge Evaluation** - Assessing understanding of risk factors, symptoms, and screening methods
+        4. **Statistical Modeling** - Determining key predictors of screening behavior
+        5. **Evidence-based Recommendations** - Providing actionable insights for public health interventions
+          Navigate through the sections using the sidebar to explore detailed findings and visualizations.
+        """)
+        
+        create_demographics_overview(df)
     
-    /* Screening Active Indicator - Pink Sunset to Ocean Blue */
-    .active-section-indicator.screening-active {
-        background: linear-gradient(135deg, 
-            #ff6b6b 0%, 
-            #feca57 25%, 
-            #48cae4 50%, 
-            #ff006e 75%, 
-            #4c63d2 100%) !important;
-        box-shadow: 
-            0 15px 35px rgba(255, 107, 107, 0.6),
-            0 5px 15px rgba(254, 202, 87, 0.4),
-            inset 0 1px 0 rgba(255, 255, 255, 0.2) !important;
-    }
+    elif selected_section == "🎯 Screening Uptake":
+        create_screening_uptake_analysis(df)        
+        # Add additional screening insights
+        st.markdown("### 💰 Payment Preferences & Barriers")
+        create_payment_analysis(df)
+        
+        st.markdown("### 🎯 Reasons for Screening")
+        create_screening_reasons(df)
     
-    /* Awareness Active Indicator - Warm Peach to Rose Gold */
-    .active-section-indicator.awareness-active {
-        background: linear-gradient(135deg, 
-            #ff9a56 0%, 
-            #ffad56 25%, 
-            #ff6b9d 50%, 
-            #c44569 75%, 
-            #f8b500 100%) !important;
-        box-shadow: 
-            0 15px 35px rgba(255, 154, 86, 0.6),
-            0 5px 15px rgba(196, 69, 105, 0.4),
-            inset 0 1px 0 rgba(255, 255, 255, 0.2) !important;
-    }
+    elif selected_section == "🧠 Awareness & Knowledge":
+        create_awareness_section(df)
     
-    /* Analysis Active Indicator - Mint to Lavender Dream */
-    .active-section-indicator.analysis-active {
-        background: linear-gradient(135deg, 
-            #a8edea 0%, 
-            #fed6e3 25%, 
-            #a8e6cf 50%, 
-            #dda0dd 75%, 
-            #98fb98 100%) !important;
-        box-shadow: 
-            0 15px 35px rgba(168, 237, 234, 0.6),
-            0 5px 15px rgba(221, 160, 221, 0.4),
-            inset 0 1px 0 rgba(255, 255, 255, 0.2) !important;
-    }
+    elif selected_section == "📚 Detailed Analysis":
+        create_knowledge_assessment(df)
     
-    /* Statistics Active Indicator - Golden Hour to Purple Magic */
-    .active-section-indicator.statistics-active {
-        background: linear-gradient(135deg, 
-            #f7971e 0%, 
-            #ffd200 25%, 
-            #9c88ff 50%, 
-            #5f27cd 75%, 
-            #ff9ff3 100%) !important;
-        box-shadow: 
-            0 15px 35px rgba(247, 151, 30, 0.6),
-            0 5px 15px rgba(95, 39, 205, 0.4),
-            inset 0 1px 0 rgba(255, 255, 255, 0.2) !important;
-    }
+    elif selected_section == "📈 Statistical Insights":
+        create_statistical_modeling(df)
     
-    /* Recommendations Active Indicator - Ocean Breeze to Sky */
-    .active-section-indicator.recommendations-active {
-        background: linear-gradient(135deg, 
-            #00d2ff 0%, 
-            #3a7bd5 25%, 
-            #928dab 50%, 
-            #00d2ff 75%, 
-            #3a7bd5 100%) !important;
-        box-shadow: 
-            0 15px 35px rgba(0, 210, 255, 0.6),
-            0 5px 15px rgba(58, 123, 213, 0.4),
-            inset 0 1px 0 rgba(255, 255, 255, 0.2) !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    elif selected_section == "💡 Recommendations":
+        create_recommendations(df)
+
+def main():
+    """Main dashboard function"""
     
     # Header
     st.markdown(
@@ -4424,7 +2965,7 @@ def main():
     
     # Load data
     with st.spinner("Loading data..."):
-        df = load_data()
+        df = load_data(data_source_signature())
     
     if df is None:
         st.error("Unable to load data. Please check your connection and try again.")
@@ -4447,119 +2988,16 @@ def main():
     if 'active_section' not in st.session_state:
         st.session_state.active_section = "overview"
     
-    # 🌈 BEAUTIFUL ANIMATED GRADIENT NAVIGATION CARDS 🌈
-    st.sidebar.markdown("""
-    <style>
-    /* Hide any CSS display issues and stray text */
-    div[data-testid="stSidebar"] .stMarkdown div[data-testid="stMarkdownContainer"] p:contains("@keyframes"),
-    div[data-testid="stSidebar"] .stMarkdown div[data-testid="stMarkdownContainer"] p:contains("background-position"),
-    div[data-testid="stSidebar"] .stMarkdown div[data-testid="stMarkdownContainer"] p:contains("</style>") {
-        display: none !important;
-    }
-    
-    /* Hide any orphaned CSS text */
-    div[data-testid="stSidebar"] .stMarkdown p {
-        font-size: 0 !important;
-        line-height: 0 !important;
-        margin: 0 !important;
-        padding: 0 !important;
-        height: 0 !important;
-        overflow: hidden !important;
-    }
-    
-    /* Only show markdown headings and buttons */
-    div[data-testid="stSidebar"] .stMarkdown h1,
-    div[data-testid="stSidebar"] .stMarkdown h2,
-    div[data-testid="stSidebar"] .stMarkdown h3,
-    div[data-testid="stSidebar"] .stMarkdown h4,
-    div[data-testid="stSidebar"] .stMarkdown h5,
-    div[data-testid="stSidebar"] .stMarkdown h6 {
-        font-size: initial !important;
-        line-height: initial !important;
-        margin: initial !important;
-        padding: initial !important;
-        height: initial !important;
-        overflow: initial !important;
-    }
-    
-    /* Beautiful gradient navigation buttons */
-    .stButton > button {
-        width: 100% !important;
-        height: auto !important;
-        padding: 20px !important;
-        margin: 12px 0 !important;
-        border-radius: 16px !important;
-        border: 2px solid rgba(255,255,255,0.3) !important;
-        font-weight: 700 !important;
-        font-size: 16px !important;
-        text-align: center !important;
-        color: white !important;
-        cursor: pointer !important;
-        transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275) !important;
-        box-shadow: 0 8px 25px rgba(0,0,0,0.2) !important;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.8) !important;
-        background-size: 300% 300% !important;
-        animation: gradientFlow 6s ease infinite !important;
-        position: relative !important;
-        overflow: hidden !important;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-8px) scale(1.05) !important;
-        box-shadow: 0 15px 40px rgba(0,0,0,0.4) !important;
-        border-color: rgba(255,255,255,0.6) !important;
-    }
-    
-    .stButton > button:focus {
-        outline: none !important;
-        transform: scale(1.08) translateY(-2px) !important;
-        border-color: #ffffff !important;
-        box-shadow: 0 12px 35px rgba(255,255,255,0.4), 0 0 30px rgba(124, 58, 237, 0.6) !important;
-    }
-    
-    /* Individual button gradients */
-    div[data-testid="stSidebar"] .stButton:nth-child(3) > button {
-        background: linear-gradient(135deg, #7c3aed 0%, #a855f7 25%, #3b82f6 50%, #6366f1 75%, #8b5cf6 100%) !important;
-    }
-    
-    div[data-testid="stSidebar"] .stButton:nth-child(4) > button {
-        background: linear-gradient(135deg, #ef4444 0%, #f97316 25%, #eab308 50%, #06b6d4 75%, #3b82f6 100%) !important;
-    }
-    
-    div[data-testid="stSidebar"] .stButton:nth-child(5) > button {
-        background: linear-gradient(135deg, #f59e0b 0%, #f97316 25%, #ec4899 50%, #d946ef 75%, #f59e0b 100%) !important;
-    }
-    
-    div[data-testid="stSidebar"] .stButton:nth-child(6) > button {
-        background: linear-gradient(135deg, #10b981 0%, #06b6d4 25%, #8b5cf6 50%, #a855f7 75%, #10b981 100%) !important;
-    }
-    
-    div[data-testid="stSidebar"] .stButton:nth-child(7) > button {
-        background: linear-gradient(135deg, #f59e0b 0%, #eab308 25%, #d946ef 50%, #7c3aed 75%, #f59e0b 100%) !important;
-    }
-    
-    div[data-testid="stSidebar"] .stButton:nth-child(8) > button {
-        background: linear-gradient(135deg, #0ea5e9 0%, #06b6d4 25%, #3b82f6 50%, #6366f1 75%, #0ea5e9 100%) !important;
-    }
-    
-    @keyframes gradientFlow {
-        0% { background-position: 0% 50%; }
-        50% { background-position: 100% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
     # Create navigation buttons with beautiful gradients (no individual CSS injection)
     for section in navigation_sections:
-        # Create the clickable navigation button
-        if st.sidebar.button(
+        # The click callback updates the section before the rerun it triggers
+        st.sidebar.button(
             f"{section['emoji']} {section['name']}", 
             key=f"nav_card_{section['key']}",
-            help=f"Navigate to {section['name']} section"
-        ):
-            st.session_state.active_section = section["key"]
-            st.rerun()
+            help=f"Navigate to {section['name']} section",
+            on_click=select_section,
+            args=(section["key"],)
+        )
     
     # Active section indicator with dynamic gradient based on selected section
     current_section = next((s for s in navigation_sections if s["key"] == st.session_state.active_section), navigation_sections[0])
@@ -4573,57 +3011,8 @@ def main():
     # Get the selected section for content display
     selected_section = current_section["full"]
     
-    # 🎯 MAIN CONTENT AREA - SECTION SWITCHING LOGIC
-    # Display selected section
-    if selected_section == "📊 Overview":
-        st.markdown("### 🎯 Study Overview")
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.info(f"**Total Participants**: {len(df)}")
-        with col2:
-            uptake_rate = (df['Uptake'].value_counts(normalize=True)['yes'] * 100) if 'Uptake' in df.columns else 0
-            st.warning(f"**Screening Uptake**: {uptake_rate:.1f}%")
-        with col3:
-            awareness_rate = (df['eva_told_to_scrn'].value_counts(normalize=True)['yes'] * 100) if 'eva_told_to_scrn' in df.columns else 0
-            st.success(f"**Awareness Rate**: {awareness_rate:.1f}%")
-        
-        st.markdown("""
-        ### 📋 Study Objectives
-        
-        This comprehensive analysis examines cervical cancer screening uptake among female tertiary students 
-        in the Hohoe Municipality, Ghana. The study focuses on:
-        
-        1. **Awareness Assessment** - Understanding current knowledge levels
-        2. **Screening Uptake Patterns** - Identifying demographic and behavioral factors
-        3. **Knowledge Evaluation** - Assessing understanding of risk factors, symptoms, and screening methods
-        4. **Statistical Modeling** - Determining key predictors of screening behavior
-        5. **Evidence-based Recommendations** - Providing actionable insights for public health interventions
-          Navigate through the sections using the sidebar to explore detailed findings and visualizations.
-        """)
-        
-        create_demographics_overview(df)
-    
-    elif selected_section == "🎯 Screening Uptake":
-        create_screening_uptake_analysis(df)        
-        # Add additional screening insights
-        st.markdown("### 💰 Payment Preferences & Barriers")
-        create_payment_analysis(df)
-        
-        st.markdown("### 🎯 Reasons for Screening")
-        create_screening_reasons(df)
-    
-    elif selected_section == "🧠 Awareness & Knowledge":
-        create_awareness_section(df)
-    
-    elif selected_section == "📚 Detailed Analysis":
-        create_knowledge_assessment(df)
-    
-    elif selected_section == "📈 Statistical Insights":
-        create_statistical_modeling(df)
-    
-    elif selected_section == "💡 Recommendations":
-        create_recommendations(df)
+    # 🎯 MAIN CONTENT AREA - display selected section
+    render_section(df, selected_section)
     
     # Footer
     st.sidebar.markdown("---")
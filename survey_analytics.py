@@ -0,0 +1,1653 @@
+"""Statistical engines for the cervical cancer screening dashboard (no Streamlit dependencies)"""
+import contextlib
+import os
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+from statsmodels.tools.sm_exceptions import PerfectSeparationWarning
+
+# Predictors reported in the Statistical Insights section
+UPTAKE_PREDICTORS = ['agegrp', 'affiliation', 'eva_told_to_scrn', 'aware_of_scrn_centa']
+
+def uptake_outcome(df):
+    """Binary uptake outcome (1 = ever screened), NaN where Uptake is missing"""
+    return df['Uptake'].map({'yes': 1.0, 'no': 0.0}).astype(float)
+
+def predictor_levels(series):
+    """Observed levels of a predictor, in category order when categorical (first = reference)"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        observed = set(series.dropna().unique())
+        return [level for level in series.cat.categories if level in observed]
+    return sorted(series.dropna().unique(), key=str)
+
+def design_matrix(df, predictors):
+    """Treatment-coded design matrix with intercept, plus (predictor, level) labels for each column"""
+    columns = [np.ones(len(df))]
+    labels = [('Intercept', '')]
+    for pred in predictors:
+        levels = predictor_levels(df[pred])
+        values = df[pred].to_numpy(dtype=object)
+        for level in levels[1:]:
+            columns.append((values == level).astype(float))
+            labels.append((pred, level))
+    return np.column_stack(columns), labels
+
+def complete_rows(df, predictors):
+    """Boolean mask of rows with the outcome and every predictor observed"""
+    return df[['Uptake'] + list(predictors)].notna().all(axis=1).to_numpy()
+
+# 📦 Sufficient statistics: with categorical predictors the uptake likelihood depends only on
+# the number of rows and uptake events in each observed combination of levels ("cells")
+def cell_table(df, predictors):
+    """Rows and uptake events per observed cell of the predictors, over rows complete on all of them"""
+    predictors = list(predictors)
+    mask = complete_rows(df, predictors)
+    frame = df.loc[mask, predictors].assign(events=uptake_outcome(df)[mask])
+    grouped = frame.groupby(predictors, observed=True, sort=True)['events'].agg(['size', 'sum'])
+    return grouped.rename(columns={'size': 'n', 'sum': 'events'}).reset_index()
+
+def sufficient_stats(df, predictors=UPTAKE_PREDICTORS):
+    """Cell tables for the adjusted model (all predictors) and each crude model, keyed by predictor tuple"""
+    predictors = [p for p in predictors if p in df.columns]
+    cells = {(pred,): cell_table(df, [pred]) for pred in predictors}
+    cells[tuple(predictors)] = cell_table(df, predictors)
+    return cells
+
+def merge_cells(table, new_cells, key):
+    """Add new cell counts into an existing table, keeping the category order and appending unseen levels"""
+    merged = pd.concat([table, new_cells], ignore_index=True)
+    for pred in key:
+        if isinstance(table[pred].dtype, pd.CategoricalDtype):
+            known = list(table[pred].cat.categories)
+            unseen = [level for level in predictor_levels(new_cells[pred]) if level not in set(known)]
+            merged[pred] = pd.Categorical(merged[pred].astype(object), categories=known + unseen)
+    return merged.groupby(list(key), observed=True, sort=True)[['n', 'events']].sum().reset_index()
+
+def update_sufficient_stats(cells, new_rows):
+    """Fold appended survey rows into existing sufficient statistics in O(new rows + cells)"""
+    return {key: merge_cells(table, cell_table(new_rows, list(key)), key) for key, table in cells.items()}
+
+def fit_cells(table, predictors, family='poisson', cov_type='HC0', start_params=None):
+    """Fit a Poisson or logistic GLM from a cell table; returns coefficients, robust covariance and labels
+
+    The IRLS fit runs on the cells (O(levels), not O(rows)) and gives the same estimates as the
+    row-level fit. The HC0 sandwich is exact too, because each row's score is x * (y - mu), so
+    summing over a cell with n rows and e events gives e * (1 - mu)^2 + (n - e) * mu^2 per cell.
+    """
+    X, labels = design_matrix(table, predictors)
+    n = table['n'].to_numpy(dtype=float)
+    events = table['events'].to_numpy(dtype=float)
+    fam, _ = glm_family(family)
+    with warnings.catch_warnings():
+        # Saturated cell fits reproduce the observed counts exactly, which statsmodels flags as separation
+        warnings.simplefilter('ignore', PerfectSeparationWarning)
+        if family == 'poisson':
+            result = sm.GLM(events, X, family=fam, exposure=n).fit(start_params=start_params)
+        else:
+            result = sm.GLM(np.column_stack([events, n - events]), X, family=fam).fit(start_params=start_params)
+    params = np.asarray(result.params)
+
+    mu = np.asarray(fam.link.inverse(X @ params))
+    weight = n * mu if family == 'poisson' else n * mu * (1 - mu)
+    bread = np.linalg.inv((X * weight[:, None]).T @ X)
+    score_sq = events * (1 - mu) ** 2 + (n - events) * mu ** 2
+    cov = bread @ ((X * score_sq[:, None]).T @ X) @ bread
+    if cov_type == 'HC1':
+        cov *= n.sum() / (n.sum() - X.shape[1])
+    return params, cov, labels
+
+def fit_rows(y, X, fam, cov_type='HC0'):
+    """Fit a row-level GLM with a robust covariance; returns coefficients and covariance
+
+    statsmodels' GLM returns the HC0 sandwich when asked for HC1, so the n / (n - k)
+    small-sample factor is applied here, matching fit_cells.
+    """
+    result = sm.GLM(y, X, family=fam).fit(cov_type='HC0')
+    cov = np.asarray(result.cov_params())
+    if cov_type == 'HC1':
+        cov *= len(y) / (len(y) - X.shape[1])
+    return np.asarray(result.params), cov
+
+def wald_intervals(params, cov):
+    """95% Wald lower and upper bounds and two-sided p-values on the linear-predictor scale"""
+    se = np.sqrt(np.diag(cov))
+    z = stats.norm.ppf(0.975)
+    return params - z * se, params + z * se, 2 * stats.norm.sf(np.abs(params / se))
+
+def risk_ratio_rows(params, cov, labels, prefix, measure='RR'):
+    """Exponentiated coefficients, 95% Wald CIs and p-values keyed by (predictor, level)"""
+    lower, upper, pvalues = wald_intervals(params, cov)
+    return {
+        label: {
+            f'{prefix} {measure}': np.exp(params[j]),
+            f'{prefix} CI Lower': np.exp(lower[j]),
+            f'{prefix} CI Upper': np.exp(upper[j]),
+            f'{prefix} p-value': pvalues[j],
+        }
+        for j, label in enumerate(labels) if j > 0
+    }
+
+def modified_poisson_table(df, predictors=UPTAKE_PREDICTORS, cov_type='HC0', cells=None):
+    """Crude (one model per predictor) and adjusted (all predictors) risk ratios for uptake
+
+    Fitted from sufficient statistics; pass ``cells`` (from sufficient_stats/update_sufficient_stats)
+    to skip the pass over the rows.
+    """
+    predictors = [p for p in predictors if p in df.columns]
+    if 'Uptake' not in df.columns or not predictors:
+        return pd.DataFrame()
+    keys = [(pred,) for pred in predictors] + [tuple(predictors)]
+    if cells is None or any(key not in cells for key in keys):
+        cells = sufficient_stats(df, predictors)
+
+    # Crude models: each predictor on its own complete cases
+    crude = {}
+    for pred in predictors:
+        table = cells[(pred,)]
+        if len(table) > 1:
+            crude.update(risk_ratio_rows(*fit_cells(table, [pred], cov_type=cov_type), 'Crude'))
+
+    # Adjusted model: all predictors on the shared complete cases
+    adjusted = risk_ratio_rows(*fit_cells(cells[tuple(predictors)], predictors, cov_type=cov_type), 'Adjusted')
+
+    rows = []
+    for pred in predictors:
+        table = cells[(pred,)]
+        for i, (level, total, screened) in enumerate(zip(table[pred], table['n'], table['events'])):
+            row = {
+                'Predictor': pred,
+                'Category': level,
+                'Reference': i == 0,
+                'Screened (n)': int(screened),
+                'Total (n)': int(total),
+            }
+            row['Uptake Rate (%)'] = row['Screened (n)'] / row['Total (n)'] * 100 if row['Total (n)'] else np.nan
+            row.update(crude.get((pred, level), {}))
+            row.update(adjusted.get((pred, level), {}))
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+# 🩺 Collinearity diagnostics from one factorization of the adjusted design
+VIF_THRESHOLD = 5  # Conventional cut-off for problematic variance inflation
+
+def collinearity_diagnostics(df, predictors=UPTAKE_PREDICTORS):
+    """VIF per dummy column and generalized VIF per predictor for the adjusted model design
+
+    Uses one Cholesky factorization of the correlation matrix of the non-intercept columns:
+    VIF_j = (R^-1)_jj and GVIF = det(R_jj) * det((R^-1)_jj) (Fox & Monette, 1992).
+    """
+    predictors = [p for p in predictors if p in df.columns]
+    if 'Uptake' not in df.columns or not predictors:
+        return pd.DataFrame()
+
+    mask = complete_rows(df, predictors)
+    X, labels = design_matrix(df.loc[mask], predictors)
+    X, labels = X[:, 1:], labels[1:]
+    if X.shape[1] == 0:
+        return pd.DataFrame()
+    keep = X.std(axis=0) > 0
+    X = X[:, keep]
+    labels = [label for label, k in zip(labels, keep) if k]
+
+    corr = np.atleast_2d(np.corrcoef(X, rowvar=False))
+    try:
+        chol = np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError:
+        # Exact collinearity: every involved column has infinite inflation
+        inverse = np.full_like(corr, np.inf)
+    else:
+        chol_inv = np.linalg.solve(chol, np.eye(len(corr)))
+        inverse = chol_inv.T @ chol_inv
+
+    owner = np.array([pred for pred, _ in labels])
+    gvif = {}
+    for pred in predictors:
+        block = np.flatnonzero(owner == pred)
+        if len(block) == 0:
+            continue
+        if np.isinf(inverse).any():
+            gvif[pred] = np.inf
+        else:
+            gvif[pred] = np.linalg.det(corr[np.ix_(block, block)]) * np.linalg.det(inverse[np.ix_(block, block)])
+
+    rows = []
+    for j, (pred, level) in enumerate(labels):
+        n_levels = int((owner == pred).sum())
+        rows.append({
+            'Predictor': pred,
+            'Category': level,
+            'VIF': inverse[j, j],
+            'GVIF': gvif[pred],
+            'df': n_levels,
+            'Adjusted GVIF': gvif[pred] ** (1 / (2 * n_levels)),
+        })
+    return pd.DataFrame(rows)
+
+# ⚡ Process-pool plumbing: one shared spawn-context pool, arrays passed as shared-memory handles
+PARALLEL_MIN_CELLS = 2_000_000  # Work size below which a process pool costs more than it saves
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def process_pool():
+    """Shared worker pool, created on first use and reused across reruns and sessions"""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # Spawned workers avoid forking a multi-threaded server process
+            _POOL = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=get_context('spawn'))
+        return _POOL
+
+def run_parallel(worker, tasks, parallel):
+    """Map a module-level worker over tasks in the shared pool, or in-process when not parallel"""
+    global _POOL
+    if parallel and len(tasks) > 1:
+        try:
+            return list(process_pool().map(worker, tasks))
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM) - drop the pool and finish in-process
+            with _POOL_LOCK:
+                _POOL = None
+    return [worker(task) for task in tasks]
+
+@contextlib.contextmanager
+def shared_arrays(**arrays):
+    """Copy arrays into shared memory once and yield picklable handles that workers attach to"""
+    blocks, handles = [], {}
+    try:
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            handles[name] = (block.name, array.shape, array.dtype.str)
+        yield handles
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+@contextlib.contextmanager
+def attached_arrays(handles):
+    """Zero-copy views onto arrays published with shared_arrays (worker side)"""
+    blocks, views = [], {}
+    try:
+        for name, (block_name, shape, dtype) in handles.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            blocks.append(block)
+            views[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        yield views
+    finally:
+        views.clear()  # Drop buffer views before closing the mappings
+        for block in blocks:
+            block.close()
+
+# 🔎 Batch univariable screening of every candidate predictor
+def code_matrix(df, predictors):
+    """Integer category codes (n x p, -1 = missing) and the level labels for each predictor"""
+    levels = [predictor_levels(df[pred]) for pred in predictors]
+    codes = np.column_stack([
+        pd.Categorical(df[pred], categories=lvls).codes.astype(np.int16)
+        for pred, lvls in zip(predictors, levels)
+    ]) if predictors else np.empty((len(df), 0), dtype=np.int16)
+    return codes, levels
+
+def glm_family(family):
+    """statsmodels family and effect measure for 'poisson' (risk ratios) or 'logistic' (odds ratios)"""
+    if family == 'poisson':
+        return sm.families.Poisson(), 'RR'
+    if family == 'logistic':
+        return sm.families.Binomial(), 'OR'
+    raise ValueError(f"Unknown family: {family}")
+
+def fit_code_column(y, codes, n_levels, family, cov_type):
+    """Fit one univariable GLM from a predictor's code column; returns per-level estimate arrays"""
+    rows = (codes >= 0) & ~np.isnan(y)
+    c = codes[rows]
+    X = np.column_stack([np.ones(len(c))] + [(c == k).astype(float) for k in range(1, n_levels)])
+    fam, _ = glm_family(family)
+    params, cov = fit_rows(y[rows], X, fam, cov_type)
+    lower, upper, pvalues = wald_intervals(params, cov)
+    return (
+        np.bincount(c, minlength=n_levels),
+        np.bincount(c, weights=y[rows], minlength=n_levels),
+        np.exp(params[1:]),
+        np.exp(lower[1:]),
+        np.exp(upper[1:]),
+        pvalues[1:],
+    )
+
+def _fit_univariable_task(task):
+    """Worker: fit one predictor's crude model against the shared code matrix (transposed, one row per predictor)"""
+    handles, j, n_levels, family, cov_type = task
+    with attached_arrays(handles) as arrays:
+        try:
+            return fit_code_column(arrays['y'], arrays['codes'][j], n_levels, family, cov_type)
+        except Exception:
+            return None
+
+def fit_univariable_batch(df, predictors, family='poisson', cov_type='HC0', parallel=None):
+    """Fit one crude model per candidate predictor and return a tidy results table"""
+    predictors = [p for p in predictors if p in df.columns and p != 'Uptake']
+    if 'Uptake' not in df.columns or not predictors:
+        return pd.DataFrame()
+
+    y = uptake_outcome(df).to_numpy(dtype=np.float64)
+    codes, levels = code_matrix(df, predictors)
+    tasks = [j for j, lvls in enumerate(levels) if len(lvls) > 1]
+    if parallel is None:
+        parallel = codes.size >= PARALLEL_MIN_CELLS
+
+    # Predictor-major layout so each worker reads one contiguous row of the shared buffer
+    with shared_arrays(codes=codes.T, y=y) if parallel else contextlib.nullcontext() as handles:
+        if parallel:
+            payload = [(handles, j, len(levels[j]), family, cov_type) for j in tasks]
+            fits = dict(zip(tasks, run_parallel(_fit_univariable_task, payload, parallel=True)))
+        else:
+            fits = {}
+            for j in tasks:
+                try:
+                    fits[j] = fit_code_column(y, codes[:, j], len(levels[j]), family, cov_type)
+                except Exception:
+                    fits[j] = None
+
+    _, measure = glm_family(family)
+    rows = []
+    for j in tasks:
+        fit = fits.get(j)
+        for k, level in enumerate(levels[j]):
+            row = {'Predictor': predictors[j], 'Level': level, 'Reference': k == 0, 'Measure': measure}
+            if fit is not None:
+                n, events, est, lower, upper, pvalues = fit
+                row.update({'N': int(n[k]), 'Events': int(events[k])})
+                if k > 0:
+                    row.update({'Estimate': est[k - 1], 'CI Lower': lower[k - 1],
+                                'CI Upper': upper[k - 1], 'p-value': pvalues[k - 1]})
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+# 🪜 Stepwise model selection with likelihood-ratio tests and warm-started candidate fits
+def fit_loglik(y, X, family, start_params=None):
+    """Log-likelihood and coefficients of a GLM fit (model-based covariance; only the likelihood is used)"""
+    fam, _ = glm_family(family)
+    result = sm.GLM(y, X, family=fam).fit(start_params=start_params)
+    return result.llf, np.asarray(result.params)
+
+def fit_design_subset(y, X, columns, start_params, family):
+    """Fit the model on a subset of design columns; None if the fit fails"""
+    try:
+        return fit_loglik(y, X[:, columns], family, start_params)
+    except Exception:
+        return None
+
+def _fit_design_subset_task(task):
+    """Worker: fit one candidate model against the shared design matrix"""
+    handles, columns, start_params, family = task
+    with attached_arrays(handles) as arrays:
+        return fit_design_subset(arrays['y'], arrays['X'], columns, start_params, family)
+
+def warm_start(parent_columns, parent_params, columns):
+    """Start values for a child model: the parent's coefficients, zero for newly added columns"""
+    lookup = dict(zip(parent_columns, parent_params))
+    return np.array([lookup.get(j, 0.0) for j in columns])
+
+def stepwise_select(df, candidates, direction='both', alpha_enter=0.05, alpha_remove=0.10,
+                    family='logistic', parallel=None):
+    """Forward, backward or bidirectional selection by likelihood-ratio tests on shared complete cases
+
+    The tests use the binomial (logistic) likelihood by default: a Poisson working likelihood is
+    misspecified for a 0/1 outcome, so its LR statistics are not chi-square under the null. Refit
+    the selected set with modified Poisson for risk ratios.
+
+    Returns the selected predictors, a step log and the number of rows used. Every candidate
+    fit in a step starts from its parent model's coefficients, and the candidates of a step are
+    fitted together in the process pool for large designs.
+    """
+    candidates = [c for c in candidates if c in df.columns and c != 'Uptake']
+    if 'Uptake' not in df.columns or not candidates:
+        return [], pd.DataFrame(), 0
+
+    mask = complete_rows(df, candidates)
+    X, labels = design_matrix(df.loc[mask], candidates)
+    y = uptake_outcome(df).to_numpy()[mask]
+    blocks = {pred: [j for j, (owner, _) in enumerate(labels) if owner == pred] for pred in candidates}
+    candidates = [pred for pred in candidates if blocks[pred]]  # Constant on the complete cases
+    if parallel is None:
+        parallel = X.size * len(candidates) >= PARALLEL_MIN_CELLS
+
+    def columns_of(preds):
+        return [0] + sorted(j for pred in preds for j in blocks[pred])
+
+    selected = list(candidates) if direction == 'backward' else []
+    steps = []
+    with shared_arrays(X=X, y=y) if parallel else contextlib.nullcontext() as handles:
+        def evaluate(models):
+            if parallel:
+                return run_parallel(_fit_design_subset_task, [(handles, cols, start, family) for cols, start in models], True)
+            return [fit_design_subset(y, X, cols, start, family) for cols, start in models]
+
+        parent_columns = columns_of(selected)
+        parent = evaluate([(parent_columns, None)])[0]
+        if parent is None:
+            return [], pd.DataFrame(), int(mask.sum())
+
+        for _ in range(2 * len(candidates) + 1):  # Each predictor can enter and leave at most once per pass
+            changed = False
+
+            if direction in ('forward', 'both'):
+                remaining = [pred for pred in candidates if pred not in selected]
+                models = [columns_of(selected + [pred]) for pred in remaining]
+                fits = evaluate([(cols, warm_start(parent_columns, parent[1], cols)) for cols in models])
+                tests = [
+                    (stats.chi2.sf(max(2 * (fit[0] - parent[0]), 0.0), len(blocks[pred])), pred, cols, fit)
+                    for pred, cols, fit in zip(remaining, models, fits) if fit is not None
+                ]
+                if tests:
+                    p_value, pred, cols, fit = min(tests, key=lambda t: t[0])
+                    if p_value < alpha_enter:
+                        steps.append(('Added', pred, len(blocks[pred]), 2 * (fit[0] - parent[0]), p_value, fit[0], len(cols)))
+                        selected.append(pred)
+                        parent_columns, parent = cols, fit
+                        changed = True
+
+            if direction in ('backward', 'both') and selected:
+                models = [columns_of([p for p in selected if p != pred]) for pred in selected]
+                fits = evaluate([(cols, warm_start(parent_columns, parent[1], cols)) for cols in models])
+                tests = [
+                    (stats.chi2.sf(max(2 * (parent[0] - fit[0]), 0.0), len(blocks[pred])), pred, cols, fit)
+                    for pred, cols, fit in zip(list(selected), models, fits) if fit is not None
+                ]
+                if tests:
+                    p_value, pred, cols, fit = max(tests, key=lambda t: t[0])
+                    if p_value > alpha_remove:
+                        steps.append(('Removed', pred, len(blocks[pred]), 2 * (parent[0] - fit[0]), p_value, fit[0], len(cols)))
+                        selected.remove(pred)
+                        parent_columns, parent = cols, fit
+                        changed = True
+
+            if not changed:
+                break
+
+    log = pd.DataFrame(steps, columns=['Action', 'Predictor', 'df', 'LR Statistic', 'p-value', 'Log-Likelihood', 'Parameters'])
+    if not log.empty:
+        log.insert(0, 'Step', np.arange(1, len(log) + 1))
+        log['AIC'] = 2 * log['Parameters'] - 2 * log['Log-Likelihood']
+    return selected, log, int(mask.sum())
+
+# 🎲 Vectorized bootstrap: resample collapsed cells instead of rows
+BOOTSTRAP_CHUNK = 250  # Replicates drawn per block (bounds memory at chunk x cells)
+
+def joint_cells(df, columns):
+    """Collapse rows into unique (column levels..., outcome) cells with counts; missing levels coded -1"""
+    y = uptake_outcome(df).to_numpy()
+    keep = ~np.isnan(y)
+    codes, levels = code_matrix(df.loc[keep], columns)
+    data = np.column_stack([codes.astype(np.int32), y[keep].astype(np.int32)])
+    cells, counts = np.unique(data, axis=0, return_counts=True)
+    return cells[:, :-1], cells[:, -1].astype(float), counts, levels
+
+def _bootstrap_chunk(task):
+    """Worker: draw one block of multinomial cell-count replicates and reduce them to per-level totals/events"""
+    seed, size, n, probs, groups = task
+    rng = np.random.default_rng(seed)
+    weights = rng.multinomial(n, probs, size=size).astype(float)  # replicates x cells
+    out = []
+    for cell_level, cell_y, n_levels in groups:
+        member = np.zeros((len(cell_level), n_levels))
+        observed = cell_level >= 0
+        member[np.flatnonzero(observed), cell_level[observed]] = 1.0
+        out.append((weights @ member, weights @ (member * cell_y[:, None])))
+    return out
+
+def bootstrap_uptake(df, columns, n_boot=2000, seed=2024, parallel=None, alpha=0.05):
+    """Percentile bootstrap CIs for uptake rate by level and crude RR vs the reference level
+
+    Resampling n rows with replacement is equivalent to drawing multinomial counts over the
+    observed (levels, outcome) cells, so every replicate costs O(cells) instead of O(rows).
+    """
+    columns = [c for c in columns if c in df.columns]
+    if 'Uptake' not in df.columns or not columns:
+        return pd.DataFrame()
+
+    cell_codes, cell_y, counts, levels = joint_cells(df, columns)
+    n = int(counts.sum())
+    probs = counts / n
+    groups = [(cell_codes[:, j], cell_y, len(levels[j])) for j in range(len(columns))]
+    if parallel is None:
+        parallel = len(counts) * n_boot >= PARALLEL_MIN_CELLS
+
+    sizes = [min(BOOTSTRAP_CHUNK, n_boot - start) for start in range(0, n_boot, BOOTSTRAP_CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    blocks = run_parallel(_bootstrap_chunk, [(s, size, n, probs, groups) for s, size in zip(seeds, sizes)], parallel)
+
+    lo_q, hi_q = 100 * alpha / 2, 100 * (1 - alpha / 2)
+    rows = []
+    for j, col in enumerate(columns):
+        totals = np.vstack([block[j][0] for block in blocks])
+        events = np.vstack([block[j][1] for block in blocks])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = events / totals
+            ratios = rates / rates[:, [0]]
+        observed_totals = np.bincount(cell_codes[:, j][cell_codes[:, j] >= 0],
+                                      weights=counts[cell_codes[:, j] >= 0], minlength=len(levels[j]))
+        observed_events = np.bincount(cell_codes[:, j][cell_codes[:, j] >= 0],
+                                      weights=(counts * cell_y)[cell_codes[:, j] >= 0], minlength=len(levels[j]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            point_rate = observed_events / observed_totals
+        rate_ci = np.nanpercentile(rates, [lo_q, hi_q], axis=0)
+        ratio_ci = np.nanpercentile(np.where(np.isfinite(ratios), ratios, np.nan), [lo_q, hi_q], axis=0)
+        for k, level in enumerate(levels[j]):
+            rows.append({
+                'Column': col,
+                'Level': level,
+                'Reference': k == 0,
+                'Uptake Rate (%)': point_rate[k] * 100,
+                'Rate CI Lower (%)': rate_ci[0, k] * 100,
+                'Rate CI Upper (%)': rate_ci[1, k] * 100,
+                'RR': point_rate[k] / point_rate[0] if point_rate[0] > 0 else np.nan,
+                'RR CI Lower': ratio_ci[0, k] if k > 0 else np.nan,
+                'RR CI Upper': ratio_ci[1, k] if k > 0 else np.nan,
+            })
+    return pd.DataFrame(rows)
+
+# 🧮 Association tests: one (item x level x outcome) contingency tensor for every item
+FISHER_MIN_EXPECTED = 5  # 2x2 tables with any expected count below this use Fisher's exact test
+
+def contingency_tensor(df, columns):
+    """Counts of every (item, level, uptake) cell from a single bincount pass; shape items x max levels x 2"""
+    y = uptake_outcome(df).to_numpy()
+    keep = ~np.isnan(y)
+    codes, levels = code_matrix(df.loc[keep], columns)
+    width = max((len(lvls) for lvls in levels), default=1)
+    valid = codes >= 0
+    item = np.broadcast_to(np.arange(len(columns)), codes.shape)[valid]
+    outcome = np.broadcast_to(y[keep].astype(np.int64)[:, None], codes.shape)[valid]
+    keys = (item * width + codes[valid]) * 2 + outcome
+    tensor = np.bincount(keys, minlength=len(columns) * width * 2).reshape(len(columns), width, 2)
+    return tensor, levels
+
+def fisher_exact_2x2(tables):
+    """Two-sided Fisher exact p-values for a stack of 2x2 tables, summing hypergeometric pmfs on a padded grid"""
+    a = tables[:, 0, 0]
+    row1 = tables[:, 0].sum(axis=1)
+    col1 = tables[:, :, 0].sum(axis=1)
+    total = tables.sum(axis=(1, 2))
+    low = np.maximum(0, row1 + col1 - total)
+    high = np.minimum(row1, col1)
+    support = low[:, None] + np.arange((high - low).max() + 1 if len(tables) else 1)
+    pmf = stats.hypergeom.pmf(support, total[:, None], row1[:, None], col1[:, None])
+    pmf[support > high[:, None]] = 0.0
+    observed = stats.hypergeom.pmf(a, total, row1, col1)
+    # Same relative tolerance as scipy.stats.fisher_exact when comparing tail probabilities
+    return np.minimum(1.0, np.where(pmf <= observed[:, None] * (1 + 1e-7), pmf, 0.0).sum(axis=1))
+
+def association_tests(tensor, levels, columns, alpha=0.05):
+    """Pearson chi-square (or Fisher exact for sparse 2x2) of every item against uptake, with BH and Holm correction"""
+    tensor = tensor.astype(float)
+    row = tensor.sum(axis=2, keepdims=True)
+    col = tensor.sum(axis=1, keepdims=True)
+    total = tensor.sum(axis=(1, 2), keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = np.where(total > 0, row * col / total, 0.0)
+        contrib = np.where(expected > 0, (tensor - expected) ** 2 / expected, 0.0)
+    statistic = contrib.sum(axis=(1, 2))
+    rows_observed = (row[:, :, 0] > 0).sum(axis=1)
+    cols_observed = (col[:, 0, :] > 0).sum(axis=1)
+    dof = (rows_observed - 1) * (cols_observed - 1)
+    min_expected = np.where(expected > 0, expected, np.inf).min(axis=(1, 2))
+
+    pvalues = np.where(dof > 0, stats.chi2.sf(statistic, np.maximum(dof, 1)), np.nan)
+    test = np.where(dof > 0, 'Chi-square', 'Not testable').astype(object)
+
+    # Sparse 2x2 tables: swap in Fisher's exact test
+    sparse = (dof == 1) & (rows_observed == 2) & (min_expected < FISHER_MIN_EXPECTED)
+    if sparse.any():
+        observed_rows = np.argsort(row[sparse, :, 0] == 0, axis=1, kind='stable')[:, :2]
+        tables = np.take_along_axis(tensor[sparse], observed_rows[:, :, None], axis=1)
+        pvalues[sparse] = fisher_exact_2x2(tables.astype(np.int64))
+        test[sparse] = 'Fisher exact'
+
+    tested = ~np.isnan(pvalues)
+    p_bh = np.full(len(columns), np.nan)
+    p_holm = np.full(len(columns), np.nan)
+    if tested.any():
+        p_bh[tested] = multipletests(pvalues[tested], alpha=alpha, method='fdr_bh')[1]
+        p_holm[tested] = multipletests(pvalues[tested], alpha=alpha, method='holm')[1]
+
+    return pd.DataFrame({
+        'Item': columns,
+        'Levels': rows_observed,
+        'N': total[:, 0, 0].astype(int),
+        'Test': test,
+        'Statistic': np.where(test == 'Chi-square', statistic, np.nan),
+        'df': dof,
+        'Min Expected': np.where(np.isfinite(min_expected), min_expected, np.nan),
+        'p-value': pvalues,
+        'p (BH)': p_bh,
+        'p (Holm)': p_holm,
+    })
+
+# 🧩 Multiple imputation: chained categorical imputation, M completed datasets, Rubin's rules
+def impute_codes(codes, n_levels, seed, iterations=5):
+    """One chained-imputation run over an integer code matrix (-1 = missing); returns completed codes
+
+    Each missing column is redrawn in turn from a naive-Bayes conditional given every other column,
+    with its parameters drawn from their Dirichlet posterior so the imputations are proper.
+    """
+    rng = np.random.default_rng(seed)
+    codes = codes.astype(np.int64)
+    missing = codes < 0
+    n_levels = np.asarray(n_levels)
+    width = int(n_levels.max())
+    valid_level = np.arange(width)[None, :] < n_levels[:, None]  # columns x width
+
+    # Start from draws of each column's observed marginal distribution
+    for j in np.flatnonzero(missing.any(axis=0)):
+        observed = codes[~missing[:, j], j]
+        fill = rng.choice(observed, size=missing[:, j].sum()) if len(observed) else np.zeros(missing[:, j].sum(), dtype=np.int64)
+        codes[missing[:, j], j] = fill
+
+    targets = np.flatnonzero(missing.any(axis=0) & ~missing.all(axis=0))
+    for _ in range(iterations):
+        for j in targets:
+            rows = missing[:, j]
+            others = np.delete(np.arange(codes.shape[1]), j)
+            levels_j = int(n_levels[j])
+            y = codes[~rows, j]
+            x = codes[~rows][:, others]
+
+            # Posterior draws for P(target) and every P(other | target) from one bincount
+            prior = rng.dirichlet(np.bincount(y, minlength=levels_j) + 1.0)
+            keys = (np.arange(len(others))[None, :] * levels_j + y[:, None]) * width + x
+            counts = np.bincount(keys.ravel(), minlength=len(others) * levels_j * width).reshape(len(others), levels_j, width)
+            shape = np.where(valid_level[others][:, None, :], counts + 1.0, 0.0)
+            draws = rng.gamma(np.maximum(shape, 1e-12)) * (shape > 0)
+            log_cond = np.log(np.maximum(draws / draws.sum(axis=2, keepdims=True), 1e-300))
+
+            # Gather log P(observed others | each target level) for the missing rows and sample (Gumbel-max)
+            x_missing = codes[rows][:, others]
+            log_post = np.log(prior)[None, :] + log_cond[np.arange(len(others))[None, :], :, x_missing].sum(axis=1)
+            codes[rows, j] = np.argmax(log_post + rng.gumbel(size=log_post.shape), axis=1)
+    return codes
+
+def _impute_task(task):
+    """Worker: run one imputation chain against the shared code matrix"""
+    handles, n_levels, seed, iterations = task
+    with attached_arrays(handles) as arrays:
+        return impute_codes(arrays['codes'], n_levels, seed, iterations).astype(np.int16)
+
+def multiple_imputation(df, columns, m=5, iterations=5, seed=2024, parallel=None):
+    """M completed copies of the categorical columns, one independent imputation chain each"""
+    columns = [c for c in columns if c in df.columns]
+    codes, levels = code_matrix(df, columns)
+    keep = [j for j, lvls in enumerate(levels) if len(lvls) > 0]
+    codes, levels, columns = codes[:, keep], [levels[j] for j in keep], [columns[j] for j in keep]
+    if not columns:
+        return []
+    n_levels = [len(lvls) for lvls in levels]
+    seeds = np.random.SeedSequence(seed).spawn(m)
+    if parallel is None:
+        parallel = codes.size * m >= PARALLEL_MIN_CELLS
+
+    if parallel:
+        with shared_arrays(codes=codes) as handles:
+            completed = run_parallel(_impute_task, [(handles, n_levels, s, iterations) for s in seeds], parallel=True)
+    else:
+        completed = [impute_codes(codes, n_levels, s, iterations) for s in seeds]
+
+    frames = []
+    for filled in completed:
+        frame = {}
+        for j, col in enumerate(columns):
+            values = pd.Categorical.from_codes(filled[:, j], categories=levels[j])
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                values = values.set_categories(df[col].cat.categories)
+            frame[col] = values
+        frames.append(pd.DataFrame(frame, index=df.index))
+    return frames
+
+def rubin_pool(estimates, variances, alpha=0.05):
+    """Pool M estimates and their variances with Rubin's rules (arrays shaped M x parameters)"""
+    estimates, variances = np.asarray(estimates, dtype=float), np.asarray(variances, dtype=float)
+    m = len(estimates)
+    estimate = estimates.mean(axis=0)
+    within = variances.mean(axis=0)
+    between = estimates.var(axis=0, ddof=1) if m > 1 else np.zeros_like(estimate)
+    total = within + (1 + 1 / m) * between
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = (1 + 1 / m) * between / within
+        dof = np.where(between > 0, (m - 1) * (1 + 1 / ratio) ** 2, np.inf)
+    se = np.sqrt(total)
+    crit = stats.t.ppf(1 - alpha / 2, dof)
+    return {
+        'estimate': estimate,
+        'se': se,
+        'lower': estimate - crit * se,
+        'upper': estimate + crit * se,
+        'p-value': 2 * stats.t.sf(np.abs(estimate / se), dof),
+        'df': dof,
+        'fmi': np.where(total > 0, (1 + 1 / m) * between / total, 0.0),
+    }
+
+def pooled_risk_ratios(imputations, predictors=UPTAKE_PREDICTORS, cov_type='HC0'):
+    """Adjusted modified Poisson RRs fitted on each imputed dataset and pooled on the log scale"""
+    predictors = [p for p in predictors if imputations and p in imputations[0].columns]
+    if not predictors or 'Uptake' not in imputations[0].columns:
+        return {}
+    fits = [fit_cells(cell_table(imp, predictors), predictors, cov_type=cov_type) for imp in imputations]
+    labels = fits[0][2]
+    if any(fit[2] != labels for fit in fits):
+        return {}  # A level only appears in some imputations; the fits are not comparable
+    pooled = rubin_pool([fit[0] for fit in fits], [np.diag(fit[1]) for fit in fits])
+    return {
+        label: {
+            'MI RR': np.exp(pooled['estimate'][j]),
+            'MI CI Lower': np.exp(pooled['lower'][j]),
+            'MI CI Upper': np.exp(pooled['upper'][j]),
+            'MI p-value': pooled['p-value'][j],
+            'MI FMI': pooled['fmi'][j],
+        }
+        for j, label in enumerate(labels) if j > 0
+    }
+
+# 🧪 Reliability: Cronbach's alpha from one covariance matrix per domain
+def binary_item_matrix(df, items, positive='A', reverse=()):
+    """Items as a float matrix (1 = positive response, 0 = other, NaN = missing); items in reverse are flipped"""
+    values = df[items]
+    X = np.where(values.isna(), np.nan, values.eq(positive)).astype(float)
+    flip = np.isin(items, list(reverse))
+    X[:, flip] = 1 - X[:, flip]
+    return X
+
+def reliability_analysis(df, domains, positive='A'):
+    """Alpha, alpha-if-item-deleted and corrected item-total correlations for every domain
+
+    All deletion variants come from the domain's covariance matrix C: dropping item i leaves a
+    total variance of sum(C) - 2 * sum(C[i]) + C[i, i], so no item is ever refitted.
+    """
+    rows = []
+    for domain, items in domains.items():
+        items = [item for item in items if item in df.columns]
+        if len(items) < 2:
+            continue
+        X = binary_item_matrix(df, items, positive)
+        X = X[~np.isnan(X).any(axis=1)]  # Listwise complete responses
+        k = len(items)
+        if len(X) < 2:
+            continue
+        C = np.cov(X, rowvar=False)
+        item_var = np.diag(C)
+        total_var = C.sum()
+        row_sums = C.sum(axis=1)
+
+        rest_var = total_var - 2 * row_sums + item_var  # Variance of the total without item i
+        with np.errstate(divide='ignore', invalid='ignore'):
+            alpha = k / (k - 1) * (1 - item_var.sum() / total_var)
+            alpha_deleted = (k - 1) / (k - 2) * (1 - (item_var.sum() - item_var) / rest_var) if k > 2 else np.full(k, np.nan)
+            item_total = (row_sums - item_var) / np.sqrt(item_var * rest_var)
+
+        for i, item in enumerate(items):
+            rows.append({
+                'Domain': domain,
+                'Item': item,
+                'N': len(X),
+                'Item Mean': X[:, i].mean(),
+                'Item-Total r': item_total[i],
+                'Alpha if Deleted': alpha_deleted[i],
+                'Domain Alpha': alpha,
+            })
+    return pd.DataFrame(rows)
+
+# 🧠 Item response theory: Rasch / 2PL by marginal maximum likelihood (Bock-Aitkin EM)
+IRT_QUADRATURE_POINTS = 21
+
+def response_patterns(df, items, positive='A', reverse=()):
+    """Unique binary response patterns (NaN = missing), their counts and each respondent's pattern index"""
+    X = binary_item_matrix(df, items, positive, reverse)
+    coded = np.where(np.isnan(X), 2, X).astype(np.int64)  # 2 marks missing
+    if len(items) <= 39:
+        # Base-3 row keys fit in int64, so a 1-D unique replaces the much slower row-wise unique
+        keys = coded @ (3 ** np.arange(len(items), dtype=np.int64))
+        _, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+        patterns = coded[first]
+    else:
+        patterns, inverse, counts = np.unique(coded, axis=0, return_inverse=True, return_counts=True)
+    patterns = np.where(patterns == 2, np.nan, patterns).astype(float)
+    return patterns, counts.astype(float), inverse.ravel()
+
+def log_posterior_weights(joint):
+    """Row-normalized posterior weights and row log-normalizers of a log-joint matrix (max-shifted)"""
+    shift = joint.max(axis=1, keepdims=True)
+    weights = np.exp(joint - shift)
+    total = weights.sum(axis=1, keepdims=True)
+    return weights / total, (shift + np.log(total)).ravel()
+
+def fit_irt(df, items, model='2pl', positive='A', reverse=(), max_iter=200, tol=1e-4):
+    """Fit a Rasch (common slope) or 2PL model to binary items and score every respondent by EAP
+
+    Respondents are collapsed to unique response patterns, so each EM iteration costs
+    O(patterns x items x quadrature points) regardless of sample size. Items listed in reverse are
+    scored 1 - x so every item points the same way on the trait. Returns item parameters
+    (discrimination a, difficulty b, P(correct | theta) = logistic(a * (theta - b))) and a frame
+    of abilities aligned to df's index.
+    """
+    items = [item for item in items if item in df.columns]
+    if not items:
+        return pd.DataFrame(), pd.DataFrame()
+    patterns, counts, inverse = response_patterns(df, items, positive, reverse)
+    answered = ~np.isnan(patterns)
+    X = np.nan_to_num(patterns)  # Correct responses (0 where missing)
+    M = answered.astype(float)   # Answered indicators
+    XM = np.hstack([X, M])       # Stacked so each EM pass needs one product per direction
+    n_items = len(items)
+
+    nodes, weights = np.polynomial.hermite_e.hermegauss(IRT_QUADRATURE_POINTS)
+    log_prior = np.log(weights / weights.sum())
+
+    # Slope-intercept parameterization: logit P = a * theta + d
+    slope = np.ones(len(items))
+    intercept = np.log((X.T @ counts + 0.5) / ((M - X).T @ counts + 0.5))
+    loglik = -np.inf
+    for _ in range(max_iter):
+        # E-step: x * log p + (1 - x) * log q = x * eta + log q over answered items, one matrix product
+        eta = slope[:, None] * nodes[None, :] + intercept[:, None]        # items x nodes
+        log_p, log_q = -np.logaddexp(0, -eta), -np.logaddexp(0, eta)
+        joint = XM @ np.vstack([eta, log_q]) + log_prior                   # patterns x nodes
+        posterior, marginal = log_posterior_weights(joint)
+        posterior *= counts[:, None]
+        new_loglik = counts @ marginal
+
+        # Expected correct answers and attempts per item and node
+        expected = XM.T @ posterior
+        correct, attempts = expected[:n_items], expected[n_items:]
+
+        # M-step: one Newton step on every item's weighted logistic regression over the nodes
+        p = np.exp(log_p)
+        resid = correct - attempts * p
+        info = attempts * p * (1 - p)
+        g_d, h_dd = resid.sum(axis=1), info.sum(axis=1)
+        if model == 'rasch':
+            intercept = intercept + g_d / h_dd
+            slope = slope + (resid * nodes).sum() / (info * nodes ** 2).sum()
+        else:
+            g_a, h_aa, h_ad = (resid * nodes).sum(axis=1), (info * nodes ** 2).sum(axis=1), (info * nodes).sum(axis=1)
+            det = h_aa * h_dd - h_ad ** 2
+            slope = slope + (h_dd * g_a - h_ad * g_d) / det
+            intercept = intercept + (h_aa * g_d - h_ad * g_a) / det
+
+        converged = abs(new_loglik - loglik) < tol * abs(new_loglik) * 1e-3
+        loglik = new_loglik
+        if converged:
+            break
+
+    # EAP abilities and posterior SDs per pattern, broadcast back to respondents
+    eta = slope[:, None] * nodes[None, :] + intercept[:, None]
+    joint = XM @ np.vstack([eta, -np.logaddexp(0, eta)]) + log_prior
+    posterior, _ = log_posterior_weights(joint)
+    eap = posterior @ nodes
+    psd = np.sqrt(np.maximum(posterior @ nodes ** 2 - eap ** 2, 0))
+    scored = answered.any(axis=1)
+    eap, psd = np.where(scored, eap, np.nan), np.where(scored, psd, np.nan)
+
+    item_params = pd.DataFrame({
+        'Item': items,
+        'Discrimination': slope,
+        'Difficulty': -intercept / slope,
+        'Proportion Correct': (X.T @ counts) / (M.T @ counts),
+        'Reverse Scored': np.isin(items, list(reverse)),
+    })
+    abilities = pd.DataFrame({
+        'Ability': eap[inverse],
+        'Ability SE': psd[inverse],
+        'Items Answered': answered.sum(axis=1)[inverse],
+    }, index=df.index)
+    item_params.attrs.update({'model': model, 'loglik': loglik, 'patterns': len(patterns), 'negative': int((slope < 0).sum())})
+    return item_params, abilities
+
+def ability_risk_ratio(df, ability, cov_type='HC0'):
+    """Modified Poisson RR of uptake per 1 SD higher ability (robust CI and p-value)"""
+    y = uptake_outcome(df).to_numpy()
+    theta = np.asarray(ability, dtype=float)
+    rows = ~np.isnan(y) & ~np.isnan(theta)
+    if rows.sum() < 3 or theta[rows].std() == 0:
+        return None
+    z = (theta[rows] - theta[rows].mean()) / theta[rows].std()
+    params, cov = fit_rows(y[rows], sm.add_constant(z), sm.families.Poisson(), cov_type)
+    lower, upper, pvalues = wald_intervals(params, cov)
+    return {
+        'RR': np.exp(params[1]),
+        'CI Lower': np.exp(lower[1]),
+        'CI Upper': np.exp(upper[1]),
+        'p-value': pvalues[1],
+        'N': int(rows.sum()),
+    }
+
+# 🎯 Predictive model: ridge logistic regression with stratified k-fold cross-validation
+CV_PENALTIES = (0.1, 1.0, 10.0, 100.0, 1000.0)
+
+def indicator_design(df, predictors):
+    """One-hot design (intercept + non-reference levels + a missing indicator where needed) and column labels"""
+    codes, levels = code_matrix(df, predictors)
+    columns, labels = [np.ones(len(df))], [('Intercept', '')]
+    for j, pred in enumerate(predictors):
+        for k, level in enumerate(levels[j][1:], start=1):
+            columns.append((codes[:, j] == k).astype(float))
+            labels.append((pred, level))
+        if (codes[:, j] < 0).any():
+            columns.append((codes[:, j] < 0).astype(float))
+            labels.append((pred, '(missing)'))
+    return np.column_stack(columns), labels
+
+def fit_ridge_logistic(X, y, penalty, max_iter=100, tol=1e-8):
+    """L2-penalized logistic regression by Newton's method (intercept unpenalized)"""
+    beta = np.zeros(X.shape[1])
+    ridge = np.full(X.shape[1], float(penalty))
+    ridge[0] = 0.0
+    for _ in range(max_iter):
+        p = 1 / (1 + np.exp(-(X @ beta)))
+        gradient = X.T @ (y - p) - ridge * beta
+        hessian = (X * (p * (1 - p))[:, None]).T @ X + np.diag(ridge)
+        step = np.linalg.solve(hessian + 1e-10 * np.eye(len(beta)), gradient)
+        beta += step
+        if np.abs(step).max() < tol:
+            break
+    return beta
+
+def auc_score(y, score):
+    """Area under the ROC curve via the Mann-Whitney rank statistic (ties get half credit)"""
+    y = np.asarray(y, dtype=bool)
+    n_pos, n_neg = y.sum(), (~y).sum()
+    if n_pos == 0 or n_neg == 0:
+        return np.nan
+    ranks = stats.rankdata(score)
+    return (ranks[y].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+def stratified_folds(y, k, seed):
+    """Fold id per row, balancing outcome classes across folds"""
+    rng = np.random.default_rng(seed)
+    folds = np.empty(len(y), dtype=np.int64)
+    for value in np.unique(y):
+        rows = rng.permutation(np.flatnonzero(y == value))
+        folds[rows] = np.arange(len(rows)) % k
+    return folds
+
+def cv_fold_predictions(X, y, folds, fold, penalties):
+    """Held-out predicted probabilities for one fold under every penalty (penalties x fold rows)"""
+    train, test = folds != fold, folds == fold
+    return np.vstack([
+        1 / (1 + np.exp(-(X[test] @ fit_ridge_logistic(X[train], y[train], penalty))))
+        for penalty in penalties
+    ])
+
+def inner_penalty(X, y, k, seed, penalties):
+    """Index of the penalty with the best k-fold AUC on these rows alone"""
+    folds = stratified_folds(y, k, seed)
+    oof = np.empty((len(penalties), len(y)))
+    for fold in range(k):
+        oof[:, folds == fold] = cv_fold_predictions(X, y, folds, fold, penalties)
+    return int(np.nanargmax([auc_score(y, preds) for preds in oof]))
+
+def nested_fold_predictions(X, y, folds, fold, penalties, seed):
+    """One outer fold: held-out predictions under every penalty plus the penalty chosen by an inner
+    CV on the outer training rows only, so the test rows never influence the choice"""
+    train, k = folds != fold, len(np.unique(folds))
+    chosen = inner_penalty(X[train], y[train], max(k - 1, 2), seed + fold + 1, penalties)
+    return cv_fold_predictions(X, y, folds, fold, penalties), chosen
+
+def _cv_fold_task(task):
+    """Worker: fit one outer fold (with its inner penalty search) against the shared design"""
+    handles, fold, penalties, seed = task
+    with attached_arrays(handles) as arrays:
+        return nested_fold_predictions(arrays['X'], arrays['y'], arrays['folds'], fold, penalties, seed)
+
+def calibration_table(y, p, bins=10):
+    """Observed vs mean predicted uptake by quantile bin of predicted risk"""
+    groups = pd.qcut(pd.Series(p).rank(method='first'), q=min(bins, len(p)), labels=False)
+    frame = pd.DataFrame({'bin': groups, 'y': y, 'p': p})
+    table = frame.groupby('bin').agg(n=('y', 'size'), observed=('y', 'mean'), predicted=('p', 'mean')).reset_index()
+    return table.rename(columns={'bin': 'Bin', 'n': 'N', 'observed': 'Observed', 'predicted': 'Predicted'})
+
+def cross_validated_model(df, predictors, k=5, seed=2024, penalties=CV_PENALTIES, parallel=None):
+    """Ridge logistic uptake model: nested k-fold out-of-fold predictions, AUC, Brier score and calibration
+
+    Each outer fold picks its penalty by an inner CV on its training rows, so the reported AUC is not
+    tuned on the rows it scores. The final model's penalty (best non-nested CV AUC) is refitted on all
+    rows. Returns a dict with out-of-fold predictions indexed like df, fold AUCs, calibration
+    summaries and coefficients.
+    """
+    predictors = [p for p in predictors if p in df.columns and p != 'Uptake']
+    y_all = uptake_outcome(df)
+    rows = y_all.notna().to_numpy()
+    if not predictors or rows.sum() < 2 * k:
+        return {}
+    data = df.loc[rows]
+    X, labels = indicator_design(data, predictors)
+    y = y_all[rows].to_numpy()
+    folds = stratified_folds(y, k, seed)
+    if parallel is None:
+        parallel = X.size * k * k * len(penalties) >= PARALLEL_MIN_CELLS
+
+    if parallel:
+        with shared_arrays(X=X, y=y, folds=folds) as handles:
+            fold_results = run_parallel(_cv_fold_task, [(handles, fold, penalties, seed) for fold in range(k)], parallel=True)
+    else:
+        fold_results = [nested_fold_predictions(X, y, folds, fold, penalties, seed) for fold in range(k)]
+
+    # Nested predictions take each outer fold's inner-chosen penalty; the per-penalty OOF AUCs only pick the final model
+    oof = np.empty((len(penalties), len(y)))
+    p = np.empty(len(y))
+    fold_penalty = []
+    for fold, (preds, chosen) in enumerate(fold_results):
+        oof[:, folds == fold] = preds
+        p[folds == fold] = preds[chosen]
+        fold_penalty.append(penalties[chosen])
+    aucs = np.array([auc_score(y, oof[i]) for i in range(len(penalties))])
+    best = int(np.nanargmax(aucs))
+
+    # Calibration intercept/slope: logistic regression of the outcome on the out-of-fold logit
+    logit = np.log(np.clip(p, 1e-9, 1 - 1e-9) / np.clip(1 - p, 1e-9, 1))
+    calib = sm.GLM(y, sm.add_constant(logit), family=sm.families.Binomial()).fit()
+
+    beta = fit_ridge_logistic(X, y, penalties[best])
+    coefficients = pd.DataFrame({
+        'Predictor': [pred for pred, _ in labels[1:]],
+        'Level': [level for _, level in labels[1:]],
+        'Odds Ratio': np.exp(beta[1:]),
+    })
+    return {
+        'k': k,
+        'n': len(y),
+        'penalty': penalties[best],
+        'penalty_auc': dict(zip(penalties, aucs)),
+        'fold_penalty': np.array(fold_penalty),
+        'auc': auc_score(y, p),
+        'tuned_auc': aucs[best],
+        'fold_auc': np.array([auc_score(y[folds == fold], p[folds == fold]) for fold in range(k)]),
+        'brier': np.mean((p - y) ** 2),
+        'calibration': calibration_table(y, p),
+        'calibration_intercept': calib.params[0],
+        'calibration_slope': calib.params[1],
+        'oof': pd.Series(p, index=data.index, name='Predicted Uptake'),
+        'coefficients': coefficients,
+    }
+
+# 🏫 Cluster-robust inference: CR1 sandwich and wild cluster score bootstrap from per-cluster scores
+WEBB_WEIGHTS = np.array([-np.sqrt(1.5), -1.0, -np.sqrt(0.5), np.sqrt(0.5), 1.0, np.sqrt(1.5)])
+
+def wild_cluster_weights(n_clusters, n_boot, seed):
+    """Webb six-point weights (replicates x clusters); enumerated exactly when 6^G <= n_boot"""
+    if len(WEBB_WEIGHTS) ** n_clusters <= n_boot:
+        grid = np.meshgrid(*[WEBB_WEIGHTS] * n_clusters, indexing='ij')
+        return np.column_stack([g.ravel() for g in grid])
+    return np.random.default_rng(seed).choice(WEBB_WEIGHTS, size=(n_boot, n_clusters))
+
+def cluster_robust_table(df, predictors, cluster='affiliation', n_boot=9999, seed=2024, alpha=0.05):
+    """Modified Poisson RRs with CR1 cluster-robust CIs and wild cluster bootstrap p-values
+
+    Everything runs on per-cluster score sums built from cell aggregates, so all replicates for all
+    coefficients come from (replicates x clusters) @ (clusters x parameters) products. The p-values
+    use the restricted (null-imposed) score bootstrap, which keeps its size with few clusters.
+    """
+    predictors = [p for p in predictors if p in df.columns and p != cluster]
+    if 'Uptake' not in df.columns or cluster not in df.columns or not predictors:
+        return pd.DataFrame()
+
+    table = cell_table(df, predictors + [cluster])
+    X, labels = design_matrix(table, predictors)
+    n = table['n'].to_numpy(dtype=float)
+    events = table['events'].to_numpy(dtype=float)
+    cluster_codes = pd.Categorical(table[cluster]).codes
+    n_clusters, k = cluster_codes.max() + 1, X.shape[1]
+    if n_clusters < 2:
+        return pd.DataFrame()
+
+    def cluster_scores(params):
+        """Per-cluster score sums (clusters x parameters) and the Fisher information at params"""
+        mu = np.exp(X @ params)
+        scores = np.zeros((n_clusters, k))
+        np.add.at(scores, cluster_codes, X * (events - n * mu)[:, None])
+        return scores, (X * (n * mu)[:, None]).T @ X
+
+    params, _, _ = fit_cells(table, predictors)
+    scores, information = cluster_scores(params)
+    influence = scores @ np.linalg.inv(information)  # Each cluster's contribution to the coefficients
+
+    # CR1: small-sample factor G/(G-1) * (N-1)/(N-k), t reference with G-1 df
+    n_obs = n.sum()
+    correction = n_clusters / (n_clusters - 1) * (n_obs - 1) / (n_obs - k)
+    se = np.sqrt(correction * (influence ** 2).sum(axis=0))
+    p_cr1 = 2 * stats.t.sf(np.abs(params / se), n_clusters - 1)
+    t_crit = stats.t.ppf(1 - alpha / 2, n_clusters - 1)
+
+    # Restricted score bootstrap: fit with beta_j = 0, partial the nuisance scores out of score j.
+    # (An unrestricted bootstrap SE is not reported: with Webb weights, mean 0 and variance 1, it
+    # just reproduces the CR1 SE, exactly so when the weights are enumerated.)
+    weights = wild_cluster_weights(n_clusters, n_boot, seed)
+    effective = np.zeros((n_clusters, k))
+    for j in range(1, k):
+        keep = np.arange(k) != j
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', PerfectSeparationWarning)
+            restricted = sm.GLM(events, X[:, keep], family=sm.families.Poisson(), exposure=n).fit()
+        null_params = np.zeros(k)
+        null_params[keep] = restricted.params
+        null_scores, null_info = cluster_scores(null_params)
+        projection = np.linalg.solve(null_info[np.ix_(keep, keep)], null_info[keep, j])
+        effective[:, j] = null_scores[:, j] - null_scores[:, keep] @ projection
+    with np.errstate(divide='ignore', invalid='ignore'):
+        observed = np.abs(effective.sum(axis=0)) / np.sqrt((effective ** 2).sum(axis=0))
+        replicates = np.abs(weights @ effective) / np.sqrt((weights ** 2) @ (effective ** 2))
+    p_wild = (replicates >= observed[None, :] - 1e-12).mean(axis=0)
+
+    rows = []
+    for j, (pred, level) in enumerate(labels):
+        if j == 0:
+            continue
+        rows.append({
+            'Predictor': pred,
+            'Category': level,
+            'RR': np.exp(params[j]),
+            'CR1 SE': se[j],
+            'CR1 CI Lower': np.exp(params[j] - t_crit * se[j]),
+            'CR1 CI Upper': np.exp(params[j] + t_crit * se[j]),
+            'CR1 p-value': p_cr1[j],
+            'Wild p-value': p_wild[j],
+        })
+    result = pd.DataFrame(rows)
+    result.attrs.update({'clusters': int(n_clusters), 'replicates': len(weights)})
+    return result
+
+# 🎚️ What-if simulator: logistic g-computation over cells, with every lever-flip pattern precomputed
+def intervention_model(df, levers, covariates, group, positive='yes'):
+    """Fit the uptake model once and predict each cell under every combination of levers switched on
+
+    Returns the cell sizes, subgroup codes, current lever prevalence per subgroup and a
+    (cells x 2^levers) matrix of predicted uptake, which is all simulate_interventions needs.
+    """
+    levers = [lever for lever in levers if lever in df.columns]
+    covariates = [c for c in dict.fromkeys(list(covariates) + [group]) if c in df.columns and c not in levers]
+    if 'Uptake' not in df.columns or group not in df.columns or not levers:
+        return {}
+
+    design_columns = covariates + levers
+    table = cell_table(df, design_columns)
+    X, labels = design_matrix(table, design_columns)
+    params, _, _ = fit_cells(table, design_columns, family='logistic')
+    # A lever with no observed positive answer, or whose positive answer is the reference level
+    # (nobody answered otherwise), has no coefficient to switch on, so it stays a covariate only
+    levers = [lever for lever in levers if (lever, positive) in labels]
+    if not levers:
+        return {}
+    lever_columns = [labels.index((lever, positive)) for lever in levers]
+
+    # Switching lever l on adds beta_l wherever the indicator is still 0
+    patterns = (np.arange(2 ** len(levers))[:, None] >> np.arange(len(levers))) & 1
+    gains = (1 - X[:, lever_columns]) * params[lever_columns]
+    probabilities = 1 / (1 + np.exp(-(X @ params)[:, None] - gains @ patterns.T))
+
+    n = table['n'].to_numpy(dtype=float)
+    groups = predictor_levels(table[group])
+    codes = pd.Categorical(table[group], categories=groups).codes
+    group_n = np.bincount(codes, weights=n, minlength=len(groups))
+    lever_yes = X[:, lever_columns] * n[:, None]
+    prevalence = np.stack([np.bincount(codes, weights=lever_yes[:, l], minlength=len(groups))
+                           for l in range(len(levers))], axis=1) / group_n[:, None]
+    return {
+        'levers': levers, 'groups': groups, 'codes': codes, 'n': n, 'group_n': group_n,
+        'prevalence': prevalence, 'patterns': patterns, 'probabilities': probabilities,
+    }
+
+def simulate_interventions(model, increases):
+    """Projected uptake (%) for (scenarios x subgroups x levers) percentage-point prevalence increases
+
+    A subgroup's increase is reached by switching on a matching share of its respondents who lack the
+    lever, independently per lever. Returns (scenarios x subgroups) and overall (scenarios) uptake.
+    """
+    increases = np.asarray(increases, dtype=float)
+    prevalence = model['prevalence']
+    target = np.minimum(prevalence + increases / 100, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = np.where(prevalence < 1, (target - prevalence) / (1 - prevalence), 0)
+    share = share[:, model['codes'], :]  # scenarios x cells x levers
+    on = model['patterns'].astype(bool)
+    weights = np.where(on, share[:, :, None, :], 1 - share[:, :, None, :]).prod(axis=-1)
+    expected = np.einsum('scp,cp->sc', weights, model['probabilities']) * model['n']
+    by_group = np.stack([np.bincount(model['codes'], weights=row, minlength=len(model['groups']))
+                         for row in expected])
+    return 100 * by_group / model['group_n'], 100 * expected.sum(axis=1) / model['n'].sum()
+
+# 📐 Power planning: closed-form grids for the log RR Wald test, simulation for few-cluster designs
+def design_effect(cluster_size, icc):
+    """Variance inflation from sampling respondents in clusters of a given size"""
+    return 1 + (np.asarray(cluster_size, dtype=float) - 1) * icc
+
+def intraclass_correlation(df, cluster):
+    """One-way ANOVA estimate of the uptake intraclass correlation between clusters (floored at 0)"""
+    y = uptake_outcome(df)
+    mask = (y.notna() & df[cluster].notna()).to_numpy()
+    y = y.to_numpy()[mask]
+    codes = pd.Categorical(df.loc[mask, cluster]).codes
+    sizes = np.bincount(codes)
+    sizes = sizes[sizes > 0]
+    codes = np.unique(codes, return_inverse=True)[1]
+    k, n = len(sizes), len(y)
+    if k < 2 or n <= k:
+        return 0.0
+    means = np.bincount(codes, weights=y) / sizes
+    between = (sizes * (means - y.mean()) ** 2).sum() / (k - 1)
+    within = ((y - means[codes]) ** 2).sum() / (n - k)
+    n0 = (n - (sizes ** 2).sum() / n) / (k - 1)
+    denominator = between + (n0 - 1) * within
+    return float(max((between - within) / denominator, 0.0)) if denominator > 0 else 0.0
+
+def _log_rr_variance(rr, baseline, exposure):
+    """Per-respondent variance of log RR (comparison share = exposure); NaN where RR * baseline >= 1"""
+    exposed = rr * baseline
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (1 - exposed) / (exposure * exposed) + (1 - baseline) / ((1 - exposure) * baseline)
+    return np.where(exposed < 1, variance, np.nan)
+
+def required_sample_size(rr, baseline, cluster_size, exposure=0.5, icc=0.0, alpha=0.05, power=0.8):
+    """Total respondents needed to detect each RR, over the (RR x baseline x cluster size) grid
+
+    Two-sided Wald test of log RR between a comparison group (share = exposure) and the
+    reference group, inflated by the design effect 1 + (m - 1) * ICC.
+    """
+    rr, baseline, cluster_size = np.ix_(*(np.atleast_1d(np.asarray(a, dtype=float)) for a in (rr, baseline, cluster_size)))
+    z = stats.norm.ppf(1 - alpha / 2) + stats.norm.ppf(power)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = design_effect(cluster_size, icc) * z ** 2 * _log_rr_variance(rr, baseline, exposure) / np.log(rr) ** 2
+    return np.where(np.isfinite(n), np.ceil(n), np.nan)
+
+def closed_form_power(rr, baseline, cluster_size, n_total, exposure=0.5, icc=0.0, alpha=0.05):
+    """Wald-test power over the (RR x baseline x cluster size x total respondents) grid"""
+    rr, baseline, cluster_size, n_total = np.ix_(
+        *(np.atleast_1d(np.asarray(a, dtype=float)) for a in (rr, baseline, cluster_size, n_total))
+    )
+    se = np.sqrt(design_effect(cluster_size, icc) * _log_rr_variance(rr, baseline, exposure) / n_total)
+    z = stats.norm.ppf(1 - alpha / 2)
+    shift = np.abs(np.log(rr)) / se
+    return stats.norm.cdf(shift - z) + stats.norm.cdf(-shift - z)
+
+def _power_task(task):
+    """Rejection rate of the CR1 t-test for every (RR, baseline, cluster size) at one number of clusters"""
+    seed, rr, baseline, cluster_size, n_clusters, exposure, icc, alpha, n_sims = task
+    rng = np.random.default_rng(seed)
+    rr = np.asarray(rr, dtype=float)[:, None, None, None, None]
+    baseline = np.asarray(baseline, dtype=float)[None, :, None, None, None]
+    sizes = np.asarray(cluster_size)[None, None, :, None, None]
+    shape = (rr.shape[0], baseline.shape[1], sizes.shape[2], n_sims, n_clusters)
+
+    # Cluster baselines vary around the target as Beta draws with the requested ICC
+    if icc > 0:
+        scale = (1 - icc) / icc
+        cluster_baseline = rng.beta(baseline * scale, (1 - baseline) * scale, size=shape)
+    else:
+        cluster_baseline = np.broadcast_to(baseline, shape)
+    n1 = rng.binomial(np.broadcast_to(sizes, shape), exposure)
+    n0 = sizes - n1
+    e1 = rng.binomial(n1, np.minimum(rr * cluster_baseline, 1))
+    e0 = rng.binomial(n0, cluster_baseline)
+
+    # Modified Poisson with one binary predictor: log RR = log(E1/N1) - log(E0/N0), CR1 via cluster scores
+    N1, N0, E1, E0 = (a.sum(axis=-1) for a in (n1, n0, e1, e0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p1, p0 = E1 / N1, E0 / N0
+        log_rr = np.log(p1) - np.log(p0)
+        influence = (e1 - p1[..., None] * n1) / E1[..., None] - (e0 - p0[..., None] * n0) / E0[..., None]
+        total = N1 + N0
+        correction = n_clusters / (n_clusters - 1) * (total - 1) / (total - 2)
+        se = np.sqrt(correction * (influence ** 2).sum(axis=-1))
+        reject = np.abs(log_rr) / se > stats.t.ppf(1 - alpha / 2, n_clusters - 1)
+    return np.where(np.isfinite(log_rr) & (se > 0), reject, False).mean(axis=-1)
+
+def simulated_power(rr, baseline, cluster_size, n_clusters, exposure=0.5, icc=0.0, alpha=0.05,
+                    n_sims=1000, seed=2024, parallel=None):
+    """Simulated power of the cluster-robust RR test over (RR x baseline x cluster size x number of clusters)
+
+    No closed form covers a t(G - 1) reference with few clusters and Beta-distributed cluster
+    baselines, so each number of clusters is one vectorized batch of n_sims surveys, run in the
+    process pool for large grids. Seeds are spawned per batch, so results do not depend on the pool.
+    """
+    rr, baseline, cluster_size, n_clusters = (list(np.atleast_1d(a)) for a in (rr, baseline, cluster_size, n_clusters))
+    if parallel is None:
+        parallel = len(rr) * len(baseline) * len(cluster_size) * n_sims * sum(n_clusters) >= PARALLEL_MIN_CELLS
+    seeds = np.random.SeedSequence(seed).spawn(len(n_clusters))
+    tasks = [(s, rr, baseline, cluster_size, int(g), exposure, icc, alpha, n_sims) for s, g in zip(seeds, n_clusters)]
+    return np.stack(run_parallel(_power_task, tasks, parallel), axis=-1)
+
+# 🪶 Small-area estimation: empirical-Bayes beta-binomial shrinkage of subgroup uptake
+def beta_binomial_prior(events, totals):
+    """Closed-form method-of-moments Beta(a, b) prior across groups, plus the intra-group correlation rho
+
+    Uses E[sum n_i (p_i - p)^2] = p(1 - p) * [(k - 1) + rho * (N - sum n_i^2 / N - (k - 1))]. The prior is
+    centred on the pooled rate with sample size a + b = (1 - rho) / rho. A rho at or below zero means no
+    between-group variation beyond binomial noise, i.e. complete pooling: rho is reported as 0 and the
+    prior strength is infinite, so callers should fall back to the pooled estimate.
+    """
+    events, totals = np.asarray(events, dtype=float), np.asarray(totals, dtype=float)
+    keep = totals > 0
+    events, totals = events[keep], totals[keep]
+    k, n = len(totals), totals.sum()
+    pooled = events.sum() / n if n else np.nan
+    if k < 2 or not 0 < pooled < 1:
+        return np.nan, np.nan, np.nan
+    spread = (totals * (events / totals - pooled) ** 2).sum()
+    denominator = n - (totals ** 2).sum() / n - (k - 1)
+    rho = (spread / (pooled * (1 - pooled)) - (k - 1)) / denominator if denominator > 0 else 0.0
+    rho = float(np.clip(rho, 0, 1 - 1e-6))
+    strength = (1 - rho) / rho if rho > 0 else np.inf  # Prior sample size a + b
+    return pooled * strength, (1 - pooled) * strength, rho
+
+def shrink_uptake(df, groups, alpha=0.05):
+    """Shrunken uptake rates with equal-tailed credible intervals for every observed combination of the groups"""
+    groups = [g for g in groups if g in df.columns]
+    if 'Uptake' not in df.columns or not groups:
+        return pd.DataFrame()
+    table = cell_table(df, groups)
+    events = table['events'].to_numpy(dtype=float)
+    totals = table['n'].to_numpy(dtype=float)
+    a, b, rho = beta_binomial_prior(events, totals)
+    if np.isnan(rho):
+        return pd.DataFrame()
+
+    if rho == 0:
+        # Complete pooling: every group gets the pooled Jeffreys posterior, so no row is counted twice
+        post_a = np.full(len(totals), events.sum() + 0.5)
+        post_b = np.full(len(totals), totals.sum() - events.sum() + 0.5)
+        shrinkage = np.ones(len(totals))
+    else:
+        # Conjugate posterior Beta(a + e, b + n - e) for all groups at once
+        post_a, post_b = a + events, b + totals - events
+        shrinkage = (a + b) / (a + b + totals)
+    lower, upper = stats.beta.ppf([[alpha / 2], [1 - alpha / 2]], post_a, post_b)
+    result = table[groups].assign(**{
+        'N': totals.astype(int),
+        'Screened': events.astype(int),
+        'Observed (%)': 100 * events / totals,
+        'Shrunken (%)': 100 * post_a / (post_a + post_b),
+        'CrI Lower (%)': 100 * lower,
+        'CrI Upper (%)': 100 * upper,
+        'Shrinkage': shrinkage,
+    })
+    result.attrs.update({'prior_a': a, 'prior_b': b, 'rho': rho, 'complete_pooling': rho == 0})
+    return result
+
+# ⚖️ Causal estimation: propensity-score IPW and matching on covariate patterns, batched bootstrap
+CONFOUNDERS = ['agegrp', 'marital', 'lev', 'reli', 'affiliation']
+PROPENSITY_CALIPER = 0.2  # Matching caliper in SDs of the logit propensity
+PROPENSITY_PENALTY = 1.0  # Weak ridge that keeps sparse bootstrap replicates from separating
+
+def covariate_patterns(frame, confounders):
+    """Pattern index of every row over the confounders, plus the design row and labels of each pattern"""
+    if not confounders:
+        return np.zeros(len(frame), dtype=np.intp), np.ones((1, 1)), [('Intercept', '')]
+    codes, levels = code_matrix(frame, confounders)
+    radix = np.array([len(lv) + 1 for lv in levels], dtype=np.int64)
+    keys = (codes + 1) @ np.concatenate([np.cumprod(radix[::-1])[::-1][1:], [1]])
+    _, first, pattern = np.unique(keys, return_index=True, return_inverse=True)
+    X, labels = indicator_design(frame, confounders)
+    return pattern, X[first], labels
+
+def treatment_patterns(df, treatment, confounders, positive='yes'):
+    """Design row and (treated, treated events, control, control events) counts per covariate pattern"""
+    confounders = [c for c in confounders if c in df.columns]
+    mask = (df[treatment].notna() & df['Uptake'].notna()).to_numpy()
+    frame = df.loc[mask]
+    pattern, X, labels = covariate_patterns(frame, confounders)
+    treated = (frame[treatment] == positive).to_numpy()
+    y = uptake_outcome(frame).to_numpy()
+    counts = np.stack([
+        np.bincount(pattern, weights=treated, minlength=len(X)),
+        np.bincount(pattern, weights=treated * y, minlength=len(X)),
+        np.bincount(pattern, weights=~treated, minlength=len(X)),
+        np.bincount(pattern, weights=~treated * y, minlength=len(X)),
+    ], axis=1)
+    return X, labels, counts
+
+def batched_logistic(X, events, total, penalty=PROPENSITY_PENALTY, max_iter=50, tol=1e-8):
+    """Ridge-logistic fitted probabilities per design row for every replicate of (events, total) counts at once"""
+    beta = np.zeros((events.shape[0], X.shape[1]))
+    ridge = np.full(X.shape[1], float(penalty))
+    ridge[0] = 0.0
+    for _ in range(max_iter):
+        p = 1 / (1 + np.exp(-(beta @ X.T)))
+        gradient = (events - total * p) @ X - ridge * beta
+        hessian = ((total * p * (1 - p))[:, None, :] * X.T) @ X + np.diag(ridge + 1e-10)
+        step = np.linalg.solve(hessian, gradient[..., None])[..., 0]
+        beta += step
+        if np.abs(step).max() < tol:
+            break
+    return 1 / (1 + np.exp(-(beta @ X.T)))
+
+def nearest_controls(logit, has_controls, caliper):
+    """Index of the nearest pattern with controls for every pattern (replicates x patterns), -1 beyond the caliper
+
+    All replicates share one sorted array: each row is offset into its own band, so a single searchsorted
+    finds every neighbour in O(n log n) instead of comparing every pair.
+    """
+    n_rep, n_pat = logit.shape
+    band = 6 * (np.abs(logit).max() + 1)  # Keeps other replicates and control-free patterns beyond any caliper
+    offsets = band * np.arange(n_rep)[:, None]
+    keys = logit + offsets + np.where(has_controls, 0, band / 2)  # Patterns without controls sit out of reach
+    order = np.argsort(keys, axis=1)
+    ranked = np.take_along_axis(keys, order, axis=1).ravel()
+    query = logit + offsets
+    position = np.searchsorted(ranked, query.ravel()).reshape(n_rep, n_pat)
+    row_start = (np.arange(n_rep) * n_pat)[:, None]
+    below = np.clip(position - 1, row_start, row_start + n_pat - 1)
+    above = np.clip(position, row_start, row_start + n_pat - 1)
+    gap_below, gap_above = np.abs(query - ranked[below]), np.abs(query - ranked[above])
+    nearest = np.where(gap_below <= gap_above, below, above)
+    matched = order.ravel()[nearest]  # Pattern index within each replicate
+    return np.where(np.minimum(gap_below, gap_above) <= caliper[:, None], matched, -1)
+
+def propensity_estimates(X, counts, caliper=PROPENSITY_CALIPER):
+    """Unadjusted, IPW (ATE) and matched (ATT) uptake risks for each replicate of pattern counts"""
+    n1, e1, n0, e0 = (counts[..., j] for j in range(4))
+    p = np.clip(batched_logistic(X, n1, n1 + n0), 1e-6, 1 - 1e-6)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        naive = (e1.sum(-1) / n1.sum(-1), e0.sum(-1) / n0.sum(-1))
+        # Hajek (normalized) inverse-probability weights
+        ipw = ((e1 / p).sum(-1) / (n1 / p).sum(-1), (e0 / (1 - p)).sum(-1) / (n0 / (1 - p)).sum(-1))
+
+        # Nearest-neighbour matching with replacement on the logit propensity; ties within a pattern are averaged
+        logit = np.log(p / (1 - p))
+        total = n1 + n0
+        mean = (total * logit).sum(-1) / total.sum(-1)
+        sd = np.sqrt((total * (logit - mean[:, None]) ** 2).sum(-1) / total.sum(-1))
+        match = nearest_controls(logit, n0 > 0, caliper * np.maximum(sd, 1e-8))
+        found = (match >= 0) & (n1 > 0)
+        control_rate = np.take_along_axis(e0 / np.where(n0 > 0, n0, 1), np.maximum(match, 0), axis=1)
+        matched_n = np.where(found, n1, 0).sum(-1)
+        matched = (np.where(found, e1, 0).sum(-1) / matched_n, np.where(found, n1 * control_rate, 0).sum(-1) / matched_n)
+    return {'Unadjusted': naive, 'IPW (ATE)': ipw, 'Matched (ATT)': matched}, p, matched_n
+
+def _propensity_chunk(task):
+    """Bootstrap replicates of every estimator for one chunk of multinomial pattern-count draws"""
+    seed, size, n, probs, X, caliper = task
+    # Draws are over disjoint (treated/control x event/no event) cells; convert back to totals and events
+    draws = np.random.default_rng(seed).multinomial(n, probs, size=size).reshape(size, X.shape[0], 4).astype(float)
+    draws[..., 0] += draws[..., 1]
+    draws[..., 2] += draws[..., 3]
+    estimates, _, _ = propensity_estimates(X, draws, caliper)
+    return {method: np.column_stack(risks) for method, risks in estimates.items()}
+
+def propensity_analysis(df, treatment='eva_told_to_scrn', confounders=CONFOUNDERS, n_boot=2000, seed=2024,
+                        caliper=PROPENSITY_CALIPER, parallel=None, alpha=0.05):
+    """Effect of a binary exposure on uptake by IPW and propensity matching, with percentile bootstrap CIs
+
+    Confounders are categorical, so the data reduce to treated/control counts per covariate pattern;
+    a bootstrap replicate is one multinomial draw over those counts, and every replicate's propensity
+    fit, weighting and matching run as batched array operations.
+    """
+    if 'Uptake' not in df.columns or treatment not in df.columns:
+        return {}
+    X, labels, counts = treatment_patterns(df, treatment, confounders)
+    if counts[:, 0].sum() == 0 or counts[:, 2].sum() == 0:
+        return {}
+    estimates, propensity, matched_n = propensity_estimates(X, counts[None].astype(float), caliper)
+
+    cells = counts - np.column_stack([counts[:, 1], np.zeros(len(counts)), counts[:, 3], np.zeros(len(counts))])
+    n = int(cells.sum())
+    probs = cells.ravel() / n
+    if parallel is None:
+        parallel = probs.size * n_boot >= PARALLEL_MIN_CELLS
+    sizes = [min(BOOTSTRAP_CHUNK, n_boot - start) for start in range(0, n_boot, BOOTSTRAP_CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    blocks = run_parallel(_propensity_chunk, [(s, size, n, probs, X, caliper) for s, size in zip(seeds, sizes)], parallel)
+
+    lo_q, hi_q = 100 * alpha / 2, 100 * (1 - alpha / 2)
+    rows = []
+    for method, (risk1, risk0) in estimates.items():
+        boot = np.vstack([block[method] for block in blocks])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rd = np.nanpercentile(100 * (boot[:, 0] - boot[:, 1]), [lo_q, hi_q])
+            rr = np.nanpercentile(np.where(boot[:, 1] > 0, boot[:, 0] / boot[:, 1], np.nan), [lo_q, hi_q])
+        rows.append({
+            'Method': method,
+            'Risk Exposed (%)': 100 * risk1[0],
+            'Risk Unexposed (%)': 100 * risk0[0],
+            'Risk Difference (pp)': 100 * (risk1[0] - risk0[0]),
+            'RD CI Lower': rd[0],
+            'RD CI Upper': rd[1],
+            'Risk Ratio': risk1[0] / risk0[0] if risk0[0] > 0 else np.nan,
+            'RR CI Lower': rr[0],
+            'RR CI Upper': rr[1],
+        })
+
+    # Covariate balance: standardized mean differences before and after weighting
+    p = propensity[0]
+    n1, n0 = counts[:, 0], counts[:, 2]
+    balance = []
+    for j, (pred, level) in enumerate(labels):
+        if j == 0:
+            continue
+        x = X[:, j]
+        smd = []
+        for w1, w0 in ((n1, n0), (n1 / p, n0 / (1 - p))):
+            m1, m0 = (w1 * x).sum() / w1.sum(), (w0 * x).sum() / w0.sum()
+            pooled = np.sqrt((m1 * (1 - m1) + m0 * (1 - m0)) / 2)
+            smd.append((m1 - m0) / pooled if pooled > 0 else 0.0)
+        balance.append({'Covariate': pred, 'Level': level, 'SMD Before': smd[0], 'SMD After IPW': smd[1]})
+
+    return {
+        'estimates': pd.DataFrame(rows),
+        'balance': pd.DataFrame(balance),
+        'n_treated': int(n1.sum()),
+        'n_control': int(n0.sum()),
+        'matched_treated': int(matched_n[0]),
+        'n_boot': n_boot,
+    }
+
+# 🔗 Mediation: g-formula natural direct and indirect effects through a binary mediator, batched bootstrap
+def mediation_cells(df, exposure, mediator, confounders, positive='yes'):
+    """Design row per covariate pattern and disjoint (exposure, mediator, uptake) counts, column 4a + 2m + y"""
+    confounders = [c for c in confounders if c in df.columns and c not in (exposure, mediator)]
+    mask = (df[exposure].notna() & df[mediator].notna() & df['Uptake'].notna()).to_numpy()
+    frame = df.loc[mask]
+    pattern, X, _ = covariate_patterns(frame, confounders)
+    cell = (4 * (frame[exposure] == positive).to_numpy() + 2 * (frame[mediator] == positive).to_numpy()
+            + uptake_outcome(frame).to_numpy().astype(int))
+    counts = np.bincount(pattern * 8 + cell, minlength=len(X) * 8).reshape(len(X), 8)
+    return X, counts
+
+def mediation_effects(X, counts, penalty=PROPENSITY_PENALTY):
+    """Standardized means E[Y(0, M(0))], E[Y(1, M(0))] and E[Y(1, M(1))] for each replicate of cell counts
+
+    Mediator model: logistic on confounders + exposure. Outcome model: logistic on confounders + exposure
+    + mediator + their interaction. Both are fitted for all replicates at once and averaged over the
+    replicate's confounder distribution (parametric g-formula).
+    """
+    n_rep, n_pat = counts.shape[:2]
+    cells = counts.reshape(n_rep, n_pat, 2, 2, 2)  # pattern, exposure, mediator, uptake
+    totals = cells.sum(-1)
+    exposed = [np.full((n_pat, 1), a, dtype=float) for a in (0, 1)]
+
+    design_m = np.vstack([np.hstack([X, a]) for a in exposed])
+    mediator = batched_logistic(
+        design_m,
+        totals[..., 1].transpose(0, 2, 1).reshape(n_rep, -1),
+        totals.sum(-1).transpose(0, 2, 1).reshape(n_rep, -1),
+        penalty
+    ).reshape(n_rep, 2, n_pat)
+
+    design_y = np.vstack([np.hstack([X, a, np.full_like(a, m), a * m]) for a in exposed for m in (0, 1)])
+    outcome = batched_logistic(
+        design_y,
+        cells[..., 1].transpose(0, 2, 3, 1).reshape(n_rep, -1),
+        totals.transpose(0, 2, 3, 1).reshape(n_rep, -1),
+        penalty
+    ).reshape(n_rep, 2, 2, n_pat)
+
+    weights = counts.sum(-1) / counts.sum((-1, -2))[:, None]
+
+    def potential(a, a_star):
+        """E[Y(a, M(a*))] standardized to the confounder distribution"""
+        p_m = mediator[:, a_star]
+        return (weights * (outcome[:, a, 1] * p_m + outcome[:, a, 0] * (1 - p_m))).sum(-1)
+
+    return potential(0, 0), potential(1, 0), potential(1, 1)
+
+def _mediation_chunk(task):
+    """Bootstrap potential-outcome means for one chunk of multinomial cell-count draws"""
+    seed, size, n, probs, X = task
+    draws = np.random.default_rng(seed).multinomial(n, probs, size=size).reshape(size, X.shape[0], 8)
+    return np.column_stack(mediation_effects(X, draws.astype(float)))
+
+def mediation_analysis(df, exposure='aware_of_scrn_centa', mediator='giv_oportu_to_scrn', confounders=CONFOUNDERS,
+                       n_boot=2000, seed=2024, parallel=None, alpha=0.05):
+    """Total, natural direct and natural indirect effects of an exposure on uptake through a mediator
+
+    Effects are reported as risk differences (additive decomposition TE = NDE + NIE) and risk ratios
+    (multiplicative), with percentile CIs from a cell-level bootstrap run in chunks in the process pool.
+    """
+    if any(col not in df.columns for col in ('Uptake', exposure, mediator)):
+        return {}
+    X, counts = mediation_cells(df, exposure, mediator, confounders)
+    arms = counts.reshape(len(X), 2, 4).sum(axis=(0, 2))
+    if (arms == 0).any():
+        return {}
+    point = np.array([value[0] for value in mediation_effects(X, counts[None].astype(float))])
+
+    n = int(counts.sum())
+    probs = counts.ravel() / n
+    if parallel is None:
+        parallel = probs.size * n_boot >= PARALLEL_MIN_CELLS
+    sizes = [min(BOOTSTRAP_CHUNK, n_boot - start) for start in range(0, n_boot, BOOTSTRAP_CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    boot = np.vstack(run_parallel(_mediation_chunk, [(s, size, n, probs, X) for s, size in zip(seeds, sizes)], parallel))
+
+    lo_q, hi_q = 100 * alpha / 2, 100 * (1 - alpha / 2)
+    contrasts = {'Total Effect': (2, 0), 'Natural Direct Effect': (1, 0), 'Natural Indirect Effect': (2, 1)}
+    rows = []
+    for effect, (hi, lo) in contrasts.items():
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rd = np.nanpercentile(100 * (boot[:, hi] - boot[:, lo]), [lo_q, hi_q])
+            rr = np.nanpercentile(boot[:, hi] / boot[:, lo], [lo_q, hi_q])
+        rows.append({
+            'Effect': effect,
+            'Risk Difference (pp)': 100 * (point[hi] - point[lo]),
+            'RD CI Lower': rd[0],
+            'RD CI Upper': rd[1],
+            'Risk Ratio': point[hi] / point[lo] if point[lo] > 0 else np.nan,
+            'RR CI Lower': rr[0],
+            'RR CI Upper': rr[1],
+        })
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mediated = (boot[:, 2] - boot[:, 1]) / (boot[:, 2] - boot[:, 0])
+    return {
+        'effects': pd.DataFrame(rows),
+        'proportion_mediated': (point[2] - point[1]) / (point[2] - point[0]) if point[2] != point[0] else np.nan,
+        'proportion_mediated_ci': np.nanpercentile(np.where(np.isfinite(mediated), mediated, np.nan), [lo_q, hi_q]),
+        'potential_outcomes': dict(zip(['Y(0, M(0))', 'Y(1, M(0))', 'Y(1, M(1))'], 100 * point)),
+        'n': n,
+        'n_boot': n_boot,
+    }